@@ -1,12 +1,17 @@
 # agents/agentic_orchestrator.py
 
-from langgraph.graph import StateGraph, END
+import threading
 from typing import TypedDict, List
-from agents.matcher_agent import score_match
-from agents.skill_extraction_agent import extract_structured_skills
-from tools.embedding_store import TalentVectorStore
-from agents.feedback_agent import compute_acceptance_rate
+from agents.matcher_agent import score_candidates, SCORING_WORKERS
+from agents.skill_extraction_agent import extract_structured_skills, extract_project_skills
+from tools.registry import get_store
+from tools.tracing import traced
+from tools.retrieval import two_stage_retrieve
+from agents.skill_graph import get_skill_ontology
+import agents.batch_matching as batch_matching
+from agents.batch_matching import adjust_scores
 from .llm_client import call_ollama
+from .planner_rules import rule_based_action
 
 # -----------------------------------------------------
 # STATE DEFINITION
@@ -25,8 +30,6 @@ class AgentState(TypedDict, total=False):
     retried: bool
 
 
-store = TalentVectorStore()
-
 
 # -----------------------------------------------------
 # 1. PLANNER NODE (LLM THINKING)
@@ -36,6 +39,7 @@ store = TalentVectorStore()
 MAX_ITERATIONS = 8
 
 
+@traced("node.planner")
 def planner_node(state):
 
     iteration = state.get("iteration", 0)
@@ -43,21 +47,7 @@ def planner_node(state):
     if iteration >= MAX_ITERATIONS:
         return {**state, "next_action": "finish"}
 
-    if not state.get("candidates"):
-        return {**state, "next_action": "retrieve"}
-
-    # Score if not yet scored
-    if state.get("candidates") and not state.get("ranked_results"):
-        return {**state, "next_action": "score"}
-
-    # 🔥 ADD THIS BLOCK
-    if state.get("ranked_results") and not state.get("rank_complete"):
-        return {**state, "next_action": "rank"}
-
-    if state.get("rank_complete") and not state.get("reflection_done"):
-        return {**state, "next_action": "reflection"}
-
-    return {**state, "next_action": "finish"}
+    return {**state, "next_action": rule_based_action(state)}
 
 
 
@@ -65,14 +55,17 @@ def planner_node(state):
 # 2. RETRIEVE NODE
 # -----------------------------------------------------
 
+@traced("node.retrieve")
 def retrieve_node(state: AgentState):
 
-    results = store.query(state["project_text"], top_k=5)
+    project_skills = extract_project_skills(state["project_text"])
 
-    candidates = list(zip(
-        results["ids"][0],
-        results["documents"][0]
-    ))
+    candidates = two_stage_retrieve(
+        get_store(),
+        state["project_text"],
+        project_skills,
+        expanded_skills=get_skill_ontology().expand(project_skills)
+    )
 
     return {
         **state,
@@ -86,23 +79,12 @@ def retrieve_node(state: AgentState):
 # 3. SCORING NODE
 # -----------------------------------------------------
 
+@traced("node.scoring")
 def scoring_node(state: AgentState):
 
-    scored = []
+    results = score_candidates(state["project_text"], state["candidates"])
 
-    for emp_id, profile in state["candidates"]:
-        llm_result = score_match(state["project_text"], profile)
-
-        acceptance = compute_acceptance_rate(emp_id)
-        adjusted_score = llm_result["match_score"] * acceptance
-
-        llm_result["adjusted_score"] = adjusted_score
-
-        scored.append({
-            "emp_id": emp_id,
-            "profile": profile,
-            "result": llm_result
-        })
+    scored = adjust_scores(state["candidates"], results, state["project_text"])
 
     return {**state, "ranked_results": scored, "iteration": state.get("iteration", 0) + 1}
 
@@ -112,6 +94,7 @@ def scoring_node(state: AgentState):
 # -----------------------------------------------------
 
 
+@traced("node.ranking")
 def ranking_node(state: AgentState):
 
     ranked = sorted(
@@ -134,6 +117,7 @@ def ranking_node(state: AgentState):
 # -----------------------------------------------------
 
 
+@traced("node.reflection")
 def reflection_node(state):
 
     iteration = state.get("iteration", 0)
@@ -170,36 +154,69 @@ def reflection_node(state):
 # GRAPH BUILDING
 # -----------------------------------------------------
 
-builder = StateGraph(AgentState)
+_graph = None
+_graph_lock = threading.Lock()
 
-builder.add_node("planner", planner_node)
-builder.add_node("retrieve", retrieve_node)
-builder.add_node("score", scoring_node)
-builder.add_node("rank", ranking_node)
-builder.add_node("reflection", reflection_node)
 
-builder.set_entry_point("planner")
+def _build_graph():
 
-builder.add_conditional_edges(
-    "planner",
-    lambda state: state["next_action"],
-    {
-        "retrieve": "retrieve",
-        "score": "score",
-        "rank": "rank",
-        "reflection": "reflection",
-        "finish": END,
-    }
-)
+    from langgraph.graph import StateGraph, END
+
+    builder = StateGraph(AgentState)
+
+    builder.add_node("planner", planner_node)
+    builder.add_node("retrieve", retrieve_node)
+    builder.add_node("score", scoring_node)
+    builder.add_node("rank", ranking_node)
+    builder.add_node("reflection", reflection_node)
+
+    builder.set_entry_point("planner")
+
+    builder.add_conditional_edges(
+        "planner",
+        lambda state: state["next_action"],
+        {
+            "retrieve": "retrieve",
+            "score": "score",
+            "rank": "rank",
+            "reflection": "reflection",
+            "finish": END,
+        }
+    )
+
+
+    # 🔁 Loop back to planner after each step
+    builder.add_edge("retrieve", "planner")
+    builder.add_edge("score", "planner")
+    builder.add_edge("rank", "planner")
+    builder.add_edge("reflection", "planner")
+
+    return builder.compile()
+
+
+def get_graph():
+    """
+    Compiles the graph on first use and reuses it afterwards.
+    """
 
+    global _graph
 
-# 🔁 Loop back to planner after each step
-builder.add_edge("retrieve", "planner")
-builder.add_edge("score", "planner")
-builder.add_edge("rank", "planner")
-builder.add_edge("reflection", "planner")
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = _build_graph()
 
-agentic_graph = builder.compile()
+    return _graph
+
+
+def __getattr__(name):
+    # `store` / `agentic_graph` used to be built at import time;
+    # keep them importable, but resolve them lazily
+    if name == "store":
+        return get_store()
+    if name == "agentic_graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 
@@ -209,20 +226,51 @@ agentic_graph = builder.compile()
 # -----------------------------------------------------
 
 
-def run_agent(project_text: str):
+def _initial_state(project_text: str) -> dict:
+
+    return {
+        "goal": "Find best candidates",
+        "project_text": project_text,
+        "candidates": [],
+        "ranked_results": [],
+        "iteration": 0,
+        "rank_complete": False,
+        "reflection_done": False
+    }
+
 
-    state = {
-    "goal": "Find best candidates",
-    "project_text": project_text,
-    "candidates": [],
-    "ranked_results": [],
-    "iteration": 0,
-    "rank_complete": False,
-    "reflection_done": False
-}
+def _run_graph(state: dict):
 
-    final_state = agentic_graph.invoke(state, config={"recursion_limit": 500})
+    final_state = get_graph().invoke(state, config={"recursion_limit": 500})
 
     return final_state.get("ranked_results", [])
 
 
+@traced("run_agent", root=True)
+def run_agent(project_text: str):
+
+    return _run_graph(_initial_state(project_text))
+
+
+def _resume_state(project_text: str, candidates: list, scored: list) -> dict:
+
+    return {
+        **_initial_state(project_text),
+        "candidates": candidates,
+        "ranked_results": scored,
+        "iteration": 2    # retrieve + score already done
+    }
+
+
+@traced("run_agent_batch", root=True)
+def run_agent_batch(projects: list, top_k=5, max_workers=SCORING_WORKERS) -> list:
+    """
+    Matches many projects in one pass (see batch_matching.run_agent_batch);
+    each project's graph resumes from ranking / reflection.
+
+    Returns one ranked result list per project, in input order.
+    """
+
+    return batch_matching.run_agent_batch(
+        projects, _run_graph, _resume_state, top_k=top_k, max_workers=max_workers
+    )
@@ -1,11 +1,14 @@
 # agents/agentic_orchestrator.py
 
-from langgraph.graph import StateGraph, END
+import threading
 from typing import TypedDict, List
-from agents.matcher_agent import score_match
-from agents.skill_extraction_agent import extract_structured_skills
-from tools.embedding_store import TalentVectorStore
-from agents.feedback_agent import compute_acceptance_rate
+from agents.matcher_agent import score_candidates
+from agents.skill_extraction_agent import extract_structured_skills, extract_project_skills
+from tools.registry import get_store
+from tools.tracing import traced
+from tools.retrieval import two_stage_retrieve
+from agents.skill_graph import get_skill_ontology
+from agents.batch_matching import adjust_scores
 
 
 # -----------------------------------------------------
@@ -20,13 +23,12 @@ class AgentState(TypedDict):
     step: str
 
 
-store = TalentVectorStore()
-
 
 # -----------------------------------------------------
 # 1. PLANNER NODE (LLM THINKING)
 # -----------------------------------------------------
 
+@traced("node.planner")
 def planner_node(state: AgentState):
 
     if state.get("step") is None:
@@ -45,14 +47,17 @@ def planner_node(state: AgentState):
 # 2. RETRIEVE NODE
 # -----------------------------------------------------
 
+@traced("node.retrieve")
 def retrieve_node(state: AgentState):
 
-    results = store.query(state["project_text"], top_k=5)
+    project_skills = extract_project_skills(state["project_text"])
 
-    candidates = list(zip(
-        results["ids"][0],
-        results["documents"][0]
-    ))
+    candidates = two_stage_retrieve(
+        get_store(),
+        state["project_text"],
+        project_skills,
+        expanded_skills=get_skill_ontology().expand(project_skills)
+    )
 
     return {**state, "candidates": candidates}
 
@@ -61,23 +66,12 @@ def retrieve_node(state: AgentState):
 # 3. SCORING NODE
 # -----------------------------------------------------
 
+@traced("node.scoring")
 def scoring_node(state: AgentState):
 
-    scored = []
-
-    for emp_id, profile in state["candidates"]:
-        llm_result = score_match(state["project_text"], profile)
-
-        acceptance = compute_acceptance_rate(emp_id)
-        adjusted_score = llm_result["match_score"] * acceptance
+    results = score_candidates(state["project_text"], state["candidates"])
 
-        llm_result["adjusted_score"] = adjusted_score
-
-        scored.append({
-            "emp_id": emp_id,
-            "profile": profile,
-            "result": llm_result
-        })
+    scored = adjust_scores(state["candidates"], results, state["project_text"])
 
     return {**state, "ranked_results": scored}
 
@@ -86,6 +80,7 @@ def scoring_node(state: AgentState):
 # 4. RANKING NODE
 # -----------------------------------------------------
 
+@traced("node.ranking")
 def ranking_node(state: AgentState):
 
     ranked = sorted(
@@ -101,27 +96,61 @@ def ranking_node(state: AgentState):
 # GRAPH BUILDING
 # -----------------------------------------------------
 
-builder = StateGraph(AgentState)
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def _build_graph():
+
+    from langgraph.graph import StateGraph, END
+
+    builder = StateGraph(AgentState)
+
+    builder.add_node("planner", planner_node)
+    builder.add_node("retrieve", retrieve_node)
+    builder.add_node("score", scoring_node)
+    builder.add_node("rank", ranking_node)
+
+    builder.set_entry_point("planner")
+
+    builder.add_edge("planner", "retrieve")
+    builder.add_edge("retrieve", "score")
+    builder.add_edge("score", "rank")
+    builder.add_edge("rank", END)
+
+    return builder.compile()
+
+
+def get_graph():
+    """
+    Compiles the graph on first use and reuses it afterwards.
+    """
+
+    global _graph
 
-builder.add_node("planner", planner_node)
-builder.add_node("retrieve", retrieve_node)
-builder.add_node("score", scoring_node)
-builder.add_node("rank", ranking_node)
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = _build_graph()
 
-builder.set_entry_point("planner")
+    return _graph
 
-builder.add_edge("planner", "retrieve")
-builder.add_edge("retrieve", "score")
-builder.add_edge("score", "rank")
-builder.add_edge("rank", END)
 
-agentic_graph = builder.compile()
+def __getattr__(name):
+    # `store` / `agentic_graph` used to be built at import time;
+    # keep them importable, but resolve them lazily
+    if name == "store":
+        return get_store()
+    if name == "agentic_graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # -----------------------------------------------------
 # MAIN EXECUTION FUNCTION
 # -----------------------------------------------------
 
+@traced("run_agent", root=True)
 def run_agent(project_text: str):
 
     state = {
@@ -132,7 +161,7 @@ def run_agent(project_text: str):
         "step": None
     }
 
-    final_state = agentic_graph.invoke(state)
+    final_state = get_graph().invoke(state)
 
     return final_state["ranked_results"]
 
@@ -1,10 +1,15 @@
-from langgraph.graph import StateGraph, END
+import threading
 from typing import TypedDict, List
-from agents.matcher_agent import score_match
-from agents.skill_extraction_agent import extract_structured_skills
-from tools.embedding_store import TalentVectorStore
-from agents.feedback_agent import compute_acceptance_rate
+from agents.matcher_agent import score_candidates, SCORING_WORKERS
+from agents.skill_extraction_agent import extract_structured_skills, extract_project_skills
+from tools.registry import get_store
+from tools.tracing import traced
+from tools.retrieval import two_stage_retrieve
+from agents.skill_graph import get_skill_ontology
+import agents.batch_matching as batch_matching
+from agents.batch_matching import adjust_scores
 from .llm_client import call_ollama
+from .planner_rules import rule_based_action
 
 
 class AgentState(TypedDict, total=False):
@@ -20,13 +25,19 @@ class AgentState(TypedDict, total=False):
     last_observation: str
     next_action: str
 
+    # Hybrid planner fields
+    retrieval_count: int
+    rank_complete: bool
+    reflection_done: bool
+    planner_llm_calls: int
+    planner_llm_calls_saved: int
 
 
-store = TalentVectorStore()
 MAX_ITERATIONS = 8
 
 
 
+@traced("node.planner")
 def planner_node(state: AgentState):
 
     iteration = state.get("iteration", 0)
@@ -35,6 +46,28 @@ def planner_node(state: AgentState):
     if iteration >= MAX_ITERATIONS:
         return {**state, "next_action": "finish"}
 
+    # -------------------------------------------------------
+    # Fast path: retrieve → score → rank → reflection have only one
+    # sensible next step, so take it without an LLM round trip.
+    # The LLM decides after reflection, or when a retrieval came back empty.
+    # -------------------------------------------------------
+    action = rule_based_action(state)
+    decision_point = action == "finish" or (
+        action == "retrieve" and state.get("retrieval_count", 0) > 0
+    )
+
+    if not decision_point:
+        scratchpad.append("Thought: Deterministic transition.")
+        scratchpad.append(f"Action: {action}")
+
+        return {
+            **state,
+            "scratchpad": scratchpad,
+            "next_action": action,
+            "iteration": iteration + 1,
+            "planner_llm_calls_saved": state.get("planner_llm_calls_saved", 0) + 1
+        }
+
     prompt = f"""
 You are an autonomous Talent Matching Agent using ReAct reasoning.
 
@@ -86,21 +119,25 @@ Respond EXACTLY in that format.
         **state,
         "scratchpad": scratchpad,
         "next_action": action,
-        "iteration": iteration + 1
+        "iteration": iteration + 1,
+        "planner_llm_calls": state.get("planner_llm_calls", 0) + 1
     }
 
 
 
 
 
+@traced("node.retrieve")
 def retrieve_node(state: AgentState):
 
-    results = store.query(state["project_text"], top_k=5)
+    project_skills = extract_project_skills(state["project_text"])
 
-    candidates = list(zip(
-        results["ids"][0],
-        results["documents"][0]
-    ))
+    candidates = two_stage_retrieve(
+        get_store(),
+        state["project_text"],
+        project_skills,
+        expanded_skills=get_skill_ontology().expand(project_skills)
+    )
 
     observation = f"Retrieved {len(candidates)} candidates."
 
@@ -108,28 +145,21 @@ def retrieve_node(state: AgentState):
         **state,
         "candidates": candidates,
         "ranked_results": [],
+        "retrieval_count": state.get("retrieval_count", 0) + 1,
+        "rank_complete": False,
+        "reflection_done": False,
         "last_observation": observation
     }
 
 
 
 
+@traced("node.scoring")
 def scoring_node(state: AgentState):
 
-    scored = []
-
-    for emp_id, profile in state["candidates"]:
-        llm_result = score_match(state["project_text"], profile)
-        acceptance = compute_acceptance_rate(emp_id)
-        adjusted_score = llm_result["match_score"] * acceptance
+    results = score_candidates(state["project_text"], state["candidates"])
 
-        llm_result["adjusted_score"] = adjusted_score
-
-        scored.append({
-            "emp_id": emp_id,
-            "profile": profile,
-            "result": llm_result
-        })
+    scored = adjust_scores(state["candidates"], results, state["project_text"])
 
     observation = f"Scored {len(scored)} candidates."
 
@@ -142,6 +172,7 @@ def scoring_node(state: AgentState):
 
 
 
+@traced("node.ranking")
 def ranking_node(state: AgentState):
 
     if not state.get("ranked_results"):
@@ -163,17 +194,20 @@ def ranking_node(state: AgentState):
     return {
         **state,
         "ranked_results": ranked,
+        "rank_complete": True,
         "last_observation": observation
     }
 
 
 
 
+@traced("node.reflection")
 def reflection_node(state: AgentState):
 
     if not state.get("ranked_results"):
         return {
             **state,
+            "reflection_done": True,
             "last_observation": "No ranked results available."
         }
 
@@ -186,6 +220,7 @@ def reflection_node(state: AgentState):
 
     return {
         **state,
+        "reflection_done": True,
         "last_observation": observation
     }
 
@@ -194,36 +229,69 @@ def reflection_node(state: AgentState):
 # GRAPH BUILDING
 # -----------------------------------------------------
 
-builder = StateGraph(AgentState)
-
-builder.add_node("planner", planner_node)
-builder.add_node("retrieve", retrieve_node)
-builder.add_node("score", scoring_node)
-builder.add_node("rank", ranking_node)
-builder.add_node("reflection", reflection_node)
-
-builder.set_entry_point("planner")
-
-builder.add_conditional_edges(
-    "planner",
-    lambda state: state["next_action"],
-    {
-        "retrieve": "retrieve",
-        "score": "score",
-        "rank": "rank",
-        "reflection": "reflection",
-        "finish": END,
-    }
-)
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def _build_graph():
+
+    from langgraph.graph import StateGraph, END
+
+    builder = StateGraph(AgentState)
+
+    builder.add_node("planner", planner_node)
+    builder.add_node("retrieve", retrieve_node)
+    builder.add_node("score", scoring_node)
+    builder.add_node("rank", ranking_node)
+    builder.add_node("reflection", reflection_node)
+
+    builder.set_entry_point("planner")
+
+    builder.add_conditional_edges(
+        "planner",
+        lambda state: state["next_action"],
+        {
+            "retrieve": "retrieve",
+            "score": "score",
+            "rank": "rank",
+            "reflection": "reflection",
+            "finish": END,
+        }
+    )
+
+
+    # 🔁 Loop back to planner after each step
+    builder.add_edge("retrieve", "planner")
+    builder.add_edge("score", "planner")
+    builder.add_edge("rank", "planner")
+    builder.add_edge("reflection", "planner")
 
+    return builder.compile()
 
-# 🔁 Loop back to planner after each step
-builder.add_edge("retrieve", "planner")
-builder.add_edge("score", "planner")
-builder.add_edge("rank", "planner")
-builder.add_edge("reflection", "planner")
 
-agentic_graph = builder.compile()
+def get_graph():
+    """
+    Compiles the graph on first use and reuses it afterwards.
+    """
+
+    global _graph
+
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = _build_graph()
+
+    return _graph
+
+
+def __getattr__(name):
+    # `store` / `agentic_graph` used to be built at import time;
+    # keep them importable, but resolve them lazily
+    if name == "store":
+        return get_store()
+    if name == "agentic_graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 
@@ -234,9 +302,9 @@ agentic_graph = builder.compile()
 
 
 
-def run_agent(project_text: str):
+def _initial_state(project_text: str) -> dict:
 
-    state = {
+    return {
         "goal": "Find best candidates",
         "project_text": project_text,
         "candidates": [],
@@ -246,17 +314,65 @@ def run_agent(project_text: str):
         # ReAct Memory
         "scratchpad": [],
         "last_observation": "",
-        "next_action": ""
+        "next_action": "",
+
+        # Hybrid planner bookkeeping
+        "retrieval_count": 0,
+        "rank_complete": False,
+        "reflection_done": False,
+        "planner_llm_calls": 0,
+        "planner_llm_calls_saved": 0
     }
 
-    final_state = agentic_graph.invoke(
+
+def _run_graph(state: dict):
+
+    final_state = get_graph().invoke(
         state,
         config={"recursion_limit": 50}
     )
 
+    print(
+        f"Planner: {final_state.get('planner_llm_calls', 0)} LLM calls, "
+        f"{final_state.get('planner_llm_calls_saved', 0)} saved by rules"
+    )
+    print("Query embedding cache:", get_store().query_cache.stats())
+
     return final_state.get("ranked_results", [])
 
 
+@traced("run_agent", root=True)
+def run_agent(project_text: str):
+
+    return _run_graph(_initial_state(project_text))
 
 
+def _resume_state(project_text: str, candidates: list, scored: list) -> dict:
 
+    return {
+        **_initial_state(project_text),
+        "candidates": candidates,
+        "ranked_results": scored,
+        "iteration": 2,    # retrieve + score already done
+        "retrieval_count": 1,
+        "scratchpad": [
+            "Thought: Deterministic transition.", "Action: retrieve",
+            "Thought: Deterministic transition.", "Action: score",
+        ],
+        "last_observation": f"Scored {len(scored)} candidates.",
+        "planner_llm_calls_saved": 2
+    }
+
+
+@traced("run_agent_batch", root=True)
+def run_agent_batch(projects: list, top_k=5, max_workers=SCORING_WORKERS) -> list:
+    """
+    Matches many projects in one pass (see batch_matching.run_agent_batch);
+    each project's ReAct loop resumes from ranking.
+
+    Returns one ranked result list per project, in input order.
+    """
+
+    return batch_matching.run_agent_batch(
+        projects, _run_graph, _resume_state, top_k=top_k, max_workers=max_workers
+    )
@@ -0,0 +1,164 @@
+# agents/batch_matching.py
+
+from concurrent.futures import ThreadPoolExecutor
+from agents.matcher_agent import (
+    apply_transferable_boosts,
+    score_pairs,
+    SCORING_WORKERS,
+    SCORING_TIMEOUT,
+    TRANSFERABLE_BOOST,
+)
+from agents.feedback_agent import acceptance_rates
+from agents.skill_extraction_agent import extract_project_skills
+from tools.registry import get_store
+from agents.llm_client import llm_concurrency
+from agents.skill_graph import get_skill_ontology
+from tools.tracing import in_context
+from tools.retrieval import two_stage_retrieve, PREFILTER_TOP_K, SHORTLIST_SIZE
+
+
+# -----------------------------------------------------
+# 1. FEEDBACK ADJUSTMENT
+# -----------------------------------------------------
+
+def adjust_scores(candidates: list, results: list, project_text: str = None) -> list:
+    """
+    [(emp_id, profile)] + LLM results → scored entries with
+    adjusted_score = boosted_score * acceptance rate.
+
+    boosted_score is match_score, plus the transferable-skill boost
+    (SKILL_GRAPH terms stored at ingest) when TRANSFERABLE_BOOST is on
+    and project_text is given.
+    """
+
+    scored = []
+
+    emp_ids = [emp_id for emp_id, _ in candidates]
+    acceptances = acceptance_rates(emp_ids)
+    base_scores = [llm_result["match_score"] for llm_result in results]
+
+    if TRANSFERABLE_BOOST and project_text is not None and candidates:
+        terms = get_store().graph_terms(emp_ids)
+        boosted = apply_transferable_boosts(
+            project_text,
+            [profile for _, profile in candidates],
+            base_scores,
+            employee_terms=[terms.get(emp_id) for emp_id in emp_ids]
+        ).tolist()
+    else:
+        boosted = base_scores
+
+    for (emp_id, profile), llm_result, boosted_score, acceptance in zip(candidates, results, boosted, acceptances):
+        llm_result["boosted_score"] = boosted_score
+        adjusted_score = boosted_score * float(acceptance)
+
+        llm_result["adjusted_score"] = adjusted_score
+
+        scored.append({
+            "emp_id": emp_id,
+            "profile": profile,
+            "result": llm_result
+        })
+
+    return scored
+
+
+# -----------------------------------------------------
+# 2. MULTI-PROJECT RETRIEVAL + SCORING
+# -----------------------------------------------------
+
+def retrieve_many(store, projects: list,
+                  shortlist=SHORTLIST_SIZE,
+                  top_k=PREFILTER_TOP_K) -> list:
+    """
+    The same retrieval as retrieve_node for every project: skill
+    pre-filter + ontology expansion through two_stage_retrieve.
+    Project embeddings are encoded in one batch up front (store.query
+    then hits the query cache), and the projects run concurrently.
+
+    Returns one [(emp_id, document), ...] shortlist per project.
+    """
+
+    if not projects:
+        return []
+
+    store.encode_queries(projects)
+
+    def retrieve(project_text):
+        project_skills = extract_project_skills(project_text)
+        return two_stage_retrieve(
+            store,
+            project_text,
+            project_skills,
+            top_k=top_k,
+            shortlist=shortlist,
+            expanded_skills=get_skill_ontology().expand(project_skills)
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, SCORING_WORKERS)) as executor:
+        futures = [executor.submit(in_context(retrieve), p) for p in projects]
+        return [future.result() for future in futures]
+
+
+def score_many(projects: list,
+               candidate_lists: list,
+               max_workers: int = SCORING_WORKERS,
+               timeout: float = SCORING_TIMEOUT) -> list:
+    """
+    Scores every (project, candidate) pair through a single bounded
+    worker pool, so all projects share one concurrency budget.
+    Returns one scored list per project (see adjust_scores).
+    """
+
+    pairs = [
+        (project_text, profile)
+        for project_text, candidates in zip(projects, candidate_lists)
+        for _, profile in candidates
+    ]
+
+    results = score_pairs(pairs, max_workers=max_workers, timeout=timeout)
+
+    scored = []
+    offset = 0
+
+    for project_text, candidates in zip(projects, candidate_lists):
+        scored.append(adjust_scores(candidates, results[offset:offset + len(candidates)], project_text))
+        offset += len(candidates)
+
+    return scored
+
+
+def run_agent_batch(projects: list,
+                    run_graph,
+                    initial_state,
+                    top_k=SHORTLIST_SIZE,
+                    max_workers: int = SCORING_WORKERS) -> list:
+    """
+    Matches many projects in one pass:
+    - project embeddings encoded in one batch
+    - every (project, candidate) pair scored through one shared worker pool
+    - at most max_workers LLM requests in flight across the whole batch
+    - each project's graph then resumes after scoring
+
+    run_graph(state) runs an orchestrator graph and returns its ranked
+    results; initial_state(project_text, candidates, scored) builds the
+    state it resumes from. Returns one ranked list per project, in order.
+    """
+
+    # One budget for every LLM call below: skill extraction, scoring,
+    # planner and reflection re-scoring all draw from max_workers slots
+    with llm_concurrency(max_workers):
+
+        candidate_lists = retrieve_many(get_store(), projects, shortlist=top_k)
+        scored_lists = score_many(projects, candidate_lists, max_workers=max_workers)
+
+        def resume(project_text, candidates, scored):
+            return run_graph(initial_state(project_text, candidates, scored))
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            # in_context per task: each project's spans nest under this trace
+            futures = [
+                executor.submit(in_context(resume), project_text, candidates, scored)
+                for project_text, candidates, scored in zip(projects, candidate_lists, scored_lists)
+            ]
+            return [future.result() for future in futures]
@@ -1,41 +1,160 @@
-import pandas as pd
-from datetime import datetime
+import csv
+import io
+import os
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from tools.tracing import span, traced
 
 FEEDBACK_FILE = "data/feedback.csv"
 
+NEUTRAL_PRIOR = 0.9
 
-def compute_acceptance_rate(emp_id: str) -> float:
+
+class FeedbackStore:
     """
-    Returns acceptance rate with smoothing.
-    Safe for:
-    - Missing file
-    - Empty file
-    - Case inconsistencies
+    In-memory index over FEEDBACK_FILE.
+
+    - Loads the CSV once and keeps per-emp_id accepted / total counters
+    - On each lookup, stats the file and parses only the bytes appended
+      since the last read (mtime + offset tracking)
+    - Reloads from scratch if the file shrinks or is replaced
     """
 
-    try:
-        df = pd.read_csv(FEEDBACK_FILE)
-    except FileNotFoundError:
-        return 0.9  # Neutral prior for new system
+    def __init__(self, path: str = FEEDBACK_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.accepted = defaultdict(int)
+        self.total = defaultdict(int)
+        self._offset = 0
+        self._mtime = None
+        self._inode = None
+        self._columns = None
+        self._tail = None    # (emp_id, accepted) of an unterminated last line
+
+    def refresh(self):
+
+        with self._lock:
+
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return
+
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                self._reset()
+                self._inode = st.st_ino
+
+            if st.st_mtime == self._mtime and self._tail is None and st.st_size == self._offset:
+                return
+
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+
+            self._mtime = st.st_mtime
+
+            # Only consume complete lines; an unterminated last line may be
+            # mid-write, so it is counted provisionally and re-read next time
+            end = data.rfind(b"\n") + 1
+            complete, tail = data[:end], data[end:]
+
+            for emp_id, accepted in self._parse(complete):
+                self.total[emp_id] += 1
+                self.accepted[emp_id] += accepted
+
+            self._offset += end
+
+            self._tail = None
+            if tail.strip():
+                rows = list(self._parse(tail, consume_header=False))
+                if rows:
+                    self._tail = rows[0]
+
+    def _parse(self, data: bytes, consume_header: bool = True):
+
+        reader = csv.reader(io.StringIO(data.decode("utf-8", errors="replace")))
 
-    if df.empty:
-        return 0.9
+        for row in reader:
 
-    # Filter employee
-    emp_feedback = df[df["emp_id"] == emp_id]
+            if not row:
+                continue
 
-    if emp_feedback.empty:
-        return 0.9  # New employee neutral weight
+            if self._columns is None:
+                if not consume_header:
+                    return
+                header = [c.strip() for c in row]
+                if "emp_id" not in header or "decision" not in header:
+                    return
+                self._columns = (header.index("emp_id"), header.index("decision"))
+                continue
 
-    # Case insensitive comparison
-    emp_feedback["decision"] = emp_feedback["decision"].str.lower()
+            emp_col, decision_col = self._columns
+            if len(row) <= max(emp_col, decision_col):
+                continue
 
-    accepted = emp_feedback[emp_feedback["decision"] == "accepted"]
+            # Case insensitive comparison
+            yield row[emp_col].strip(), int(row[decision_col].strip().lower() == "accepted")
 
-    total = len(emp_feedback)
+    def _counts(self, emp_id: str):
 
-    # --- Laplace Smoothing ---
-    # prevents extreme 0 or 1 for small sample sizes
-    smoothed_rate = (len(accepted) + 1) / (total + 2)
+        accepted = self.accepted.get(emp_id, 0)
+        total = self.total.get(emp_id, 0)
+
+        if self._tail is not None and self._tail[0] == emp_id:
+            accepted += self._tail[1]
+            total += 1
+
+        return accepted, total
+
+    def acceptance_rate(self, emp_id: str) -> float:
+        return float(self.acceptance_rates([emp_id])[0])
+
+    def acceptance_rates(self, emp_ids) -> np.ndarray:
+        """
+        Smoothed acceptance rate for a whole candidate batch.
+        Employees without feedback get the neutral prior.
+        """
+
+        with span("feedback.acceptance_rates", employees=len(emp_ids)):
+            self.refresh()
+
+            with self._lock:
+                counts = np.array(
+                    [self._counts(str(emp_id)) for emp_id in emp_ids],
+                    dtype=np.float64
+                ).reshape(-1, 2)
+
+        accepted, total = counts[:, 0], counts[:, 1]
+
+        # --- Laplace Smoothing ---
+        # prevents extreme 0 or 1 for small sample sizes
+        smoothed = (accepted + 1) / (total + 2)
+
+        return np.where(total > 0, smoothed, NEUTRAL_PRIOR)
+
+
+_feedback_store = FeedbackStore()
+
+
+def acceptance_rates(emp_ids) -> np.ndarray:
+    return _feedback_store.acceptance_rates(emp_ids)
+
+
+@traced("feedback.compute_acceptance_rate")
+def compute_acceptance_rate(emp_id: str) -> float:
+    """
+    Returns acceptance rate with smoothing.
+    Safe for:
+    - Missing file
+    - Empty file
+    - Case inconsistencies
+    """
 
-    return smoothed_rate
+    return _feedback_store.acceptance_rate(emp_id)
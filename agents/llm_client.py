@@ -1,17 +1,306 @@
+import asyncio
+import contextlib
+import contextvars
+import json
 import os
+import random
+import threading
+import time
+import weakref
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from tools.json_stream import JsonObjectScanner, extract_json_object
+from tools.tracing import span
 
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
 MODEL_NAME = os.getenv("MODEL_NAME", "llama3.2")
 
-def call_ollama(prompt: str) -> str:
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "600"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "0.5"))
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+# Stream JSON answers and hang up as soon as the object is complete
+LLM_STREAM = os.getenv("LLM_STREAM", "1") == "1"
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Also raised while reading a (streamed) body: dropped connection,
+# truncated chunk, malformed JSON line. Not every ValueError: a bad
+# OLLAMA_URL (InvalidURL, MissingSchema) should fail at once
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.JSONDecodeError,
+    json.JSONDecodeError,
+)
+
+
+# -------------------------------------------------------
+# 1. POOLED SESSION
+# -------------------------------------------------------
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    One keep-alive session per process, with enough pooled
+    connections for LLM_MAX_IN_FLIGHT concurrent calls.
+    """
+
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=max(LLM_MAX_IN_FLIGHT, 1)
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+
+    return _session
+
+
+# -------------------------------------------------------
+# 2. SHARED CONCURRENCY BUDGET
+# -------------------------------------------------------
+
+_llm_budget = contextvars.ContextVar("llm_budget", default=None)
+_held = threading.local()
+
+
+@contextlib.contextmanager
+def llm_concurrency(max_in_flight: int):
+    """
+    Caps the LLM requests made inside this block at max_in_flight at
+    once, however many worker pools are stacked underneath (threads
+    started through tracing.in_context inherit the budget). An
+    enclosing budget wins over a nested one.
+    """
+
+    if _llm_budget.get() is not None:
+        yield
+        return
+
+    token = _llm_budget.set(threading.BoundedSemaphore(max(1, max_in_flight)))
+    try:
+        yield
+    finally:
+        _llm_budget.reset(token)
+
+
+@contextlib.contextmanager
+def llm_slot():
+    """
+    Holds one slot of the current llm_concurrency budget. A no-op
+    outside a budget, or when this thread already holds a slot.
+    """
+
+    budget = _llm_budget.get()
+
+    if budget is None or getattr(_held, "slot", False):
+        yield
+        return
+
+    with budget:
+        _held.slot = True
+        try:
+            yield
+        finally:
+            _held.slot = False
+
+
+def _backoff(attempt: int):
+    # Exponential backoff with jitter: 0.5s, 1s, 2s, ...
+    delay = LLM_BACKOFF_SECONDS * (2 ** attempt)
+    time.sleep(delay + random.uniform(0, delay / 2))
+
+
+def _post(payload: dict, read_timeout: float, s, handle, stream: bool = False):
+    """
+    POSTs payload to Ollama and returns handle(response), retrying
+    RETRYABLE_STATUS and RETRYABLE_ERRORS (from the request or from
+    handle reading the body) with backoff, up to LLM_MAX_RETRIES times.
+
+    All attempts share one read_timeout budget: a retry only gets the
+    time that is left, so a model that hangs fails after about
+    read_timeout instead of (retries + 1) * read_timeout.
+    """
+
+    deadline = time.monotonic() + read_timeout
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        last_attempt = attempt == LLM_MAX_RETRIES
+        s.set(attempts=attempt + 1)
+        remaining = max(deadline - time.monotonic(), 1.0)
+
+        try:
+            with llm_slot(), get_session().post(
+                OLLAMA_URL, json=payload, timeout=(LLM_CONNECT_TIMEOUT, remaining), stream=stream
+            ) as response:
+                if response.status_code not in RETRYABLE_STATUS or last_attempt or time.monotonic() >= deadline:
+                    response.raise_for_status()
+                    return handle(response)
+        except RETRYABLE_ERRORS:
+            if last_attempt or time.monotonic() >= deadline:
+                raise
+
+        _backoff(attempt)
+
+
+# -------------------------------------------------------
+# 3. SYNC CLIENT
+# -------------------------------------------------------
+
+def call_ollama(prompt: str, timeout: float = None) -> str:
     payload = {
         "model": MODEL_NAME,
         "prompt": prompt,
         "stream": False
     }
 
-    response = requests.post(OLLAMA_URL, json=payload, timeout=600)
-    response.raise_for_status()
+    with span("llm.call_ollama", model=MODEL_NAME, prompt_chars=len(prompt)) as s:
+
+        def handle(response):
+            data = response.json()
+            # Ollama reports token counts with the final response
+            s.set(
+                prompt_tokens=data.get("prompt_eval_count", 0),
+                completion_tokens=data.get("eval_count", 0)
+            )
+            return data["response"]
+
+        return _post(payload, timeout or LLM_TIMEOUT, s, handle)
+
+
+# -------------------------------------------------------
+# 4. STREAMING JSON CLIENT (early termination)
+# -------------------------------------------------------
+
+def _stream_json(response, scanner: JsonObjectScanner, s):
+    """
+    Reads NDJSON chunks until scanner has its object. Ollama's token
+    counts only arrive with the final chunk, so an early stop records
+    stream_chunks (not tokens) and leaves completion_tokens unset.
+    """
+
+    chunks = 0
+
+    for line in response.iter_lines():
+        if not line:
+            continue
+
+        data = json.loads(line)
+        chunks += 1
+
+        if scanner.feed(data.get("response", "")) is not None:
+            # Closing the connection makes Ollama abort the generation,
+            # so no tokens are spent on prose after the JSON
+            s.set(early_stop=not data.get("done", False), stream_chunks=chunks)
+            if data.get("done"):
+                s.set(prompt_tokens=data.get("prompt_eval_count", 0), completion_tokens=data.get("eval_count", 0))
+            return scanner.result
+
+        if data.get("done"):
+            s.set(
+                early_stop=False,
+                stream_chunks=chunks,
+                prompt_tokens=data.get("prompt_eval_count", 0),
+                completion_tokens=data.get("eval_count", 0)
+            )
+            return None
+
+    return None
+
+
+def call_ollama_json(prompt: str, timeout: float = None, required_keys=()):
+    """
+    Calls the model and returns the first complete, valid JSON object
+    in its answer (with every key in required_keys), or None.
+
+    With LLM_STREAM on, tokens are parsed as they arrive and the
+    request is closed the moment the object is complete. Otherwise
+    this is call_ollama + a scan of the full text.
+    """
+
+    if not LLM_STREAM:
+        return extract_json_object(call_ollama(prompt, timeout=timeout), required_keys)
+
+    payload = {
+        "model": MODEL_NAME,
+        "prompt": prompt,
+        "stream": True
+    }
+
+    with span("llm.call_ollama", model=MODEL_NAME, prompt_chars=len(prompt), stream=True) as s:
+
+        # Fresh scanner per attempt: a retried stream starts over
+        return _post(
+            payload, timeout or LLM_TIMEOUT, s,
+            lambda response: _stream_json(response, JsonObjectScanner(required_keys), s),
+            stream=True
+        )
+
+
+# -------------------------------------------------------
+# 5. ASYNC CLIENT (bounded in-flight calls)
+# -------------------------------------------------------
+
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_semaphore(max_in_flight: int) -> asyncio.Semaphore:
+    # Semaphores belong to one event loop, so keep one set per loop
+    per_loop = _semaphores.setdefault(asyncio.get_running_loop(), {})
+
+    if max_in_flight not in per_loop:
+        per_loop[max_in_flight] = asyncio.Semaphore(max_in_flight)
+
+    return per_loop[max_in_flight]
+
+
+async def acall_ollama(prompt: str,
+                       timeout: float = None,
+                       max_in_flight: int = LLM_MAX_IN_FLIGHT) -> str:
+    """
+    Async call_ollama. At most max_in_flight requests run at once
+    per event loop; the rest wait their turn.
+    """
+
+    async with _get_semaphore(max_in_flight):
+        return await asyncio.to_thread(call_ollama, prompt, timeout)
+
+
+async def acall_ollama_many(prompts: list,
+                            timeout: float = None,
+                            max_in_flight: int = LLM_MAX_IN_FLIGHT,
+                            return_exceptions: bool = False) -> list:
+    """
+    Fire all prompts concurrently and gather responses in prompt order.
+    """
+
+    return await asyncio.gather(
+        *(acall_ollama(p, timeout, max_in_flight) for p in prompts),
+        return_exceptions=return_exceptions
+    )
+
+
+def call_ollama_many(prompts: list,
+                     timeout: float = None,
+                     max_in_flight: int = LLM_MAX_IN_FLIGHT,
+                     return_exceptions: bool = False) -> list:
+    """
+    Sync entry point for acall_ollama_many (for code outside an event loop).
+    """
 
-    return response.json()["response"]
+    return asyncio.run(
+        acall_ollama_many(prompts, timeout, max_in_flight, return_exceptions)
+    )
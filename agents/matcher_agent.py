@@ -1,12 +1,93 @@
-import json
-from .llm_client import call_ollama
-from .skill_graph import SKILL_GRAPH
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import threading
+from .llm_client import call_ollama_json, llm_slot, MODEL_NAME
+import numpy as np
+from .skill_graph import get_compiled_skill_graph, get_skill_ontology, ONTOLOGY_BOOST_WEIGHT
+from tools.score_cache import ScoreCache, SCORE_CACHE_DB, score_key
+from tools.tracing import span, current_span, in_context
+
+
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "4"))
+SCORING_TIMEOUT = float(os.getenv("SCORING_TIMEOUT", "180"))
+
+# Bump when a scoring prompt changes so cached scores are invalidated.
+# Batch answers are scored side by side, so they are cached apart from
+# single-candidate ones
+SCORING_PROMPT_VERSION = "v1"
+BATCH_SCORING_PROMPT_VERSION = "batch-v1"
+
+# Batched scoring (opt-in): several candidates per prompt, sized by a token
+# budget (keep it under the model's context window, e.g. Ollama's num_ctx)
+SCORING_BATCH = os.getenv("SCORING_BATCH", "0") == "1"
+SCORING_BATCH_TOKENS = int(os.getenv("SCORING_BATCH_TOKENS", "3000"))
+SCORING_BATCH_MAX = int(os.getenv("SCORING_BATCH_MAX", "8"))
+CHARS_PER_TOKEN = 4
+BATCH_PROMPT_TOKENS = 400           # instructions + JSON schema
+BATCH_TOKENS_PER_CANDIDATE = 80     # candidate header + its answer entry
+
+# Opt-in: add the transferable-skill boost to LLM match scores (see adjust_scores)
+TRANSFERABLE_BOOST = os.getenv("TRANSFERABLE_BOOST", "0") == "1"
+
+_score_cache = None
+_score_cache_lock = threading.Lock()
+
+
+def get_score_cache():
+    """
+    Process-wide ScoreCache, or None when SCORE_CACHE_DB is set to "".
+    """
+
+    global _score_cache
+
+    if _score_cache is None and SCORE_CACHE_DB:
+        with _score_cache_lock:
+            if _score_cache is None:
+                _score_cache = ScoreCache(SCORE_CACHE_DB)
+
+    return _score_cache
 
 
 # -------------------------------------------------------
 # 1. APPLY TRANSFERABLE SKILL BOOST
 # -------------------------------------------------------
 
+def apply_transferable_boosts(project_text: str,
+                              employee_texts: list,
+                              base_scores,
+                              employee_terms: list = None) -> np.ndarray:
+    """
+    Batch transferable-skill boost:
+    - SKILL_GRAPH boost over the compiled graph
+    - plus ONTOLOGY_BOOST_WEIGHT * the skill ontology's transfer score
+      (multi-hop similarity from the project's skills to the employee's)
+
+    employee_terms: optional precomputed "graph_terms" per employee
+    (from ingest); employees without them are tokenized here.
+
+    Returns boosted scores capped at 1.0.
+    """
+
+    graph = get_compiled_skill_graph()
+
+    if employee_terms is None:
+        employee_terms = [None] * len(employee_texts)
+
+    terms = [
+        known if known is not None else graph.match_terms(text)
+        for text, known in zip(employee_texts, employee_terms)
+    ]
+
+    boosted = np.asarray(base_scores, dtype=np.float64) + graph.boosts(project_text, terms)
+
+    if ONTOLOGY_BOOST_WEIGHT:
+        boosted += ONTOLOGY_BOOST_WEIGHT * get_skill_ontology().transfer_scores(project_text, employee_texts)
+
+    # Cap at 1.0
+    return np.minimum(boosted, 1.0)
+
+
 def apply_transferable_boost(project_text: str,
                              employee_text: str,
                              base_score: float) -> float:
@@ -16,39 +97,48 @@ def apply_transferable_boost(project_text: str,
     boost the score proportionally.
     """
 
-    boosted_score = base_score
+    return float(apply_transferable_boosts(project_text, [employee_text], [base_score])[0])
 
-    for skill, config in SKILL_GRAPH.items():
 
-        # Check if main skill is required in project
-        if skill.lower() in project_text.lower():
+# -------------------------------------------------------
+# 2. MAIN MATCH FUNCTION
+# -------------------------------------------------------
 
-            related_skills = config["related_skills"]
-            boost_weight = config["boost_weight"]
+def _failed_result(reason: str) -> dict:
+    return {
+        "match_score": 0.0,
+        "strengths": [],
+        "missing_skills": [],
+        "transferable_skills_reasoning": reason,
+        "final_recommendation": "Not Recommended"
+    }
 
-            # Count related skill matches
-            matched = sum(
-                1 for s in related_skills
-                if s.lower() in employee_text.lower()
-            )
 
-            if len(related_skills) > 0:
-                boost = (matched / len(related_skills)) * boost_weight
-                boosted_score += boost
+def score_match(project_text: str, employee_text: str, timeout: float = None) -> dict:
+    """
+    Uses LLM to compute base match score. The transferable-skill
+    boost is applied afterwards, per batch (see adjust_scores), so
+    cached scores do not depend on SKILL_GRAPH.
 
-    # Cap at 1.0
-    return min(boosted_score, 1.0)
+    Successful results are memoized on disk by
+    (project, profile, model, prompt version).
+    """
 
+    with span("llm.score_match"):
+        return _score_match(project_text, employee_text, timeout)
 
-# -------------------------------------------------------
-# 2. MAIN MATCH FUNCTION
-# -------------------------------------------------------
 
-def score_match(project_text: str, employee_text: str) -> dict:
-    """
-    Uses LLM to compute base match score,
-    then applies transferable skill boost.
-    """
+def _score_match(project_text: str, employee_text: str, timeout: float = None) -> dict:
+
+    cache = get_score_cache()
+    key = score_key(project_text, employee_text, MODEL_NAME, SCORING_PROMPT_VERSION)
+
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            current_span().add("cache_hits")
+            return cached
+        current_span().add("cache_misses")
 
     prompt = f"""
 You are an AI Talent Matching Agent.
@@ -77,39 +167,303 @@ Return STRICT JSON:
 }}
 """
 
-    response = call_ollama(prompt)
+    # Streamed; stops reading once the JSON object is complete
+    parsed_json = call_ollama_json(prompt, timeout=timeout, required_keys=("match_score",))
+
+    if parsed_json is None:
+        return _failed_result("Parsing failed")
+
+    parsed_json["match_score"] = parsed_json.get("match_score", 0.0)
+
+    if cache is not None:
+        cache.put(key, parsed_json)
+
+    return parsed_json
+
+
+# -------------------------------------------------------
+# 3. CONCURRENT SCORING
+# -------------------------------------------------------
+
+def _run_bounded(tasks: list, max_workers: int, timeout: float, on_failure) -> list:
+    """
+    Runs zero-argument callables concurrently, at most max_workers at
+    a time, each with `timeout` seconds from the moment it starts.
+    A task that raises or times out gets on_failure(reason).
+    Returns results in task order.
+    """
+
+    if not tasks:
+        return []
+
+    results = [None] * len(tasks)
+    started = {}
+
+    def task(i, fn):
+        # Under a shared llm_concurrency budget, waiting for a slot
+        # does not count against the timeout
+        with llm_slot():
+            started[i] = time.monotonic()
+            return fn()
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))))
 
-    # -------------------------------------------------------
-    # Extract JSON safely
-    # -------------------------------------------------------
     try:
-        start = response.find("{")
-        end = response.rfind("}") + 1
-        parsed_json = json.loads(response[start:end])
-    except Exception:
-        return {
-            "match_score": 0.0,
-            "strengths": [],
-            "missing_skills": [],
-            "transferable_skills_reasoning": "Parsing failed",
-            "final_recommendation": "Not Recommended"
+        futures = {
+            # in_context: the worker's spans nest under the caller's
+            executor.submit(in_context(task), i, fn): i
+            for i, fn in enumerate(tasks)
         }
+        pending = set(futures)
 
-    # -------------------------------------------------------
-    # Apply transferable skill boost
-    # -------------------------------------------------------
+        while pending:
+            now = time.monotonic()
+            running = [started[futures[f]] for f in pending if futures[f] in started]
+            next_deadline = min(running) + timeout - now if running else timeout
 
-    base_score = parsed_json.get("match_score", 0.0)
+            done, pending = wait(
+                pending,
+                timeout=max(0.0, min(next_deadline, 1.0)),
+                return_when=FIRST_COMPLETED
+            )
 
-    # boosted_score = apply_transferable_boost(
-    #     project_text,
-    #     employee_text,
-    #     base_score
-    # )
+            for future in done:
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = on_failure(f"Scoring failed: {e}")
 
-    parsed_json["match_score"] = base_score   #boosted_score
+            now = time.monotonic()
+            for future in list(pending):
+                i = futures[future]
+                if i in started and now - started[i] > timeout:
+                    results[i] = on_failure("Scoring timed out")
+                    pending.discard(future)
+    finally:
+        # Don't wait for abandoned (timed-out) calls
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    return parsed_json
+    return results
+
+
+def score_pairs(pairs: list,
+                max_workers: int = SCORING_WORKERS,
+                timeout: float = SCORING_TIMEOUT) -> list:
+    """
+    Scores [(project_text, profile), ...] concurrently.
+
+    - At most max_workers LLM calls in flight
+    - Each pair gets `timeout` seconds from the moment it starts
+    - A failed or timed-out pair gets a zero-score result;
+      the others are unaffected
+
+    Returns results in the same order as pairs.
+    """
+
+    return _run_bounded(
+        [
+            lambda project_text=project_text, profile=profile: score_match(project_text, profile, timeout=timeout)
+            for project_text, profile in pairs
+        ],
+        max_workers=max_workers,
+        timeout=timeout,
+        on_failure=_failed_result
+    )
+
+
+# -------------------------------------------------------
+# 4. BATCHED SCORING (several candidates per prompt)
+# -------------------------------------------------------
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def plan_batches(project_text: str, candidates: list,
+                 token_budget: int = SCORING_BATCH_TOKENS,
+                 max_batch: int = SCORING_BATCH_MAX) -> list:
+    """
+    Greedily packs [(emp_id, profile), ...] into batches whose prompt
+    (instructions + project + profiles) fits token_budget. A profile
+    that does not fit with anything else gets a batch of its own.
+    """
+
+    overhead = BATCH_PROMPT_TOKENS + estimate_tokens(project_text)
+    batches, current, used = [], [], overhead
+
+    for emp_id, profile in candidates:
+        cost = estimate_tokens(profile) + BATCH_TOKENS_PER_CANDIDATE
+        if current and (used + cost > token_budget or len(current) >= max_batch):
+            batches.append(current)
+            current, used = [], overhead
+        current.append((emp_id, profile))
+        used += cost
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def _batch_prompt(project_text: str, batch: list) -> str:
+
+    profiles = "\n\n".join(
+        f"### CANDIDATE emp_id={emp_id}\n{profile}" for emp_id, profile in batch
+    )
+
+    return f"""
+You are an AI Talent Matching Agent.
+
+PROJECT REQUIREMENTS:
+{project_text}
+
+CANDIDATES:
+{profiles}
+
+Instructions:
+- Score EVERY candidate independently against the project
+- Calculate match score between 0.0 and 1.0
+- Identify strengths
+- Identify missing skills
+- Consider transferable skills
+- Provide recommendation
+
+Return STRICT JSON with one entry per candidate, keyed by emp_id:
 
+{{
+  "results": [
+    {{
+      "emp_id": "<emp_id>",
+      "match_score": 0.0,
+      "strengths": [],
+      "missing_skills": [],
+      "transferable_skills_reasoning": "",
+      "final_recommendation": ""
+    }}
+  ]
+}}
+"""
+
+
+def _score_batch(project_text: str, batch: list, timeout: float = None) -> dict:
+    """
+    One LLM call for a whole batch → {emp_id: result} for every
+    well-formed entry; candidates missing from the answer are absent.
+    """
+
+    with span("llm.score_batch", candidates=len(batch)) as s:
+
+        parsed = call_ollama_json(_batch_prompt(project_text, batch), timeout=timeout,
+                                  required_keys=("results",))
+
+        wanted = {str(emp_id) for emp_id, _ in batch}
+        results = {}
+
+        entries = parsed.get("results") if parsed else None
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            emp_id = str(entry.get("emp_id", ""))
+            score = entry.get("match_score")
+            if emp_id in wanted and isinstance(score, (int, float)) and not isinstance(score, bool):
+                result = {key: value for key, value in entry.items() if key != "emp_id"}
+                result["match_score"] = float(score)
+                results[emp_id] = result
+
+        s.set(parsed=len(results))
+
+        return results
+
+
+def score_candidates_batched(project_text: str,
+                             candidates: list,
+                             max_workers: int = SCORING_WORKERS,
+                             timeout: float = SCORING_TIMEOUT,
+                             token_budget: int = SCORING_BATCH_TOKENS) -> list:
+    """
+    Batched version of score_candidates:
+
+    - Score-cache hits are served first (keyed with
+      BATCH_SCORING_PROMPT_VERSION, apart from score_match results)
+    - The rest are packed into prompts of at most token_budget tokens,
+      each candidate labelled with its emp_id, and scored concurrently,
+      one LLM call per batch
+    - Candidates a batch failed to return (malformed / missing entry,
+      error, timeout) are re-scored one at a time with score_match
+
+    Returns results in the same order as candidates.
+    """
+
+    cache = get_score_cache()
+    results = [None] * len(candidates)
+    keys = [score_key(project_text, profile, MODEL_NAME, BATCH_SCORING_PROMPT_VERSION) for _, profile in candidates]
+
+    pending = []
+    for i, ((emp_id, profile), key) in enumerate(zip(candidates, keys)):
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append(i)
+
+    current_span().add("cache_hits", len(candidates) - len(pending))
+    current_span().add("cache_misses", len(pending))
+
+    # One prompt entry per emp_id; its answer fills every position it holds
+    positions = {}
+    for i in pending:
+        positions.setdefault(str(candidates[i][0]), []).append(i)
+    batches = plan_batches(
+        project_text,
+        [(emp_id, candidates[indices[0]][1]) for emp_id, indices in positions.items()],
+        token_budget
+    )
+
+    batch_results = _run_bounded(
+        [
+            (lambda batch=batch: _score_batch(project_text, batch, timeout=timeout))
+            for batch in batches if len(batch) > 1
+        ],
+        max_workers=max_workers,
+        timeout=timeout,
+        on_failure=lambda reason: {}
+    )
+
+    for found in batch_results:
+        for emp_id, result in found.items():
+            for i in positions[emp_id]:
+                results[i] = dict(result)
+            if cache is not None:
+                cache.put(keys[positions[emp_id][0]], result)
+
+    # Single-candidate batches and anything a batch dropped
+    retry = [i for i in pending if results[i] is None]
+    for i, result in zip(retry, score_pairs(
+            [(project_text, candidates[i][1]) for i in retry],
+            max_workers=max_workers,
+            timeout=timeout)):
+        results[i] = result
+
+    return results
+
+
+def score_candidates(project_text: str,
+                     candidates: list,
+                     max_workers: int = SCORING_WORKERS,
+                     timeout: float = SCORING_TIMEOUT) -> list:
+    """
+    Scores [(emp_id, profile), ...] against one project concurrently
+    (see score_pairs, or score_candidates_batched when SCORING_BATCH
+    is on). Returns results in the same order as candidates.
+    """
 
+    if SCORING_BATCH and len(candidates) > 1:
+        return score_candidates_batched(project_text, candidates, max_workers=max_workers, timeout=timeout)
 
+    return score_pairs(
+        [(project_text, profile) for _, profile in candidates],
+        max_workers=max_workers,
+        timeout=timeout
+    )
@@ -0,0 +1,28 @@
+# agents/planner_rules.py
+
+# -----------------------------------------------------
+# DETERMINISTIC PLANNER TABLE
+# -----------------------------------------------------
+# retrieve → score → rank → reflection → finish
+#
+# Shared by the rule-based planner (agentic_orchestrator) and the
+# hybrid ReAct planner (agentic_orchestrator_up1), which only asks
+# the LLM once this table has nothing obvious left to do.
+
+
+def rule_based_action(state) -> str:
+
+    if not state.get("candidates"):
+        return "retrieve"
+
+    # Score if not yet scored
+    if not state.get("ranked_results"):
+        return "score"
+
+    if not state.get("rank_complete"):
+        return "rank"
+
+    if not state.get("reflection_done"):
+        return "reflection"
+
+    return "finish"
@@ -1,8 +1,18 @@
-from .llm_client import call_ollama
-import json
-import time
+from .llm_client import call_ollama_json
+from functools import lru_cache
+import requests
+from tools.skills import skill_names
+from tools.tracing import traced
 
-def extract_structured_skills(text):
+# Bump when the prompt below changes so cached extractions are invalidated
+PROMPT_VERSION = "v1"
+
+@traced("llm.extract_skills")
+def try_extract_structured_skills(text):
+    """
+    The model's structured skills for text, or None when its answer
+    held no valid JSON object.
+    """
     prompt = f"""
 Extract structured skill data from this resume or job description.
 
@@ -17,21 +27,51 @@ Return JSON:
 TEXT:
 {text}
 """ 
-    starttime = time.time()
-    response = call_ollama(prompt)
-    endtime = time.time()
-    print("execution time : ",endtime-starttime)
+    # Streamed; stops reading once the JSON object is complete
+    return call_ollama_json(prompt)
 
-    try:
-        start = response.find("{")
-        end = response.rfind("}") + 1
-        return json.loads(response[start:end])
-    except Exception:
-        return {
-            "primary_skills": [],
-            "secondary_skills": [],
-            "tools": [],
-            "experience_years": {}
-        }
 
+def empty_skills():
+    return {
+        "primary_skills": [],
+        "secondary_skills": [],
+        "tools": [],
+        "experience_years": {}
+    }
+
+
+def extract_structured_skills(text):
+
+    parsed = try_extract_structured_skills(text)
+
+    if parsed is not None:
+        return parsed
+
+    return empty_skills()
 
+
+@lru_cache(maxsize=256)
+def _project_skills(project_text: str) -> tuple:
+
+    parsed = try_extract_structured_skills(project_text)
+    if parsed is None:
+        raise ValueError("no valid JSON in the skill extraction answer")
+
+    return tuple(skill_names(parsed))
+
+
+def extract_project_skills(project_text: str) -> tuple:
+    """
+    Normalized skills required by a project, extracted once per
+    project text and reused across retrieval retries.
+
+    Returns () when the LLM call fails (outage, timeout, unparseable
+    answer), so retrieval falls back to plain ANN without the skill
+    pre-filter. Failures are not cached; the next retrieval retries.
+    """
+
+    try:
+        return _project_skills(project_text)
+    except (requests.RequestException, ValueError) as e:
+        print(f"Project skill extraction failed, retrieving without skill filter: {e}")
+        return ()
@@ -1,3 +1,13 @@
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+
 SKILL_GRAPH = {
     "Embedded Testing": {
         "related_skills": [
@@ -9,4 +19,494 @@ SKILL_GRAPH = {
         ],
         "boost_weight": 0.2
     }
-}
\ No newline at end of file
+}
+
+
+# -------------------------------------------------------
+# TOKEN INDEX
+# -------------------------------------------------------
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9]+)*")
+
+
+def tokenize(text: str) -> list:
+    """
+    "Python Automation, CI/CD" → ["python", "automation", "ci", "cd"]
+    """
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def phrase_key(phrase: str) -> str:
+    return " ".join(tokenize(phrase))
+
+
+def text_phrases(text: str, max_tokens: int) -> set:
+    """
+    Every 1..max_tokens token n-gram of text, so multi-word skills
+    are found with one set lookup each.
+    """
+
+    tokens = tokenize(text)
+    phrases = set()
+
+    for n in range(1, max_tokens + 1):
+        for i in range(len(tokens) - n + 1):
+            phrases.add(" ".join(tokens[i:i + n]))
+
+    return phrases
+
+
+# -------------------------------------------------------
+# SKILL ONTOLOGY (CSR adjacency + precomputed k-hop similarity)
+# -------------------------------------------------------
+
+SKILL_ONTOLOGY_PATH = os.getenv("SKILL_ONTOLOGY_PATH", "data/skill_ontology.json")
+ONTOLOGY_MAX_HOPS = int(os.getenv("ONTOLOGY_MAX_HOPS", "3"))
+ONTOLOGY_DECAY = float(os.getenv("ONTOLOGY_DECAY", "0.5"))
+# Precomputed similarity arrays, reused while the edges and settings match
+ONTOLOGY_CACHE_PATH = os.getenv("ONTOLOGY_CACHE_PATH", "data/skill_ontology.npz")
+# Opt-in matcher boost: weight * share of project skills the employee can
+# transfer from (0 leaves LLM match scores untouched)
+ONTOLOGY_BOOST_WEIGHT = float(os.getenv("ONTOLOGY_BOOST_WEIGHT", "0"))
+ONTOLOGY_BOOST_HOPS = int(os.getenv("ONTOLOGY_BOOST_HOPS", "2"))
+
+
+def load_ontology_edges(path: str) -> list:
+    """
+    Reads (source, target, weight) edges from:
+    - .json  SKILL_GRAPH format {"skill": {"related_skills": [...]}}
+             or {"edges": [[source, target, weight?], ...]}
+    - .csv / .tsv  source,target[,weight] rows (optional header)
+    """
+
+    edges = []
+
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if isinstance(data, dict) and "edges" in data:
+            for edge in data["edges"]:
+                edges.append((edge[0], edge[1], float(edge[2]) if len(edge) > 2 else 1.0))
+        else:
+            for skill, config in data.items():
+                for related in config.get("related_skills", []):
+                    edges.append((skill, related, 1.0))
+
+        return edges
+
+    delimiter = "\t" if path.endswith(".tsv") else ","
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f, delimiter=delimiter):
+            if len(row) < 2 or row[0].strip().lower() in ("source", "skill"):
+                continue
+            try:
+                weight = float(row[2]) if len(row) > 2 and row[2].strip() else 1.0
+            except ValueError:
+                weight = 1.0
+            edges.append((row[0], row[1], weight))
+
+    return edges
+
+
+class SkillOntology:
+    """
+    Skill graph with thousands of nodes and multi-hop relations.
+
+    Adjacency (undirected, CSR):
+        neighbors of i = indices[indptr[i]:indptr[i + 1]]
+
+    Similarity (precomputed once, CSR sorted by hop count then score):
+        sim(path) = product of edge weights * decay ** (hops - 1)
+        best path per pair, shortest hop count first, up to max_hops
+
+    hop_end[i, k] marks where skill i's entries within k hops end, so
+    "related skills within k hops" is a single array slice.
+
+    similarity: arrays from a previous build (see load), which skips
+    the all-pairs traversal.
+    """
+
+    SIMILARITY_ARRAYS = ("sim_indptr", "sim_indices", "sim_values", "sim_hops", "hop_end")
+
+    def __init__(self, edges: list, max_hops=ONTOLOGY_MAX_HOPS, decay=ONTOLOGY_DECAY, similarity=None):
+
+        self.max_hops = max_hops
+        self.decay = decay
+        self.names = []
+        self.index = {}
+
+        def node(name):
+            key = phrase_key(name)
+            if key not in self.index:
+                self.index[key] = len(self.names)
+                self.names.append(str(name).strip())
+            return self.index[key]
+
+        pairs = {}
+        for source, target, weight in edges:
+            if not phrase_key(source) or not phrase_key(target):
+                continue
+            a, b = node(source), node(target)
+            if a == b:
+                continue
+            for edge in ((a, b), (b, a)):
+                pairs[edge] = max(pairs.get(edge, 0.0), float(weight))
+
+        n = len(self.names)
+        order = sorted(pairs)
+
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        self.indices = np.array([b for _, b in order], dtype=np.int32)
+        self.weights = np.array([pairs[e] for e in order], dtype=np.float32)
+        np.add.at(self.indptr, np.array([a for a, _ in order], dtype=np.int64) + 1, 1)
+        self.indptr = np.cumsum(self.indptr)
+
+        self.max_tokens = max([len(key.split()) for key in self.index] or [1])
+
+        if similarity is None:
+            self._precompute_similarity()
+        else:
+            for name in self.SIMILARITY_ARRAYS:
+                setattr(self, name, similarity[name])
+
+    @staticmethod
+    def cache_key(edges: list, max_hops=ONTOLOGY_MAX_HOPS, decay=ONTOLOGY_DECAY) -> str:
+
+        digest = hashlib.sha256(json.dumps([max_hops, decay]).encode("utf-8"))
+        for source, target, weight in edges:
+            digest.update(json.dumps([str(source), str(target), float(weight)]).encode("utf-8"))
+
+        return digest.hexdigest()
+
+    def save(self, path: str, key: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(path, key=np.array(key), **{name: getattr(self, name) for name in self.SIMILARITY_ARRAYS})
+
+    @classmethod
+    def load(cls, path: str, edges: list, max_hops=ONTOLOGY_MAX_HOPS, decay=ONTOLOGY_DECAY):
+        """
+        Builds from edges, reusing the similarity arrays saved at path
+        when they were computed from the same edges and settings.
+        """
+
+        key = cls.cache_key(edges, max_hops, decay)
+
+        if path and os.path.exists(path):
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    if str(data["key"]) == key:
+                        return cls(edges, max_hops, decay, similarity={n: data[n] for n in cls.SIMILARITY_ARRAYS})
+            except (OSError, ValueError, KeyError):
+                pass  # unreadable cache: rebuild
+
+        ontology = cls(edges, max_hops, decay)
+        if path:
+            ontology.save(path, key)
+
+        return ontology
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs):
+        return cls(load_ontology_edges(path), **kwargs)
+
+    @classmethod
+    def from_skill_graph(cls, graph: dict = SKILL_GRAPH, **kwargs):
+        return cls([
+            (skill, related, 1.0)
+            for skill, config in graph.items()
+            for related in config["related_skills"]
+        ], **kwargs)
+
+    def neighbors(self, i: int):
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def _precompute_similarity(self):
+
+        n = len(self.names)
+        sim_ptr = [0]
+        sim_idx, sim_val, sim_hops = [], [], []
+        self.hop_end = np.zeros((n, self.max_hops + 1), dtype=np.int64)
+
+        for source in range(n):
+            visited = {source}
+            frontier = {source: 1.0}
+            row = []
+
+            for hop in range(1, self.max_hops + 1):
+                step_decay = self.decay if hop > 1 else 1.0
+                reached = {}
+
+                for u, score in frontier.items():
+                    indices, weights = self.neighbors(u)
+                    for v, w in zip(indices.tolist(), weights.tolist()):
+                        if v in visited:
+                            continue
+                        candidate = score * w * step_decay
+                        if candidate > reached.get(v, 0.0):
+                            reached[v] = candidate
+
+                for v, score in sorted(reached.items(), key=lambda x: -x[1]):
+                    row.append((v, score, hop))
+
+                visited.update(reached)
+                frontier = reached
+                self.hop_end[source, hop] = sim_ptr[-1] + len(row)
+
+                if not frontier:
+                    self.hop_end[source, hop + 1:] = sim_ptr[-1] + len(row)
+                    break
+
+            self.hop_end[source, 0] = sim_ptr[-1]
+            sim_idx.extend(v for v, _, _ in row)
+            sim_val.extend(score for _, score, _ in row)
+            sim_hops.extend(hop for _, _, hop in row)
+            sim_ptr.append(sim_ptr[-1] + len(row))
+
+        self.sim_indptr = np.array(sim_ptr, dtype=np.int64)
+        self.sim_indices = np.array(sim_idx, dtype=np.int32)
+        self.sim_values = np.array(sim_val, dtype=np.float32)
+        self.sim_hops = np.array(sim_hops, dtype=np.int8)
+
+    def related_indices(self, skill: str, k: int = 1):
+        """
+        (indices, similarities) of skills within k hops — array views, O(1).
+        """
+
+        i = self.index.get(phrase_key(skill))
+        if i is None:
+            return self.sim_indices[:0], self.sim_values[:0]
+
+        start = self.sim_indptr[i]
+        end = self.hop_end[i, min(max(k, 0), self.max_hops)]
+
+        return self.sim_indices[start:end], self.sim_values[start:end]
+
+    def related(self, skill: str, k: int = 1, min_similarity: float = 0.0) -> list:
+        """
+        [(skill name, similarity), ...] within k hops, nearest first.
+        """
+
+        indices, values = self.related_indices(skill, k)
+
+        return [
+            (self.names[i], round(float(v), 4))
+            for i, v in zip(indices.tolist(), values.tolist())
+            if v >= min_similarity
+        ]
+
+    def similarity(self, a: str, b: str) -> float:
+
+        j = self.index.get(phrase_key(b))
+        if j is None:
+            return 0.0
+        if self.index.get(phrase_key(a)) == j:
+            return 1.0
+
+        indices, values = self.related_indices(a, self.max_hops)
+        hit = np.flatnonzero(indices == j)
+
+        return round(float(values[hit[0]]), 4) if hit.size else 0.0
+
+    def expand(self, skills: list, k: int = 1, min_similarity: float = 0.5) -> list:
+        """
+        skills + their related skills within k hops, for retrieval expansion.
+        """
+
+        expanded = list(skills)
+        seen = {phrase_key(s) for s in skills}
+
+        for skill in skills:
+            for name, _ in self.related(skill, k, min_similarity):
+                if phrase_key(name) not in seen:
+                    seen.add(phrase_key(name))
+                    expanded.append(name)
+
+        return expanded
+
+    def match_skills(self, text: str) -> list:
+        """
+        Indices of the ontology skills mentioned in text.
+        """
+
+        return sorted({self.index[p] for p in text_phrases(text, self.max_tokens) if p in self.index})
+
+    def transfer_scores(self, project_text: str, employee_texts: list, k: int = ONTOLOGY_BOOST_HOPS) -> np.ndarray:
+        """
+        Per employee: sum over the project's skills the employee lacks of
+        the best similarity (within k hops) to a skill they have, divided
+        by the number of project skills. 0.0 when the project names none.
+        """
+
+        scores = np.zeros(len(employee_texts), dtype=np.float64)
+        project = self.match_skills(project_text)
+        if not project:
+            return scores
+
+        # One dense similarity row per project skill
+        rows = np.zeros((len(project), len(self.names)), dtype=np.float32)
+        for r, i in enumerate(project):
+            start = self.sim_indptr[i]
+            end = self.hop_end[i, min(max(k, 0), self.max_hops)]
+            rows[r, self.sim_indices[start:end]] = self.sim_values[start:end]
+
+        for j, text in enumerate(employee_texts):
+            have = self.match_skills(text)
+            if not have:
+                continue
+            held = set(have)
+            missing = [r for r, i in enumerate(project) if i not in held]
+            if missing:
+                scores[j] = rows[np.ix_(missing, have)].max(axis=1).sum() / len(project)
+
+        return scores
+
+
+_ontology = None
+_ontology_lock = threading.Lock()
+
+
+def get_skill_ontology() -> SkillOntology:
+    """
+    SKILL_ONTOLOGY_PATH if present (plus SKILL_GRAPH's own edges),
+    otherwise just SKILL_GRAPH. Built once per process; the similarity
+    precompute is cached in ONTOLOGY_CACHE_PATH across processes.
+    """
+
+    global _ontology
+
+    if _ontology is None:
+        with _ontology_lock:
+            if _ontology is None:
+                edges = [
+                    (skill, related, 1.0)
+                    for skill, config in SKILL_GRAPH.items()
+                    for related in config["related_skills"]
+                ]
+                if SKILL_ONTOLOGY_PATH and os.path.exists(SKILL_ONTOLOGY_PATH):
+                    edges += load_ontology_edges(SKILL_ONTOLOGY_PATH)
+                _ontology = SkillOntology.load(ONTOLOGY_CACHE_PATH, edges)
+
+    return _ontology
+
+
+# -------------------------------------------------------
+# COMPILED BOOST ENGINE
+# -------------------------------------------------------
+
+class CompiledSkillGraph:
+    """
+    SKILL_GRAPH compiled once into:
+    - skill_index  : normalized main-skill phrase → row      (S)
+    - term_index   : normalized related-skill phrase → col   (T)
+    - relation     : S x T 0/1 matrix in CSR form
+                     (rel_indptr / rel_indices)
+    - weights      : boost_weight / len(related_skills)      (S)
+
+    For a project with skill presence vector P and employees with
+    term presence matrix E (N x T):
+
+        boosts = E @ ((P * weights) @ relation)
+
+    which is the same boost apply_transferable_boost used to compute
+    with substring scans, for the whole batch in one pass.
+    """
+
+    def __init__(self, graph: dict = SKILL_GRAPH):
+
+        self.skills = list(graph)
+        self.skill_index = {}
+        self.terms = []
+        self.term_index = {}
+
+        for s, skill in enumerate(self.skills):
+            key = phrase_key(skill)
+            if key:
+                self.skill_index.setdefault(key, []).append(s)
+
+        rel_indptr = [0]
+        rel_indices = []
+        self.weights = np.zeros(len(self.skills), dtype=np.float64)
+
+        for s, config in enumerate(graph.values()):
+            related = config["related_skills"]
+            cols = []
+            for name in related:
+                key = phrase_key(name)
+                if not key:
+                    continue
+                if key not in self.term_index:
+                    self.term_index[key] = len(self.terms)
+                    self.terms.append(key)
+                if self.term_index[key] not in cols:
+                    cols.append(self.term_index[key])
+            rel_indices.extend(cols)
+            rel_indptr.append(len(rel_indices))
+            if related:
+                self.weights[s] = config["boost_weight"] / len(related)
+
+        self.rel_indptr = np.array(rel_indptr, dtype=np.int64)
+        self.rel_indices = np.array(rel_indices, dtype=np.int64)
+
+        self.max_tokens = max(
+            [len(k.split()) for k in list(self.skill_index) + self.terms] or [1]
+        )
+
+    def match_terms(self, text: str) -> list:
+        """
+        Related-skill terms present in text. Computed once per employee
+        at ingest and stored as the "graph_terms" metadata field.
+        """
+
+        phrases = text_phrases(text, self.max_tokens)
+
+        return sorted(
+            (p for p in phrases if p in self.term_index),
+            key=self.term_index.get
+        )
+
+    def project_skills(self, project_text: str) -> list:
+
+        phrases = text_phrases(project_text, self.max_tokens)
+
+        return [s for p in phrases if p in self.skill_index for s in self.skill_index[p]]
+
+    def term_matrix(self, employee_terms: list) -> np.ndarray:
+
+        matrix = np.zeros((len(employee_terms), len(self.terms)), dtype=np.float64)
+
+        for row, terms in enumerate(employee_terms):
+            cols = [self.term_index[t] for t in terms if t in self.term_index]
+            matrix[row, cols] = 1.0
+
+        return matrix
+
+    def boosts(self, project_text: str, employee_terms: list) -> np.ndarray:
+
+        coefficients = np.zeros(len(self.terms), dtype=np.float64)
+
+        for s in self.project_skills(project_text):
+            cols = self.rel_indices[self.rel_indptr[s]:self.rel_indptr[s + 1]]
+            coefficients[cols] += self.weights[s]
+
+        return self.term_matrix(employee_terms) @ coefficients
+
+
+_compiled = None
+_compiled_lock = threading.Lock()
+
+
+def get_compiled_skill_graph() -> CompiledSkillGraph:
+
+    global _compiled
+
+    if _compiled is None:
+        with _compiled_lock:
+            if _compiled is None:
+                _compiled = CompiledSkillGraph(SKILL_GRAPH)
+
+    return _compiled
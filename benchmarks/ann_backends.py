@@ -0,0 +1,121 @@
+"""
+Recall@k and query latency: Chroma vs the memory-mapped backend.
+
+    PYTHONPATH=. python benchmarks/ann_backends.py --size 10000 --dim 384
+
+Vectors are synthetic (clustered, normalized), so the embedding model
+is not needed. Ground truth is an exact float32 dot-product scan.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from tools.mmap_backend import MmapCollection
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int = 64, seed: int = 0) -> np.ndarray:
+
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.normal(size=(n, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return vectors.astype(np.float32)
+
+
+def percentiles(samples: list) -> dict:
+    ms = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+    }
+
+
+def run_backend(name, collection, vectors, queries, truth, k, batch=5000):
+
+    ids = [str(i) for i in range(len(vectors))]
+
+    start = time.perf_counter()
+    for i in range(0, len(ids), batch):
+        collection.upsert(
+            ids=ids[i:i + batch],
+            embeddings=vectors[i:i + batch].tolist() if name == "chroma" else vectors[i:i + batch],
+            metadatas=[{"n": j} for j in range(i, min(i + batch, len(ids)))]
+        )
+    build_seconds = time.perf_counter() - start
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=["distances"])
+        latencies.append(time.perf_counter() - start)
+        hits += len(set(map(int, result["ids"][0])) & set(expected.tolist()))
+
+    return {
+        "backend": name,
+        "build_seconds": round(build_seconds, 3),
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        **percentiles(latencies),
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--output", default="benchmarks/results/ann_backends.json")
+    parser.add_argument("--skip-chroma", action="store_true")
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.size, args.dim)
+    queries = synthetic_vectors(args.queries, args.dim, seed=1)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+
+    workdir = tempfile.mkdtemp(prefix="ann_bench_")
+    results = []
+
+    try:
+        if not args.skip_chroma:
+            import chromadb
+
+            client = chromadb.PersistentClient(path=os.path.join(workdir, "chroma"))
+            collection = client.get_or_create_collection(name="bench")
+            results.append(run_backend("chroma", collection, vectors, queries, truth, args.k,
+                                       batch=min(5000, client.get_max_batch_size())))
+
+        for quantization in ("none", "int8", "binary"):
+            # hnswlib is optional; without it only the quantized scans run
+            for use_hnsw in (False, True) if importlib.util.find_spec("hnswlib") else (False,):
+                name = f"mmap-{quantization}" + ("-hnsw" if use_hnsw else "")
+                collection = MmapCollection(os.path.join(workdir, name), quantization=quantization,
+                                            use_hnsw=use_hnsw)
+                results.append(run_backend(name, collection, vectors, queries, truth, args.k))
+                collection.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for row in results:
+        print(row)
+
+    report = {"size": args.size, "dim": args.dim, "queries": args.queries, "k": args.k, "results": results}
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print("Saved", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Synthetic CV / project corpora for the benchmarks.
+
+Every CV is a plain-text file with blank-line separated sections
+(summary, skills, experience, projects), so ingestion exercises the
+same parse → extract → chunk → embed path as real profiles.
+"""
+
+import os
+import random
+
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "go", "rust", "c++", "sql",
+    "docker", "kubernetes", "jenkins", "git", "github", "bitbucket", "terraform",
+    "ansible", "aws", "azure", "gcp", "linux", "bash", "react", "angular",
+    "django", "flask", "spring", "kafka", "spark", "airflow", "postgresql",
+    "mongodb", "redis", "elasticsearch", "prometheus", "grafana", "tensorflow",
+    "pytorch", "pandas", "ci/cd", "microservices",
+]
+
+ROLES = [
+    "DevOps Engineer", "Backend Developer", "Data Engineer", "Frontend Developer",
+    "Site Reliability Engineer", "Machine Learning Engineer", "Cloud Architect",
+    "Full Stack Developer", "Platform Engineer", "QA Automation Engineer",
+]
+
+_FILLER = (
+    "delivered owned migrated designed automated improved reduced scaled "
+    "maintained reviewed mentored coordinated the a an for with across "
+    "team release pipeline service platform latency throughput cost incident "
+    "customer stakeholder backlog sprint roadmap production staging rollout"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_FILLER) for _ in range(words)).capitalize() + "."
+
+
+def make_cv(index: int, rng: random.Random) -> str:
+
+    role = rng.choice(ROLES)
+    skills = rng.sample(SKILLS, rng.randint(4, 10))
+    years = {skill: rng.randint(1, 12) for skill in skills}
+
+    experience = "\n".join(
+        f"- {rng.randint(1, 8)} years as {rng.choice(ROLES)} using "
+        f"{', '.join(rng.sample(skills, min(3, len(skills))))}. {_sentence(rng, 20)}"
+        for _ in range(rng.randint(2, 5))
+    )
+    projects = "\n\n".join(
+        f"Project {p + 1}: " + " ".join(_sentence(rng, rng.randint(12, 25)) for _ in range(rng.randint(3, 8)))
+        for p in range(rng.randint(1, 4))
+    )
+
+    return (
+        f"Employee {index:06d} - {role}\n\n"
+        f"Summary\n{_sentence(rng, 30)} {_sentence(rng, 25)}\n\n"
+        f"Skills\n" + ", ".join(f"{s} ({years[s]} years)" for s in skills) + "\n\n"
+        f"Experience\n{experience}\n\n"
+        f"Projects\n{projects}\n"
+    )
+
+
+def make_project(rng: random.Random) -> str:
+
+    skills = rng.sample(SKILLS, rng.randint(3, 6))
+
+    return (
+        f"We need a {rng.choice(ROLES)} for a new initiative.\n"
+        + "\n".join(f"Hands-on experience with {s}." for s in skills)
+        + f"\n{_sentence(rng, 20)}"
+    )
+
+
+def generate_corpus(directory: str, size: int, seed: int = 0) -> str:
+    """
+    Writes `size` CVs as emp_<n>.txt under directory (skipped when
+    they already exist) and returns the directory.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    existing = {name for name in os.listdir(directory) if name.endswith(".txt")}
+    rng = random.Random(seed)
+
+    for i in range(size):
+        # Draw every CV so the corpus is identical however much already exists
+        text = make_cv(i, rng)
+        name = f"emp_{i:06d}.txt"
+        if name in existing:
+            continue
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    return directory
+
+
+def generate_projects(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    return [make_project(rng) for _ in range(count)]
@@ -0,0 +1,206 @@
+"""
+Local stand-in for Ollama's /api/generate.
+
+    PYTHONPATH=. python benchmarks/mock_ollama.py --port 11500 --latency 0.05
+    OLLAMA_URL=http://127.0.0.1:11500/api/generate python main.py ...
+
+Answers are canned but shaped like the real prompts expect:
+- skill extraction → structured skills found in the text
+- match scoring    → deterministic match_score per (project, profile),
+                     or a "results" array for batched scoring prompts
+- ReAct planner    → "Action: finish"
+Supports "stream": true (newline-delimited JSON chunks). --trailing-chars
+appends prose after the answer, and --token-latency charges per streamed
+chunk, to mimic models that keep talking after the JSON closes.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.corpus import SKILLS
+
+
+_SKILL_RE = re.compile(
+    r"(?<![\w+/])(" + "|".join(re.escape(s) for s in sorted(SKILLS, key=len, reverse=True)) + r")(?![\w+/])",
+    re.IGNORECASE
+)
+_YEARS_RE = re.compile(r"([\w+/#.]+) \((\d+) years\)")
+
+
+def _extraction(text: str) -> dict:
+
+    found = list(dict.fromkeys(m.lower() for m in _SKILL_RE.findall(text)))
+    years = {skill.lower(): int(n) for skill, n in _YEARS_RE.findall(text)}
+
+    return {
+        "primary_skills": found[:5],
+        "secondary_skills": found[5:10],
+        "tools": [],
+        "experience_years": {s: years[s] for s in found if s in years}
+    }
+
+
+def _scoring(prompt: str) -> dict:
+
+    project, _, profile = prompt.partition("EMPLOYEE PROFILE:")
+    wanted = {m.lower() for m in _SKILL_RE.findall(project)}
+    have = {m.lower() for m in _SKILL_RE.findall(profile)}
+    # Overlap plus a stable per-pair jitter
+    jitter = int(hashlib.md5(prompt.encode("utf-8")).hexdigest()[:4], 16) / 0xFFFF * 0.1
+    score = round(min(1.0, len(wanted & have) / max(len(wanted), 1) * 0.9 + jitter), 3)
+
+    return {
+        "match_score": score,
+        "strengths": sorted(wanted & have),
+        "missing_skills": sorted(wanted - have),
+        "transferable_skills_reasoning": "synthetic",
+        "final_recommendation": "Recommended" if score >= 0.6 else "Not a strong fit"
+    }
+
+
+_CANDIDATE_RE = re.compile(r"^### CANDIDATE emp_id=(\S+)$", re.MULTILINE)
+
+
+def _batch_scoring(prompt: str) -> dict:
+
+    project, _, rest = prompt.partition("CANDIDATES:")
+    profiles, _, _ = rest.partition("Instructions:")
+    parts = _CANDIDATE_RE.split(profiles)[1:]
+
+    return {"results": [
+        {"emp_id": emp_id, **_scoring(f"{project}EMPLOYEE PROFILE:{profile}")}
+        for emp_id, profile in zip(parts[0::2], parts[1::2])
+    ]}
+
+
+def canned_response(prompt: str) -> str:
+
+    if "Extract structured skill data" in prompt:
+        return json.dumps(_extraction(prompt.split("TEXT:", 1)[-1]))
+    if "CANDIDATES:" in prompt:
+        return json.dumps(_batch_scoring(prompt))
+    if "EMPLOYEE PROFILE:" in prompt:
+        return json.dumps(_scoring(prompt))
+    if "Action:" in prompt:
+        return "Thought: Enough candidates were ranked.\nAction: finish"
+
+    return "{}"
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.0, jitter: float = 0.0, stream_chunk: int = 16,
+                 token_latency: float = 0.0, trailing_chars: int = 0):
+        super().__init__(address, MockOllamaHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.stream_chunk = stream_chunk
+        self.token_latency = token_latency
+        self.trailing_chars = trailing_chars
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+
+        if self.path.rstrip("/") != "/api/generate":
+            self.send_error(404)
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        payload = json.loads(body or b"{}")
+        server = self.server
+
+        with server._lock:
+            server.requests += 1
+
+        time.sleep(server.latency + random.uniform(0, server.jitter))
+
+        prompt = payload.get("prompt", "")
+        response = canned_response(prompt)
+        if server.trailing_chars:
+            response += "\n\nExplanation: " + ("the candidate profile was compared in detail. " * 64)[:server.trailing_chars]
+        chunks = range(0, len(response), server.stream_chunk)
+        model = payload.get("model", "mock")
+        # Rough token counts (~4 characters per token), reported like Ollama does
+        counts = {"prompt_eval_count": len(prompt) // 4, "eval_count": len(response) // 4}
+
+        self.send_response(200)
+
+        if not payload.get("stream", True):
+            # The whole completion is generated before anything is sent
+            time.sleep(server.token_latency * len(chunks))
+            data = json.dumps({"model": model, "response": response, "done": True, **counts}).encode("utf-8")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        # Ollama streams by default: one JSON object per line
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            for start in chunks:
+                time.sleep(server.token_latency)
+                piece = response[start:start + server.stream_chunk]
+                self.wfile.write((json.dumps({"model": model, "response": piece, "done": False}) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write((json.dumps({"model": model, "response": "", "done": True, **counts}) + "\n").encode("utf-8"))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client cancelled the stream early
+        self.close_connection = True
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0,
+                      latency: float = 0.0, jitter: float = 0.0,
+                      token_latency: float = 0.0, trailing_chars: int = 0) -> MockOllamaServer:
+    """
+    Serves in a daemon thread; port=0 picks a free port (see server.url).
+    """
+
+    server = MockOllamaServer((host, port), latency=latency, jitter=jitter,
+                              token_latency=token_latency, trailing_chars=trailing_chars)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Mock Ollama /api/generate")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random delay")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds per streamed chunk")
+    parser.add_argument("--trailing-chars", type=int, default=0, help="Prose appended after the answer")
+    args = parser.parse_args()
+
+    server = MockOllamaServer((args.host, args.port), latency=args.latency, jitter=args.jitter,
+                              token_latency=args.token_latency, trailing_chars=args.trailing_chars)
+    print("Mock Ollama listening on", server.url)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
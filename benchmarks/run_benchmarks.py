@@ -0,0 +1,204 @@
+"""
+End-to-end benchmarks against a local mock LLM.
+
+    PYTHONPATH=. python benchmarks/run_benchmarks.py --sizes 1000,10000 --latency 0.02
+
+For each corpus size, in a fresh process and working directory:
+1. ingestion throughput (parse → extract → embed → upsert)
+2. TalentVectorStore.query latency percentiles (cold and cached)
+3. run_agent wall time (cold and with a warm score cache)
+4. scoring-prompt profile tokens, full CV vs compact profile
+
+Corpora are generated once under --workdir and reused; results go to
+one JSON file so runs can be diffed for regressions.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentiles(samples: list) -> dict:
+
+    ms = np.asarray(samples) * 1000
+
+    return {
+        "count": len(samples),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+    }
+
+
+# -------------------------------------------------------
+# 1. ONE CORPUS SIZE (runs in its own process)
+# -------------------------------------------------------
+
+def run_size(size: int, args) -> dict:
+
+    from benchmarks.corpus import generate_corpus, generate_projects
+    from benchmarks.mock_ollama import start_mock_server
+
+    corpus_dir = generate_corpus(os.path.join(args.workdir, f"corpus_{size}"), size)
+
+    server = start_mock_server(latency=args.latency, jitter=args.jitter,
+                               token_latency=args.token_latency, trailing_chars=args.trailing_chars)
+    # llm_client reads OLLAMA_URL at import, so set it before importing agents
+    os.environ["OLLAMA_URL"] = server.url
+
+    from tools.registry import get_store
+    from tools.ingestion_pipeline import IngestionPipeline
+    from tools.retrieval import PREFILTER_TOP_K
+    from agents.agentic_orchestrator_up1 import run_agent
+
+    report = {"size": size, "llm_latency_seconds": args.latency}
+    store = get_store()
+
+    # --- Ingestion ---
+    requests_before = server.requests
+    start = time.perf_counter()
+    stats = IngestionPipeline(store).run(corpus_dir)
+    seconds = time.perf_counter() - start
+
+    report["ingestion"] = {
+        "seconds": round(seconds, 3),
+        "docs_per_second": round(size / seconds, 2) if seconds > 0 else 0.0,
+        "llm_requests": server.requests - requests_before,
+        "stored_rows": store.collection.count(),
+        "pipeline_stats": stats,
+    }
+
+    # --- Query latency ---
+    projects = generate_projects(args.queries)
+    store.query_cache.clear()
+
+    for label in ("cold", "cached"):
+        latencies = []
+        for project in projects:
+            start = time.perf_counter()
+            store.query(project, top_k=PREFILTER_TOP_K)
+            latencies.append(time.perf_counter() - start)
+        report[f"query_{label}"] = percentiles(latencies)
+
+    report["query_cache"] = store.query_cache.stats()
+
+    # --- run_agent wall time ---
+    for label in ("cold", "warm"):
+        walls = []
+        requests_before = server.requests
+        for project in projects[:args.agent_runs]:
+            start = time.perf_counter()
+            run_agent(project)
+            walls.append(time.perf_counter() - start)
+        report[f"run_agent_{label}"] = {
+            "runs": len(walls),
+            "mean_seconds": round(statistics.mean(walls), 3),
+            "max_seconds": round(max(walls), 3),
+            "llm_requests": server.requests - requests_before,
+        }
+
+    # Where the time went, per traced operation
+    from tools.tracing import tracer
+    report["spans"] = tracer.snapshot()
+
+    # Scoring-prompt profile size, full CVs vs compact profiles
+    raw = sum(s.get("profile_tokens_raw", 0) for s in report["spans"].values())
+    compact = sum(s.get("profile_tokens_compact", 0) for s in report["spans"].values())
+    report["profile_tokens"] = {
+        "raw": raw,
+        "compact": compact,
+        "reduction": round(1 - compact / raw, 3) if raw else 0.0,
+    }
+
+    server.shutdown()
+
+    return report
+
+
+# -------------------------------------------------------
+# 2. DRIVER
+# -------------------------------------------------------
+
+def main():
+
+    parser = argparse.ArgumentParser(description="End-to-end talent mapper benchmarks")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--latency", type=float, default=0.02, help="Mock LLM seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Mock LLM seconds per streamed chunk")
+    parser.add_argument("--trailing-chars", type=int, default=0, help="Mock prose after each JSON answer")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--agent-runs", type=int, default=3)
+    parser.add_argument("--workdir", default=None, help="Keeps generated corpora between runs")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--run-size", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size is not None:
+        report = run_size(args.run_size, args)
+        with open(args.result_file, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+        return
+
+    args.workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="talent_bench_"))
+    output = os.path.abspath(args.output or os.path.join(
+        REPO_ROOT, "benchmarks", "results", time.strftime("benchmark_%Y%m%d_%H%M%S.json")
+    ))
+
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    results = []
+
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+
+        # Fresh working directory: data/ (Chroma, caches, checkpoint) starts empty
+        run_dir = os.path.join(args.workdir, f"run_{size}")
+        shutil.rmtree(run_dir, ignore_errors=True)
+        os.makedirs(run_dir)
+        result_file = os.path.join(run_dir, "result.json")
+
+        print(f"=== {size} documents ===")
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__),
+             "--run-size", str(size),
+             "--result-file", result_file,
+             "--workdir", args.workdir,
+             "--latency", str(args.latency),
+             "--jitter", str(args.jitter),
+             "--token-latency", str(args.token_latency),
+             "--trailing-chars", str(args.trailing_chars),
+             "--queries", str(args.queries),
+             "--agent-runs", str(args.agent_runs)],
+            cwd=run_dir, env=env, check=True
+        )
+
+        with open(result_file, "r", encoding="utf-8") as f:
+            results.append(json.load(f))
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "vector_backend": os.getenv("VECTOR_BACKEND", "chroma"),
+        "results": results,
+    }
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print("Saved", output)
+
+
+if __name__ == "__main__":
+    main()
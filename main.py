@@ -5,10 +5,12 @@
 # import os
 
 from agents.agentic_orchestrator_up1 import run_agent
-from tools.file_ingestion import extract_text_from_file
-from agents.agentic_orchestrator_up1 import store
-from agents.skill_extraction_agent import extract_structured_skills
-import os
+from tools.registry import get_store
+from tools.ingestion_pipeline import IngestionPipeline, PARSE_WORKERS, EXTRACTION_WORKERS, UPSERT_BATCH_SIZE
+from tools.parse_pool import PARSE_TIMEOUT
+from agents.skill_graph import get_skill_ontology
+from tools.tracing import tracer, start_metrics_server, METRICS_PORT
+import argparse
 
 
 path = r"/home/gumduboinaseshubabu/Downloads/cv_profiles_db"
@@ -28,30 +30,47 @@ project_text = """
 
 if __name__ == "__main__":
 
-    for profile in os.listdir(path):
-        profilepath = os.path.join(path,profile)
-        print(profilepath)
-        emp_id = profilepath.split('/')[-1].split('.')[0].split("_")[-1]
-        print("Employee ID : ",emp_id, "\n")
-        #txt = extract_text_from_file(profilepath)
-
-        # 1️⃣ Index employees first
-        emp_text = extract_text_from_file(profilepath)
-
-        # ✅ EXTRACT STRUCTURED SKILLS
-        structured = extract_structured_skills(emp_text)
-
-        store.add_employee(emp_id, emp_text, metadata=structured)
-
+    parser = argparse.ArgumentParser(description="Index CV profiles and match them to a project")
+    parser.add_argument("--path", default=path, help="Directory of CV files to ingest")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS)
+    parser.add_argument("--parse-timeout", type=float, default=PARSE_TIMEOUT, help="Seconds per file before its parser is killed")
+    parser.add_argument("--extraction-workers", type=int, default=EXTRACTION_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=UPSERT_BATCH_SIZE)
+    parser.add_argument("--skip-ingest", action="store_true", help="Only run the matching agent")
+    parser.add_argument("--sync", action="store_true",
+                        help="Incremental sync: re-index changed CVs, delete removed ones")
+    parser.add_argument("--trace-json", default=None, help="Write span metrics + traces to this JSON file")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="Serve Prometheus /metrics on this port (0 = off)")
+    args = parser.parse_args()
+
+    start_metrics_server(args.metrics_port)
+
+    # Build (or load) the skill ontology now, not inside the first request
+    get_skill_ontology()
+
+    # 1️⃣ Index employees first (resumes from the checkpoint after a crash)
+    store = get_store()
+
+    if not args.skip_ingest:
+        pipeline = IngestionPipeline(
+            store,
+            parse_workers=args.parse_workers,
+            parse_timeout=args.parse_timeout,
+            extraction_workers=args.extraction_workers,
+            batch_size=args.batch_size
+        )
+        stats = pipeline.sync(args.path) if args.sync else pipeline.run(args.path)
+        print("Ingestion stats:", stats)
         print("Collection count:", store.collection.count())
 
-        # 2️⃣ Run agent
-        # project_text = extract_text_from_file("project.docx")
+    # 2️⃣ Run agent
+    # project_text = extract_text_from_file("project.docx")
 
     results = run_agent(project_text)
 
     print("FINAL RESULTS:", results)
 
-    
-
-
+    print(tracer.summary())
+    if args.trace_json:
+        tracer.export_json(args.trace_json)
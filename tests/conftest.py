@@ -0,0 +1,63 @@
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Tests import agents / tools / benchmarks from the repo root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture
+def mock_ollama(monkeypatch):
+    """
+    benchmarks.mock_ollama on a free port, with llm_client pointed at
+    it, no retry backoff and the score cache off.
+    """
+
+    from benchmarks.mock_ollama import start_mock_server
+    import agents.llm_client as llm_client
+    import agents.matcher_agent as matcher_agent
+
+    server = start_mock_server()
+    monkeypatch.setattr(llm_client, "OLLAMA_URL", server.url)
+    monkeypatch.setattr(llm_client, "LLM_BACKOFF_SECONDS", 0.0)
+    monkeypatch.setattr(matcher_agent, "SCORE_CACHE_DB", "")
+    monkeypatch.setattr(matcher_agent, "_score_cache", None)
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+class HashEmbedder:
+    """
+    Deterministic normalized vectors, so the store runs without
+    downloading a SentenceTransformer.
+    """
+
+    dim = 16
+
+    def encode(self, texts, batch_size=None, normalize_embeddings=True):
+        vectors = np.array([
+            np.frombuffer(hashlib.sha256(text.encode("utf-8")).digest()[:self.dim], dtype=np.uint8)
+            for text in texts
+        ], dtype=np.float32).reshape(-1, self.dim) + 1.0
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """
+    TalentVectorStore on the mmap backend with HashEmbedder.
+    """
+
+    from tools.embedding_store import TalentVectorStore
+
+    monkeypatch.setattr(TalentVectorStore, "model", HashEmbedder())
+
+    return TalentVectorStore(db_path=str(tmp_path / "store"), backend="mmap")
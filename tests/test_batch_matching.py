@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import agents.batch_matching as batch_matching
+import agents.matcher_agent as matcher_agent
+from agents.batch_matching import adjust_scores
+
+
+PROJECT = "Embedded Testing for a new device family"
+CANDIDATES = [("E1", "Firmware engineer, RTOS and Linux"), ("E2", "Accountant")]
+
+
+class GraphTermsStore:
+
+    def graph_terms(self, emp_ids):
+        return {}   # match terms from the profile text
+
+
+@pytest.fixture
+def neutral_feedback(monkeypatch):
+    monkeypatch.setattr(batch_matching, "acceptance_rates", lambda emp_ids: np.ones(len(emp_ids)))
+    monkeypatch.setattr(batch_matching, "get_store", GraphTermsStore)
+    monkeypatch.setattr(matcher_agent, "ONTOLOGY_BOOST_WEIGHT", 0.0)
+
+
+def results():
+    return [{"match_score": 0.5}, {"match_score": 0.5}]
+
+
+def test_scores_are_not_boosted_by_default(neutral_feedback):
+
+    scored = adjust_scores(CANDIDATES, results(), PROJECT)
+
+    assert [s["result"]["adjusted_score"] for s in scored] == [0.5, 0.5]
+
+
+def test_transferable_boost_is_opt_in(neutral_feedback, monkeypatch):
+
+    monkeypatch.setattr(batch_matching, "TRANSFERABLE_BOOST", True)
+
+    scored = adjust_scores(CANDIDATES, results(), PROJECT)
+
+    assert scored[0]["result"]["boosted_score"] > 0.5
+    assert scored[1]["result"]["boosted_score"] == 0.5
+
+
+def test_retrieve_many_matches_single_project_retrieval(store, monkeypatch):
+
+    from agents.skill_graph import SkillOntology
+    from tools.retrieval import two_stage_retrieve
+
+    ontology = SkillOntology([("Django", "Flask", 1.0)])
+    project_skills = {"Django API": ["Django"], "Rust CLI": ["Rust"]}
+    monkeypatch.setattr(batch_matching, "get_skill_ontology", lambda: ontology)
+    monkeypatch.setattr(batch_matching, "extract_project_skills", project_skills.get)
+
+    store.add_employees([
+        {"emp_id": "E1", "text": "Flask developer", "metadata": {"primary_skills": ["Flask"]}},
+        {"emp_id": "E2", "text": "Rust developer", "metadata": {"primary_skills": ["Rust"]}},
+    ] + [
+        {"emp_id": f"X{i}", "text": f"Accountant {i}", "metadata": {"primary_skills": ["Excel"]}}
+        for i in range(20)
+    ])
+
+    batch = batch_matching.retrieve_many(store, list(project_skills), shortlist=2, top_k=2)
+
+    single = [
+        two_stage_retrieve(store, text, skills, top_k=2, shortlist=2,
+                           expanded_skills=ontology.expand(skills))
+        for text, skills in project_skills.items()
+    ]
+    assert batch == single
+    # Reached only through the ontology expansion of Django
+    assert "E1" in [emp_id for emp_id, _ in batch[0]]
+    assert "E2" in [emp_id for emp_id, _ in batch[1]]
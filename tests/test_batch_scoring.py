@@ -0,0 +1,70 @@
+import agents.matcher_agent as matcher_agent
+from agents.matcher_agent import (
+    BATCH_PROMPT_TOKENS,
+    BATCH_TOKENS_PER_CANDIDATE,
+    estimate_tokens,
+    plan_batches,
+    score_candidates,
+    score_candidates_batched,
+)
+
+
+PROJECT = "Backend service in Python with Docker and Kubernetes"
+
+
+def test_plan_batches_respects_the_token_budget_and_max_batch():
+
+    profile = "x" * 400
+    cost = estimate_tokens(profile) + BATCH_TOKENS_PER_CANDIDATE
+    budget = BATCH_PROMPT_TOKENS + estimate_tokens(PROJECT) + 3 * cost
+    candidates = [(f"E{i}", profile) for i in range(7)]
+
+    assert [len(b) for b in plan_batches(PROJECT, candidates, token_budget=budget, max_batch=8)] == [3, 3, 1]
+    assert [len(b) for b in plan_batches(PROJECT, candidates, token_budget=10**6, max_batch=2)] == [2, 2, 2, 1]
+    # Too big for any budget: still scored, on its own
+    assert plan_batches(PROJECT, [("E1", "y" * 10**5)], token_budget=100) == [[("E1", "y" * 10**5)]]
+
+
+def test_score_batch_keys_results_by_emp_id(mock_ollama):
+
+    batch = [("E7", "Python and Docker"), ("E3", "Java only")]
+
+    results = matcher_agent._score_batch(PROJECT, batch)
+
+    assert set(results) == {"E7", "E3"}
+    assert "emp_id" not in results["E7"]
+    assert results["E7"]["match_score"] > results["E3"]["match_score"]
+    assert mock_ollama.requests == 1
+
+
+def test_score_candidates_batched_fills_duplicates_and_rescores_dropped(mock_ollama, monkeypatch):
+
+    real_score_batch = matcher_agent._score_batch
+
+    def drop_e3(project_text, batch, timeout=None):
+        results = real_score_batch(project_text, batch, timeout=timeout)
+        results.pop("E3", None)
+        return results
+
+    monkeypatch.setattr(matcher_agent, "_score_batch", drop_e3)
+
+    candidates = [
+        ("E1", "Python, Docker and Kubernetes"),
+        ("E3", "Java only"),
+        ("E1", "Python, Docker and Kubernetes"),
+    ]
+    results = score_candidates_batched(PROJECT, candidates, max_workers=2, timeout=30)
+
+    assert results[0] == results[2]
+    assert results[0]["match_score"] > results[1]["match_score"]
+    assert "emp_id" not in results[0]
+    # One batch call, plus a single score_match for the dropped E3
+    assert mock_ollama.requests == 2
+
+
+def test_score_candidates_scores_one_prompt_per_candidate_by_default(mock_ollama):
+
+    results = score_candidates(PROJECT, [("E1", "Python and Docker"), ("E2", "Java only")], timeout=30)
+
+    assert len(results) == 2
+    assert mock_ollama.requests == 2
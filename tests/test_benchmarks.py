@@ -0,0 +1,43 @@
+import json
+
+import requests
+
+from benchmarks.mock_ollama import canned_response
+from benchmarks.run_benchmarks import percentiles
+
+
+def test_percentiles_in_milliseconds():
+
+    report = percentiles([0.001] * 99 + [0.1])
+
+    assert report["count"] == 100
+    assert report["p50_ms"] == 1.0
+    assert report["p99_ms"] > 1.0
+    assert report["mean_ms"] == 1.99
+
+
+def test_mock_answers_are_shaped_like_the_prompts_expect():
+
+    skills = json.loads(canned_response("Extract structured skill data\nTEXT:\nPython (6 years) and Docker"))
+    assert skills["primary_skills"] == ["python", "docker"]
+    assert skills["experience_years"] == {"python": 6}
+
+    batch = json.loads(canned_response(
+        "PROJECT: Python\nCANDIDATES:\n### CANDIDATE emp_id=E1\nPython\n\n### CANDIDATE emp_id=E2\nJava\nInstructions:"
+    ))
+    assert [entry["emp_id"] for entry in batch["results"]] == ["E1", "E2"]
+
+
+def test_mock_server_streams_ndjson(mock_ollama):
+
+    mock_ollama.trailing_chars = 100
+
+    with requests.post(mock_ollama.url, json={"prompt": "EMPLOYEE PROFILE: Python", "stream": True}, stream=True) as r:
+        chunks = [json.loads(line) for line in r.iter_lines() if line]
+
+    assert chunks[-1]["done"] and chunks[-1]["eval_count"] > 0
+    text = "".join(chunk["response"] for chunk in chunks)
+    answer, _, prose = text.partition("\n\nExplanation: ")
+    assert set(json.loads(answer)) >= {"match_score", "strengths", "missing_skills"}
+    assert len(prose) == 100
+    assert mock_ollama.requests == 1
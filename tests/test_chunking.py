@@ -0,0 +1,60 @@
+from tools.chunking import chunk_text
+from tools.embedding_store import chunk_id
+
+
+def section(topic, words=120):
+    return " ".join(f"{topic}{i}" for i in range(words))
+
+
+def cv(*topics):
+    return "\n\n".join(section(topic) for topic in topics)
+
+
+def test_chunk_text_packs_sections_and_windows_long_ones():
+
+    assert chunk_text("") == [""]
+    assert chunk_text("short cv\n\nsecond section", max_words=50) == ["short cv second section"]
+
+    chunks = chunk_text(cv("python", "docker", "rust"), max_words=180, overlap=30)
+    assert len(chunks) == 3
+    assert all(len(chunk.split()) <= 180 for chunk in chunks)
+
+    windows = chunk_text(section("go", 400), max_words=180, overlap=30)
+    assert [len(w.split()) for w in windows] == [180, 180, 100]
+    assert windows[0].split()[-30:] == windows[1].split()[:30]
+
+
+def test_aggregate_ranks_by_best_chunk_or_chunk_sum(store):
+
+    # E1: one very close chunk; E2: three fairly close ones
+    row_ids = ["E1", "E1#chunk1", "E2", "E2#chunk1", "E2#chunk2"]
+    metadatas = [{"emp_id": "E1"}, {"emp_id": "E1"}, {"emp_id": "E2"}, {"emp_id": "E2"}, {"emp_id": "E2"}]
+    distances = [0.1, 1.8, 0.4, 0.4, 0.4]
+
+    assert store._aggregate(row_ids, metadatas, distances, 5, "max") == [("E1", 0.1), ("E2", 0.4)]
+    assert store._aggregate(row_ids, metadatas, distances, 5, "sum") == [("E2", 0.4), ("E1", 0.1)]
+    # Rows stored before chunking have no emp_id key
+    assert store._aggregate(["E3"], [{}], [0.2], 5, "max") == [("E3", 0.2)]
+
+
+def test_query_returns_one_full_document_per_employee(store):
+
+    alice = cv("python", "docker", "rust")
+    store.add_employees([
+        {"emp_id": "E1", "text": alice, "metadata": {}},
+        {"emp_id": "E2", "text": "Bob, Java", "metadata": {}},
+    ])
+    pieces = chunk_text(alice)
+    assert store.collection.get(ids=[chunk_id("E1", len(pieces) - 1)])["ids"]
+
+    # Matches Alice's last chunk exactly
+    results = store.query(pieces[-1], top_k=5)
+
+    assert results["ids"][0][0] == "E1"
+    assert len(results["ids"][0]) == len(set(results["ids"][0])) == 2
+    assert results["documents"][0][0] == alice
+    assert results["distances"][0][0] < 1e-5
+
+    # Re-ingesting a shorter CV drops the old chunk rows
+    store.add_employees([{"emp_id": "E1", "text": "Alice, Python", "metadata": {}}])
+    assert store.collection.get(where={"emp_id": "E1"})["ids"] == ["E1"]
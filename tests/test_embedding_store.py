@@ -0,0 +1,17 @@
+def test_add_employees_keeps_the_last_record_per_emp_id(store):
+
+    stats = store.add_employees([
+        {"emp_id": "E1", "path": "old/alice_E1.txt", "text": "Alice, Java developer",
+         "metadata": {"primary_skills": ["Java"]}},
+        {"emp_id": "E2", "path": "bob_E2.txt", "text": "Bob, Go developer",
+         "metadata": {"primary_skills": ["Go"]}},
+        {"emp_id": "E1", "path": "new/alice_E1.txt", "text": "Alice, Rust developer",
+         "metadata": {"primary_skills": ["Rust"]}},
+    ])
+
+    assert stats["documents"] == 2
+
+    rows = store.collection.get(ids=["E1"])
+    assert rows["documents"] == ["Alice, Rust developer"]
+    assert store.find_candidates(all_of=["rust"]) == ["E1"]
+    assert store.find_candidates(all_of=["java"]) == []
@@ -0,0 +1,53 @@
+import os
+
+from agents.feedback_agent import FeedbackStore, NEUTRAL_PRIOR
+
+
+def rates(store, *emp_ids):
+    return [round(float(r), 4) for r in store.acceptance_rates(list(emp_ids))]
+
+
+def test_appended_rows_are_picked_up_incrementally(tmp_path):
+
+    path = tmp_path / "feedback.csv"
+    path.write_text("emp_id,decision\nE1,accepted\nE1,Rejected\n")
+    store = FeedbackStore(str(path))
+
+    assert rates(store, "E1", "E9") == [0.5, NEUTRAL_PRIOR]
+    offset = store._offset
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("E1,ACCEPTED\nE2,rejected\n")
+
+    assert rates(store, "E1", "E2") == [0.6, round(1 / 3, 4)]
+    assert store._offset > offset
+
+
+def test_unterminated_last_line_is_counted_then_completed(tmp_path):
+
+    path = tmp_path / "feedback.csv"
+    path.write_text("emp_id,decision\nE1,accepted")
+    store = FeedbackStore(str(path))
+
+    assert rates(store, "E1") == [round(2 / 3, 4)]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\nE1,accepted\n")
+
+    assert rates(store, "E1") == [0.75]
+
+
+def test_replaced_or_missing_file_is_reloaded(tmp_path):
+
+    path = tmp_path / "feedback.csv"
+    path.write_text("emp_id,decision\nE1,accepted\nE1,accepted\nE1,accepted\n")
+    store = FeedbackStore(str(path))
+    assert rates(store, "E1") == [0.8]
+
+    replacement = tmp_path / "feedback.new"
+    replacement.write_text("decision,emp_id\nrejected,E1\n")
+    os.replace(replacement, path)
+    assert rates(store, "E1") == [round(1 / 3, 4)]
+
+    path.unlink()
+    assert rates(store, "E1") == [NEUTRAL_PRIOR]
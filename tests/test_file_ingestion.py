@@ -0,0 +1,70 @@
+import sys
+import types
+
+import pandas as pd
+
+import tools.file_ingestion as file_ingestion
+from tools.file_ingestion import extract_text_from_file
+
+
+def test_truncation_is_reported(tmp_path, capsys):
+
+    path = tmp_path / "profile.txt"
+    path.write_text("a" * 100, encoding="utf-8")
+
+    assert extract_text_from_file(str(path), max_bytes=100) == "a" * 100
+    assert "Truncated" not in capsys.readouterr().out
+
+    assert extract_text_from_file(str(path), max_bytes=40) == "a" * 40
+    assert f"Truncated {path} at 40 bytes" in capsys.readouterr().out
+
+
+def test_xlsx_keeps_the_dataframe_layout(tmp_path):
+
+    path = str(tmp_path / "skills.xlsx")
+    df = pd.DataFrame({"Skill": ["Python", "Docker"], "Years": [5, 2]})
+    df.to_excel(path, index=False)
+
+    assert extract_text_from_file(path) == pd.read_excel(path).to_string()
+
+
+class FailingPage:
+
+    def get_text(self):
+        raise RuntimeError("bad content stream")
+
+
+class FakePage:
+
+    def __init__(self, text):
+        self.text = text
+
+    def get_text(self):
+        return self.text
+
+
+class FakeDocument:
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __getitem__(self, number):
+        return self.pages[number]
+
+
+def test_a_failing_pdf_page_falls_back_per_page(tmp_path, monkeypatch):
+
+    pages = [FakePage("one"), FailingPage(), FakePage("three")]
+    monkeypatch.setitem(sys.modules, "pymupdf", types.SimpleNamespace(open=lambda path: FakeDocument(pages)))
+    monkeypatch.setattr(file_ingestion, "_pdfplumber_page", lambda path, number: f"plumber {number}")
+
+    assert list(file_ingestion.iter_pdf(str(tmp_path / "cv.pdf"))) == ["one", "plumber 1", "three"]
@@ -0,0 +1,111 @@
+import json
+import shutil
+
+import pytest
+
+import tools.ingestion_pipeline as ingestion_pipeline
+from tools.ingestion_pipeline import IngestionCheckpoint, IngestionPipeline
+
+
+class RecordingStore:
+    """
+    Stands in for TalentVectorStore: keeps the last record per emp_id.
+    """
+
+    embedding_version = "test"
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.records = {}
+
+    def add_employees(self, batch):
+        for record in batch:
+            self.records[record["emp_id"]] = record
+        return {"documents": len(batch), "docs_per_second": 0.0}
+
+
+@pytest.fixture
+def cv_dir(tmp_path):
+    cvs = tmp_path / "cvs"
+    cvs.mkdir()
+    (cvs / "alice_E1.txt").write_text("Alice, Python and Docker engineer")
+    (cvs / "bob_E2.txt").write_text("Bob, Java and Kubernetes engineer")
+    return cvs
+
+
+def make_pipeline(store, tmp_path):
+    return IngestionPipeline(
+        store,
+        parse_workers=1,
+        extraction_workers=2,
+        cache_db=None,
+        quarantine_file=str(tmp_path / "quarantine.jsonl"),
+    )
+
+
+def test_checkpoint_is_done_only_for_the_recorded_hash(tmp_path):
+
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = IngestionCheckpoint(str(path))
+    checkpoint.mark("a.txt", "A", "done", content_hash="h1")
+    checkpoint.mark("b.txt", "B", "failed", "parse error")
+    checkpoint.close()
+
+    # Written before hashes were recorded
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"path": str(tmp_path / "c.txt"), "emp_id": "C", "status": "done"}) + "\n")
+        f.write('{"path": "torn')
+
+    reopened = IngestionCheckpoint(str(path))
+    try:
+        assert reopened.is_done("a.txt", "h1")
+        assert not reopened.is_done("a.txt", "h2")
+        assert not reopened.is_done("b.txt", None)
+        assert not reopened.is_done(str(tmp_path / "c.txt"), "h3")
+    finally:
+        reopened.close()
+
+
+def test_run_resumes_and_reingests_edited_files(mock_ollama, tmp_path, cv_dir):
+
+    store = RecordingStore(tmp_path / "store")
+
+    first = make_pipeline(store, tmp_path).run(str(cv_dir))
+    assert (first["indexed"], first["skipped"]) == (2, 0)
+    assert store.records["E1"]["metadata"]["primary_skills"] == ["python", "docker"]
+
+    second = make_pipeline(store, tmp_path).run(str(cv_dir))
+    assert (second["indexed"], second["skipped"]) == (0, 2)
+
+    (cv_dir / "alice_E1.txt").write_text("Alice, Rust engineer")
+    third = make_pipeline(store, tmp_path).run(str(cv_dir))
+    assert (third["indexed"], third["skipped"]) == (1, 1)
+    assert store.records["E1"]["metadata"]["primary_skills"] == ["rust"]
+
+
+
+def test_wiping_the_store_resets_the_checkpoint(mock_ollama, tmp_path, cv_dir):
+
+    make_pipeline(RecordingStore(tmp_path / "store"), tmp_path).run(str(cv_dir))
+    shutil.rmtree(tmp_path / "store")
+
+    store = RecordingStore(tmp_path / "store")
+    stats = make_pipeline(store, tmp_path).run(str(cv_dir))
+
+    assert (stats["indexed"], stats["skipped"]) == (2, 0)
+    assert sorted(store.records) == ["E1", "E2"]
+
+
+def test_failed_extraction_is_retried_on_the_next_run(mock_ollama, monkeypatch, tmp_path, cv_dir):
+
+    store = RecordingStore(tmp_path / "store")
+
+    with monkeypatch.context() as m:
+        m.setattr(ingestion_pipeline, "try_extract_structured_skills", lambda text: None)
+        first = make_pipeline(store, tmp_path).run(str(cv_dir))
+    assert first["indexed"] == 2
+    assert store.records["E1"]["metadata"]["primary_skills"] == []
+
+    second = make_pipeline(store, tmp_path).run(str(cv_dir))
+    assert (second["indexed"], second["skipped"]) == (2, 0)
+    assert store.records["E1"]["metadata"]["primary_skills"] == ["python", "docker"]
@@ -0,0 +1,114 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import agents.llm_client as llm_client
+from tools.json_stream import JsonObjectScanner
+
+
+def feed_all(scanner, chunks):
+    for chunk in chunks:
+        result = scanner.feed(chunk)
+        if result is not None:
+            return result
+    return None
+
+
+def test_scanner_finds_the_object_across_chunks():
+
+    scanner = JsonObjectScanner()
+    chunks = ['Sure! {"match', '_score": 0.8, "note": "a } in', ' a string"}', " and then prose"]
+
+    assert feed_all(scanner, chunks) == {"match_score": 0.8, "note": "a } in a string"}
+
+
+def test_scanner_skips_invalid_and_incomplete_objects():
+
+    scanner = JsonObjectScanner(required_keys=("results",))
+
+    assert feed_all(scanner, ['{not json} {"other": 1} ', '{"results": []}']) == {"results": []}
+    assert feed_all(JsonObjectScanner(), ['{"match_score": 0.8']) is None
+
+
+def test_call_ollama_json_stops_at_the_first_object(mock_ollama):
+
+    mock_ollama.trailing_chars = 2000
+
+    parsed = llm_client.call_ollama_json("Extract structured skill data\nTEXT:\nPython and Docker")
+
+    assert parsed["primary_skills"] == ["python", "docker"]
+
+
+class BrokenStreamHandler(BaseHTTPRequestHandler):
+    """
+    Streams a malformed line and hangs up for the first `fail` requests,
+    then a well-formed answer.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        server.requests += 1
+
+        self.send_response(200)
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        if server.requests <= server.fail:
+            self.wfile.write(b'{"response": "{\\"match_')
+            return
+
+        for piece in ['{"match_', 'score": 0.7}', " and more prose"]:
+            self.wfile.write((json.dumps({"response": piece, "done": False}) + "\n").encode("utf-8"))
+        self.wfile.write((json.dumps({"response": "", "done": True, "eval_count": 9}) + "\n").encode("utf-8"))
+
+
+@pytest.fixture
+def broken_stream(monkeypatch):
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BrokenStreamHandler)
+    server.daemon_threads = True
+    server.requests = 0
+    server.fail = 1
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(llm_client, "OLLAMA_URL", f"http://127.0.0.1:{server.server_address[1]}/api/generate")
+    monkeypatch.setattr(llm_client, "LLM_BACKOFF_SECONDS", 0.0)
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_call_ollama_json_retries_a_malformed_stream(broken_stream):
+
+    assert llm_client.call_ollama_json("score this") == {"match_score": 0.7}
+    assert broken_stream.requests == 2
+
+
+def test_call_ollama_json_gives_up_after_the_retry_budget(broken_stream, monkeypatch):
+
+    broken_stream.fail = 10
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 1)
+
+    with pytest.raises(ValueError):
+        llm_client.call_ollama_json("score this")
+    assert broken_stream.requests == 2
+
+
+def test_a_bad_ollama_url_fails_without_retrying(monkeypatch):
+
+    sleeps = []
+    monkeypatch.setattr(llm_client, "OLLAMA_URL", "ollama/api/generate")
+    monkeypatch.setattr(llm_client, "_backoff", sleeps.append)
+
+    with pytest.raises(requests.exceptions.MissingSchema):
+        llm_client.call_ollama("hello")
+    assert sleeps == []
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from tools.mmap_backend import MmapCollection, compile_where
+
+
+@pytest.fixture(params=[("none", False), ("int8", False), ("binary", False), ("int8", True)],
+                ids=["float", "int8", "binary", "int8-hnsw"])
+def collection(request, tmp_path):
+    quantization, use_hnsw = request.param
+    if use_hnsw:
+        pytest.importorskip("hnswlib")
+    return MmapCollection(str(tmp_path / "mmap"), quantization=quantization, use_hnsw=use_hnsw)
+
+
+def vectors(n, dim=32, seed=0):
+    rows = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def fill(collection, n=200):
+    embeddings = vectors(n)
+    collection.upsert(
+        ids=[f"E{i}" for i in range(n)],
+        embeddings=embeddings,
+        documents=[f"doc {i}" for i in range(n)],
+        metadatas=[{"team": "a" if i % 2 else "b", "years": i % 10} for i in range(n)],
+    )
+    return embeddings
+
+
+def test_query_finds_the_nearest_rows(collection):
+
+    embeddings = fill(collection)
+
+    results = collection.query(query_embeddings=embeddings[[7, 42]], n_results=3)
+
+    assert [ids[0] for ids in results["ids"]] == ["E7", "E42"]
+    assert results["distances"][0][0] == pytest.approx(0.0, abs=1e-4)
+    assert results["documents"][0][0] == "doc 7"
+    assert all(len(ids) == 3 for ids in results["ids"])
+
+
+def test_query_and_get_honour_where(collection):
+
+    embeddings = fill(collection)
+
+    results = collection.query(query_embeddings=embeddings[[7]], n_results=5,
+                               where={"$and": [{"team": "a"}, {"years": {"$gte": 5}}]})
+    assert results["ids"][0][0] == "E7"
+    assert all(m["team"] == "a" and m["years"] >= 5 for m in results["metadatas"][0])
+
+    # A selective filter (20 of 200 rows) still returns full, filtered results
+    selective = collection.query(query_embeddings=embeddings[[13]], n_results=3,
+                                 where={"$and": [{"years": 3}, {"team": "a"}]})
+    assert selective["ids"][0][0] == "E13"
+    assert len(selective["ids"][0]) == 3
+    assert all(int(i[1:]) % 10 == 3 for i in selective["ids"][0])
+
+    page = collection.get(where={"team": "b"}, limit=10, offset=5, include=["metadatas"])
+    assert page["ids"] == [f"E{i}" for i in range(10, 30, 2)]
+
+
+def test_update_merges_metadata(collection):
+
+    fill(collection, n=20)
+
+    collection.update(ids=["E3", "missing"], metadatas=[{"years": 99, "lead": True}])
+
+    assert collection.get(ids=["E3"], include=["metadatas"])["metadatas"] == [{"team": "a", "years": 99, "lead": True}]
+    assert collection.get(where={"lead": True}, include=[])["ids"] == ["E3"]
+
+
+def test_delete_removes_rows_and_reuses_slots(collection):
+
+    embeddings = fill(collection, n=50)
+
+    collection.delete(ids=["E7"])
+    collection.delete(where={"years": 9})
+
+    assert collection.count() == 50 - 1 - 5
+    assert "E7" not in collection.query(query_embeddings=embeddings[[7]], n_results=5)["ids"][0]
+    assert collection.get(where={"years": 9}, include=[])["ids"] == []
+
+    replacement = vectors(1, seed=1)
+    collection.upsert(ids=["NEW"], embeddings=replacement, documents=["new"], metadatas=[{"team": "c"}])
+    assert collection.count() == 45
+    assert collection.query(query_embeddings=replacement, n_results=1)["ids"] == [["NEW"]]
+
+
+def test_rows_survive_a_reopen(collection):
+
+    embeddings = fill(collection, n=30)
+    collection.update(ids=["E1"], metadatas=[{"lead": True}])
+    collection.delete(ids=["E2"])
+    collection.close()
+
+    reopened = MmapCollection(collection.path, quantization=collection.quantization,
+                              use_hnsw=collection.use_hnsw)
+
+    assert reopened.count() == 29
+    assert reopened.query(query_embeddings=embeddings[[5]], n_results=1)["ids"] == [["E5"]]
+    assert reopened.get(where={"lead": True}, include=[])["ids"] == ["E1"]
+
+
+def test_where_comparisons_on_mixed_types_do_not_match():
+
+    assert compile_where({"years": {"$gt": 3}})({"years": 5})
+    assert not compile_where({"years": {"$gt": 3}})({"years": "five"})
+    assert compile_where({"$or": [{"team": "a"}, {"years": {"$in": [1, 2]}}]})({"team": "b", "years": 2})
+    assert compile_where({"team": {"$nin": ["a"]}})({"team": "b"})
@@ -0,0 +1,73 @@
+import os
+import time
+
+import pytest
+
+from tools.parse_pool import ParsePool, ParseQuarantine
+
+
+def fake_parse(path):
+    """
+    Runs in the spawned workers, so it must be importable by name.
+    hang_* never finishes, flaky_* hangs on its first try only,
+    error_* raises, anything else is read as text.
+    """
+
+    name = os.path.basename(path)
+
+    if name.startswith("flaky"):
+        marker = path + ".seen"
+        if not os.path.exists(marker):
+            open(marker, "w").close()
+            time.sleep(60)
+    if name.startswith("hang"):
+        time.sleep(60)
+    if name.startswith("error"):
+        raise ValueError("unreadable file")
+
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = {}
+    for name in ("ok.txt", "hang.txt", "flaky.txt", "error.txt"):
+        (tmp_path / name).write_text(f"contents of {name}")
+        paths[name] = str(tmp_path / name)
+    return paths
+
+
+def parse_all(pool, paths):
+    return {path: (text, error) for path, text, error in pool.map(paths)}
+
+
+def test_timeouts_are_retried_then_reported(files):
+
+    pool = ParsePool(workers=2, timeout=1.0, retries=1, parse_fn=fake_parse)
+
+    results = parse_all(pool, list(files.values()))
+
+    assert results[files["ok.txt"]] == ("contents of ok.txt", None)
+    assert results[files["flaky.txt"]] == ("contents of flaky.txt", None)
+    assert isinstance(results[files["hang.txt"]][1], TimeoutError)
+    # Parser errors do not depend on load: reported without a retry
+    assert isinstance(results[files["error.txt"]][1], RuntimeError)
+    assert "unreadable file" in str(results[files["error.txt"]][1])
+    # hang twice, flaky once
+    assert pool.stats["timeouts"] == 3
+    assert pool.stats["retried"] == 2
+
+
+def test_quarantine_persists_until_released_or_changed(tmp_path):
+
+    quarantine_file = str(tmp_path / "quarantine.jsonl")
+    quarantine = ParseQuarantine(quarantine_file)
+    quarantine.add("bad.pdf", "h1", "parse timed out after 60s")
+
+    reopened = ParseQuarantine(quarantine_file)
+    assert reopened.reason("bad.pdf", "h1") == "parse timed out after 60s"
+    assert reopened.reason("bad.pdf", "h2") is None
+
+    reopened.release("bad.pdf")
+    assert ParseQuarantine(quarantine_file).reason("bad.pdf", "h1") is None
@@ -0,0 +1,37 @@
+from tools.profiles import build_compact_profile, profile_hash, scoring_profile
+
+
+CV = """Alice Smith
+
+Summary
+Backend engineer building payment services in Python and Go.
+
+Experience
+Ten years of work history that the scoring prompt does not need, in detail.
+"""
+SKILLS = {"primary_skills": ["Python", "Go"], "tools": ["Docker"], "experience_years": {"Python": 8}}
+
+
+def test_scoring_profile_uses_the_stored_profile_only_while_it_matches():
+
+    stored = {"compact_profile": "stored profile", "profile_hash": profile_hash(CV), **SKILLS}
+
+    assert scoring_profile(CV, stored) == "stored profile"
+    assert scoring_profile(CV + "edited", stored) == build_compact_profile(CV + "edited", stored)
+    assert len(build_compact_profile(CV, SKILLS)) < len(CV)
+
+
+def test_refresh_profiles_rewrites_only_stale_rows(store):
+
+    store.add_employees([
+        {"emp_id": "E1", "text": CV, "metadata": SKILLS},
+        {"emp_id": "E2", "text": "Bob, Rust developer " * 300, "metadata": {"primary_skills": ["Rust"]}},
+    ])
+    store.collection.update(ids=["E1"], metadatas=[{"profile_hash": "stale", "compact_profile": "old"}])
+
+    assert store.refresh_profiles(page_size=1) == 1
+    assert store.refresh_profiles() == 0
+
+    metadata = store.collection.get(ids=["E1"])["metadatas"][0]
+    assert metadata["profile_hash"] == profile_hash(CV)
+    assert scoring_profile(CV, metadata) == metadata["compact_profile"] != "old"
@@ -0,0 +1,57 @@
+import tools.score_cache as score_cache
+from tools.score_cache import ScoreCache, score_key
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_score_key_depends_on_every_part():
+
+    base = score_key("project", "profile", "llama3.2", "v1")
+
+    assert base == score_key("project", "profile", "llama3.2", "v1")
+    assert base != score_key("project", "profile", "llama3.2", "v2")
+    assert base != score_key("project", "profile", "mistral", "v1")
+    assert score_key("ab", "c", "m", "v") != score_key("a", "bc", "m", "v")
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+
+    clock = Clock()
+    monkeypatch.setattr(score_cache, "time", clock)
+    cache = ScoreCache(str(tmp_path / "scores.sqlite"), ttl=60)
+
+    cache.put("k", {"match_score": 0.7})
+    clock.now += 59
+    assert cache.get("k") == {"match_score": 0.7}
+    clock.now += 2
+    assert cache.get("k") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+
+    clock = Clock()
+    monkeypatch.setattr(score_cache, "time", clock)
+    cache = ScoreCache(str(tmp_path / "scores.sqlite"), ttl=10**6, max_entries=150)
+
+    for i in range(199):
+        clock.now += 1
+        cache.put(f"k{i}", {"match_score": i / 200})
+        if i == 100:
+            cache.get("k0")   # keeps k0 recently used
+
+    clock.now += 1
+    cache.put("k199", {"match_score": 1.0})   # every 100th write prunes
+
+    count = cache.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    assert count == 150
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
+    assert cache.get("k199") == {"match_score": 1.0}
@@ -0,0 +1,68 @@
+import json
+import os
+
+import tools.skill_index as skill_index
+from tools.skill_index import SkillIndex
+
+
+def docker_years(years):
+    return {"primary_skills": ["Docker"], "tools": ["Jenkins"], "experience_years": {"Docker": years}}
+
+
+def test_query_intersects_skills_and_filters_on_years():
+
+    index = SkillIndex()
+    index.add_many([
+        ("E1", docker_years(5)),
+        ("E2", docker_years("2 years")),
+        ("E3", {"primary_skills": ["Docker"]}),
+    ])
+
+    assert index.query(all_of=["docker", "JENKINS"]) == ["E1", "E2"]
+    assert index.query(all_of=["docker"], min_years={"Docker": 3}) == ["E1"]
+    assert index.query(any_of=["jenkins", "rust"]) == ["E1", "E2"]
+
+    index.remove_many(["E1"])
+    assert index.query(all_of=["docker"]) == ["E2", "E3"]
+
+
+def test_log_is_compacted_into_a_snapshot(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(skill_index, "SKILL_INDEX_COMPACT_MIN_OPS", 10)
+    path = str(tmp_path / "index.jsonl")
+
+    index = SkillIndex(path)
+    for years in range(30):
+        index.add_many([("E1", docker_years(years)), ("E2", docker_years(1))])
+    index.close()
+
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0] == {"op": "version", "version": skill_index.SKILL_INDEX_VERSION}
+    assert len(lines) <= 2 * 10 + 1
+
+    reopened = SkillIndex(path)
+    assert reopened.query(all_of=["docker"], min_years={"docker": 29}) == ["E1"]
+
+
+def test_store_rebuilds_a_missing_or_stale_index(store):
+
+    store.add_employees([
+        {"emp_id": "E1", "text": "Alice, Docker", "metadata": docker_years(5)},
+        {"emp_id": "E2", "text": "Bob, Rust", "metadata": {"primary_skills": ["Rust"]}},
+    ])
+    path = store.skill_index.path
+    assert os.path.dirname(path) == store.db_path
+
+    # Written before the index existed: no log at all
+    store.skill_index.close()
+    os.remove(path)
+    store._skill_index = None
+    assert store.find_candidates(all_of=["docker"]) == ["E1"]
+
+    # Drifted from the store: holds an employee the store does not
+    store.skill_index.add_many([("E9", docker_years(1))])
+    store.skill_index.close()
+    store._skill_index = None
+    assert store.find_candidates(all_of=["docker"]) == ["E1"]
+    assert len(store.skill_index) == 2
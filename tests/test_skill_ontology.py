@@ -0,0 +1,50 @@
+import pytest
+
+from agents.skill_graph import SkillOntology
+
+
+EDGES = [
+    ("Python", "Django", 1.0),
+    ("Django", "Flask", 0.8),
+    ("Flask", "FastAPI", 1.0),
+    ("Go", "Rust", 1.0),
+]
+
+
+def test_related_skills_by_hop_count():
+
+    ontology = SkillOntology(EDGES, max_hops=3, decay=0.5)
+
+    assert ontology.related("python", k=1) == [("Django", 1.0)]
+    assert ontology.related("python", k=2) == [("Django", 1.0), ("Flask", 0.4)]
+    assert ontology.related("python", k=3)[-1] == ("FastAPI", 0.2)
+    assert ontology.similarity("FastAPI", "Python") == 0.2
+    assert ontology.similarity("Python", "Rust") == 0.0
+    assert ontology.expand(["Python"], k=2, min_similarity=0.5) == ["Python", "Django"]
+
+
+def test_transfer_scores_credit_related_skills():
+
+    ontology = SkillOntology(EDGES, max_hops=3, decay=0.5)
+
+    scores = ontology.transfer_scores("Backend in Django", ["Flask developer", "Rust developer", "Django"], k=2)
+
+    assert scores.tolist() == pytest.approx([0.8, 0.0, 0.0])
+
+
+def test_similarity_is_cached_until_the_edges_change(tmp_path, monkeypatch):
+
+    path = str(tmp_path / "ontology.npz")
+    built = SkillOntology.load(path, EDGES)
+
+    def no_rebuild(self):
+        raise AssertionError("similarity recomputed despite a valid cache")
+
+    with monkeypatch.context() as m:
+        m.setattr(SkillOntology, "_precompute_similarity", no_rebuild)
+        cached = SkillOntology.load(path, EDGES)
+    assert cached.related("python", k=3) == built.related("python", k=3)
+
+    changed = SkillOntology.load(path, EDGES + [("Rust", "C++", 1.0)])
+    assert changed.related("go", k=2) == [("Rust", 1.0), ("C++", 0.5)]
+    assert SkillOntology.load(path, EDGES + [("Rust", "C++", 1.0)]).related("go", k=2) == [("Rust", 1.0), ("C++", 0.5)]
@@ -0,0 +1,32 @@
+from tools.ingestion_pipeline import IngestionPipeline
+
+
+def test_sync_adds_updates_and_deletes(mock_ollama, store, tmp_path):
+
+    cvs = tmp_path / "cvs"
+    cvs.mkdir()
+    (cvs / "alice_E1.txt").write_text("Alice, Python and Docker engineer")
+    (cvs / "bob_E2.txt").write_text("Bob, Java engineer")
+
+    pipeline = IngestionPipeline(store, parse_workers=1, cache_db=None,
+                                 quarantine_file=str(tmp_path / "quarantine.jsonl"))
+
+    first = pipeline.sync(str(cvs))
+    assert (first["added"], first["updated"], first["unchanged"], first["deleted"]) == (2, 0, 0, 0)
+
+    requests_before = mock_ollama.requests
+    unchanged = pipeline.sync(str(cvs))
+    assert (unchanged["added"], unchanged["updated"], unchanged["unchanged"]) == (0, 0, 2)
+    assert mock_ollama.requests == requests_before
+
+    (cvs / "alice_E1.txt").write_text("Alice, Rust engineer")
+    (cvs / "bob_E2.txt").unlink()
+    (cvs / "carol_E3.txt").write_text("Carol, Go engineer")
+
+    second = pipeline.sync(str(cvs))
+    assert (second["added"], second["updated"], second["unchanged"], second["deleted"]) == (1, 1, 0, 1)
+
+    assert sorted(store.content_hashes()) == ["E1", "E3"]
+    assert store.collection.get(ids=["E1"])["documents"] == ["Alice, Rust engineer"]
+    assert store.find_candidates(any_of=["java"]) == []
+    assert store.find_candidates(all_of=["rust"]) == ["E1"]
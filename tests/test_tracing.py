@@ -0,0 +1,84 @@
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import tools.tracing as tracing
+from tools.tracing import current_span, in_context, span, start_metrics_server, trace, tracer
+
+
+@pytest.fixture(autouse=True)
+def clean_tracer():
+    tracer.reset()
+    yield
+    tracer.reset()
+
+
+def test_spans_nest_into_one_trace_across_threads():
+
+    def work(i):
+        with span("worker", item=i) as s:
+            s.set(prompt_tokens=10)
+
+    with trace("run_agent"):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for future in [executor.submit(in_context(work), i) for i in range(3)]:
+                future.result()
+        current_span().add("cache_hits", 2)
+
+    [finished] = tracer.recent_traces()
+    root = next(s for s in finished["spans"] if s["name"] == "run_agent")
+    workers = [s for s in finished["spans"] if s["name"] == "worker"]
+
+    assert len(workers) == 3
+    assert all(s["parent_id"] == root["span_id"] for s in workers)
+    assert root["attrs"]["cache_hits"] == 2
+
+    metrics = tracer.snapshot()
+    assert metrics["worker"]["count"] == 3
+    assert metrics["worker"]["prompt_tokens"] == 30
+    assert 'talent_prompt_tokens_total{span="worker"} 30' in tracer.prometheus_text()
+
+
+def test_errors_are_recorded_and_reraised():
+
+    with pytest.raises(KeyError):
+        with trace("run_agent"):
+            raise KeyError("boom")
+
+    assert tracer.snapshot()["run_agent"]["errors"] == 1
+    assert tracer.recent_traces()[0]["spans"][0]["error"] == "KeyError: 'boom'"
+
+
+def test_metrics_server_serves_traces_on_localhost_while_traces_are_added(monkeypatch):
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    monkeypatch.setattr(tracing, "_server", None)
+    server = start_metrics_server(port)
+    stop = threading.Event()
+
+    def add_traces():
+        while not stop.is_set():
+            with trace("background"):
+                pass
+
+    writer = threading.Thread(target=add_traces)
+    writer.start()
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+        for _ in range(20):
+            response = requests.get(f"http://127.0.0.1:{port}/traces", timeout=5)
+            assert response.status_code == 200
+            assert isinstance(json.loads(response.text), list)
+        assert "talent_span_seconds_count" in requests.get(f"http://127.0.0.1:{port}/metrics", timeout=5).text
+    finally:
+        stop.set()
+        writer.join()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,60 @@
+import os
+import re
+
+
+# MiniLM truncates at 256 word pieces; ~180 words stays under that
+CHUNK_WORDS = int(os.getenv("CHUNK_WORDS", "180"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "30"))
+
+_SECTION_RE = re.compile(r"\n\s*\n")
+
+
+def _windows(words: list, max_words: int, overlap: int) -> list:
+
+    step = max(1, max_words - overlap)
+    windows = []
+
+    for start in range(0, len(words), step):
+        windows.append(words[start:start + max_words])
+        if start + max_words >= len(words):
+            break
+
+    return windows
+
+
+def chunk_text(text: str, max_words: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> list:
+    """
+    Splits a CV into embedding-sized chunks.
+
+    - Sections (blank-line separated blocks) are packed together
+      until a chunk would exceed max_words
+    - A section longer than max_words is cut into sliding windows
+      overlapping by `overlap` words
+
+    Always returns at least one chunk.
+    """
+
+    chunks = []
+    current = []
+
+    for section in _SECTION_RE.split(text or ""):
+        words = section.split()
+        if not words:
+            continue
+
+        if len(words) > max_words:
+            if current:
+                chunks.append(" ".join(current))
+                current = []
+            chunks.extend(" ".join(w) for w in _windows(words, max_words, overlap))
+            continue
+
+        if len(current) + len(words) > max_words:
+            chunks.append(" ".join(current))
+            current = []
+        current.extend(words)
+
+    if current:
+        chunks.append(" ".join(current))
+
+    return chunks or [(text or "").strip()]
@@ -1,16 +1,112 @@
-import chromadb
-from sentence_transformers import SentenceTransformer
 import json
+import os
+import time
+
+from tools.chunking import chunk_text, CHUNK_WORDS, CHUNK_OVERLAP
+from tools.query_cache import QueryEmbeddingCache
+from tools.registry import get_embedder, DEFAULT_DB_PATH
+from tools.profiles import build_compact_profile, profile_hash, profile_is_current
+from tools.skills import skill_flags
+from tools.skill_index import SkillIndex, SKILL_INDEX_VERSION
+from tools.tracing import traced, current_span
+from agents.skill_graph import get_compiled_skill_graph
+
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+ENCODE_BATCH_SIZE = int(os.getenv("ENCODE_BATCH_SIZE", "64"))
+UPSERT_CHUNK_SIZE = int(os.getenv("UPSERT_CHUNK_SIZE", "1000"))
+SKILL_INDEX_FILE = "skill_index.{backend}.jsonl"   # inside db_path, one per backend
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")   # "chroma" or "mmap"
+MMAP_DIR = "mmap"
+
+# Multi-vector retrieval: each chunk hit counts towards its employee
+CHUNK_ID_SEP = "#chunk"
+CHUNK_AGGREGATE = os.getenv("CHUNK_AGGREGATE", "max")          # "max" or "sum"
+CHUNK_TOP_K = int(os.getenv("CHUNK_TOP_K", "3"))                # chunks summed by "sum"
+CHUNK_QUERY_FACTOR = int(os.getenv("CHUNK_QUERY_FACTOR", "4"))  # chunk hits fetched per result
+
+
+# Shared by every store; entries are keyed on the embedding model
+_query_cache = QueryEmbeddingCache()
+
+
+def chunk_id(emp_id: str, index: int) -> str:
+    # Chunk 0 keeps the bare emp_id, so the primary row holds the full CV
+    return emp_id if index == 0 else f"{emp_id}{CHUNK_ID_SEP}{index}"
 
 
 class TalentVectorStore:
 
-    def __init__(self, db_path="data/chroma_store"):
-        self.client = chromadb.PersistentClient(path=db_path)
-        self.collection = self.client.get_or_create_collection(
-            name="employees"
-        )
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+    def __init__(self, db_path=DEFAULT_DB_PATH, backend=None):
+
+        self.backend = backend or VECTOR_BACKEND
+
+        if self.backend == "mmap":
+            # Memory-mapped (optionally quantized) vectors + in-process ANN
+            from tools.mmap_backend import MmapCollection
+
+            self.client = None
+            self.collection = MmapCollection(os.path.join(db_path, MMAP_DIR))
+        elif self.backend == "chroma":
+            import chromadb
+
+            self.client = chromadb.PersistentClient(path=db_path)
+            self.collection = self.client.get_or_create_collection(
+                name="employees"
+            )
+        else:
+            raise ValueError(f"Unknown VECTOR_BACKEND: {self.backend}")
+
+        self.model_name = EMBEDDING_MODEL
+        self.db_path = db_path
+        self.query_cache = _query_cache
+        self._skill_index = None
+
+    @property
+    def skill_index(self) -> SkillIndex:
+        # Lives in the store directory, so wiping the store drops it too:
+        # data/chroma_store/skill_index.chroma.jsonl
+        if self._skill_index is None:
+            os.makedirs(self.db_path, exist_ok=True)
+            index = SkillIndex(os.path.join(self.db_path, SKILL_INDEX_FILE.format(backend=self.backend)))
+            # Rows ingested before the index, or an index that drifted from
+            # the store, would skew every skill pre-filter: rebuild from the store
+            if index.version != SKILL_INDEX_VERSION or len(index) != self._employee_count():
+                index.rebuild(self._stored_skills())
+                print(f"Rebuilt skill index from {len(index)} stored employees")
+            self._skill_index = index
+        return self._skill_index
+
+    def _employee_count(self) -> int:
+        # Primary rows only; chunk rows are "<emp_id>#chunk<n>"
+        return sum(1 for row_id in self.collection.get(include=[])["ids"] if CHUNK_ID_SEP not in row_id)
+
+    def _stored_skills(self, page_size: int = 1000):
+        """
+        (emp_id, metadata) for every primary row, for rebuilding the skill index.
+        """
+
+        offset = 0
+
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            for row_id, metadata in zip(page["ids"], page["metadatas"]):
+                metadata = metadata or {}
+                if metadata.get("chunk", 0) == 0:
+                    yield row_id, metadata
+            if len(page["ids"]) < page_size:
+                return
+            offset += page_size
+
+    @property
+    def embedding_version(self) -> str:
+        # Cached chunk embeddings are only valid for one model + chunking setup
+        return f"{self.model_name}|chunks:{CHUNK_WORDS}/{CHUNK_OVERLAP}"
+
+    @property
+    def model(self):
+        # Loaded on first encode and shared with every other store
+        return get_embedder(self.model_name)
 
 
     def _clean_metadata(self, metadata: dict) -> dict:
@@ -82,9 +178,7 @@ class TalentVectorStore:
 
         return clean_meta
 
-    def add_employee(self, emp_id: str, text: str, metadata=None):
-
-        embedding = self.model.encode(text, normalize_embeddings=True).tolist()
+    def _safe_metadata(self, metadata) -> dict:
 
         safe_metadata = self._clean_metadata(metadata or {})
 
@@ -92,20 +186,348 @@ class TalentVectorStore:
         if not safe_metadata:
             safe_metadata = {"placeholder": "none"}
 
-        self.collection.upsert(
-            ids=[emp_id],
-            documents=[text],
-            embeddings=[embedding],
-            metadatas=[safe_metadata]
-        )
+        return safe_metadata
+
+    def add_employee(self, emp_id: str, text: str, metadata=None):
+
+        self.add_employees([{"emp_id": emp_id, "text": text, "metadata": metadata}])
+
+    @traced("store.add_employees")
+    def add_employees(self, batch: list,
+                      batch_size: int = ENCODE_BATCH_SIZE,
+                      upsert_chunk_size: int = UPSERT_CHUNK_SIZE) -> dict:
+        """
+        Bulk version of add_employee.
+
+        batch: [{"emp_id": str, "text": str, "metadata": dict,
+                 "embedding": [[...], ...] (optional, one per chunk)}, ...]
+
+        - Each text is split with chunk_text; chunk 0 is stored under
+          emp_id together with the full document and metadata, the
+          others under "<emp_id>#chunk<n>" with the skill flags
+        - Chunks without precomputed embeddings are encoded together,
+          batch_size at a time, and written back to record["embedding"]
+        - Rows are upserted upsert_chunk_size at a time
+        - Records sharing an emp_id are collapsed, the last one wins
+          (as with one add_employee call per record)
+
+        Returns throughput stats:
+        {"documents": n, "chunks": c, "encoded": e, "seconds": s, "docs_per_second": r}
+        """
+
+        starttime = time.time()
+
+        if not batch:
+            return {"documents": 0, "chunks": 0, "encoded": 0, "seconds": 0.0, "docs_per_second": 0.0}
+
+        # Chroma rejects duplicate ids within one upsert
+        unique = {}
+        for record in batch:
+            previous = unique.pop(record["emp_id"], None)
+            if previous is not None:
+                print(
+                    f"Duplicate employee id {record['emp_id']} in batch: "
+                    f"{previous.get('path', '?')} replaced by {record.get('path', '?')}"
+                )
+            unique[record["emp_id"]] = record
+        batch = list(unique.values())
+
+        ids = [record["emp_id"] for record in batch]
+        chunks = [chunk_text(record["text"]) for record in batch]
+
+        missing = [
+            i for i, record in enumerate(batch)
+            if record.get("embedding") is None or len(record["embedding"]) != len(chunks[i])
+        ]
+
+        if missing:
+            encoded = self.model.encode(
+                [c for i in missing for c in chunks[i]],
+                batch_size=batch_size,
+                normalize_embeddings=True
+            ).tolist()
+            offset = 0
+            for i in missing:
+                batch[i]["embedding"] = encoded[offset:offset + len(chunks[i])]
+                offset += len(chunks[i])
+
+        # Primary row: sanitized metadata + one boolean key per skill for
+        # `where` pre-filters + the SKILL_GRAPH terms in the text, so boosts
+        # never re-scan the CV. Chunk rows carry the flags only
+        graph = get_compiled_skill_graph()
+        rows = []
+        for record, pieces in zip(batch, chunks):
+            emp_id = record["emp_id"]
+            flags = skill_flags(record.get("metadata"))
+
+            metadata = {**self._safe_metadata(record.get("metadata")), **flags}
+            # JSON string, so an empty list survives metadata cleaning
+            metadata["graph_terms"] = json.dumps(graph.match_terms(record["text"]))
+            # Lets incremental sync skip employees whose file did not change;
+            # left out after a failed extraction so the next sync retries it
+            if record.get("content_hash") and not record.get("extraction_failed"):
+                metadata["content_hash"] = record["content_hash"]
+            # Short profile for scoring prompts, valid while profile_hash
+            # matches the stored document
+            metadata["compact_profile"] = build_compact_profile(record["text"], record.get("metadata"))
+            metadata["profile_hash"] = profile_hash(record["text"])
+            metadata.update({"emp_id": emp_id, "chunk": 0, "chunks": len(pieces)})
+
+            rows.append((emp_id, record["text"], record["embedding"][0], metadata))
+            for n in range(1, len(pieces)):
+                rows.append((
+                    chunk_id(emp_id, n),
+                    pieces[n],
+                    record["embedding"][n],
+                    {**flags, "emp_id": emp_id, "chunk": n}
+                ))
+
+        # A re-ingested CV may have fewer chunks than before
+        self.collection.delete(where={"$and": [{"emp_id": {"$in": ids}}, {"chunk": {"$gt": 0}}]})
+
+        # Chroma rejects upserts above its own max batch size
+        max_batch = getattr(self.client, "get_max_batch_size", lambda: upsert_chunk_size)()
+        size = max(1, min(upsert_chunk_size, max_batch))
+
+        for i in range(0, len(rows), size):
+            row_ids, documents, embeddings, metadatas = zip(*rows[i:i + size])
+            self.collection.upsert(
+                ids=list(row_ids),
+                documents=list(documents),
+                embeddings=list(embeddings),
+                metadatas=list(metadatas)
+            )
+
+        self.skill_index.add_many([(record["emp_id"], record.get("metadata") or {}) for record in batch])
+
+        elapsed = time.time() - starttime
+        current_span().set(documents=len(ids), chunks=len(rows), encoded=len(missing))
+
+        return {
+            "documents": len(ids),
+            "chunks": len(rows),
+            "encoded": len(missing),
+            "seconds": round(elapsed, 3),
+            "docs_per_second": round(len(ids) / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+    @traced("store.refresh_profiles")
+    def refresh_profiles(self, page_size: int = 1000) -> int:
+        """
+        Rebuilds the compact profile of every primary row stored without
+        one, or whose profile no longer matches its document (rows from
+        before compact profiles, or built by an older builder).
+        Returns how many were rewritten.
+        """
+
+        refreshed = 0
+        offset = 0
 
-    def query(self, query_text: str, top_k=5):
+        while True:
+            page = self.collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            stale = [
+                (row_id, document or "", metadata or {})
+                for row_id, document, metadata in zip(page["ids"], page["documents"], page["metadatas"])
+                if (metadata or {}).get("chunk", 0) == 0 and not profile_is_current(document or "", metadata)
+            ]
+            if stale:
+                self.collection.update(
+                    ids=[row_id for row_id, _, _ in stale],
+                    metadatas=[
+                        {"compact_profile": build_compact_profile(document, metadata),
+                         "profile_hash": profile_hash(document)}
+                        for _, document, metadata in stale
+                    ]
+                )
+                refreshed += len(stale)
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
 
-        query_embedding = self.model.encode(query_text, normalize_embeddings=True).tolist()
+        current_span().set(refreshed=refreshed)
 
-        return self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k
+        return refreshed
+
+    @traced("store.delete_employees")
+    def delete_employees(self, emp_ids: list):
+
+        if not emp_ids:
+            return
+
+        emp_ids = list(emp_ids)
+        self.collection.delete(ids=emp_ids)
+        self.collection.delete(where={"emp_id": {"$in": emp_ids}})
+        self.skill_index.remove_many(emp_ids)
+
+    def content_hashes(self, page_size: int = 1000) -> dict:
+        """
+        {emp_id: content_hash} for every stored employee
+        (None for rows upserted without a hash).
+        """
+
+        hashes = {}
+        offset = 0
+
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            for row_id, metadata in zip(page["ids"], page["metadatas"]):
+                metadata = metadata or {}
+                if metadata.get("chunk", 0) == 0:
+                    hashes[row_id] = metadata.get("content_hash")
+            if len(page["ids"]) < page_size:
+                return hashes
+            offset += page_size
+
+    def graph_terms(self, emp_ids: list) -> dict:
+        """
+        {emp_id: SKILL_GRAPH terms found in the CV}, read from the
+        "graph_terms" stored at ingest (rows stored without it are
+        matched from their document here).
+        """
+
+        if not emp_ids:
+            return {}
+
+        rows = self.collection.get(ids=list(dict.fromkeys(emp_ids)), include=["metadatas", "documents"])
+        terms = {}
+
+        for row_id, metadata, document in zip(rows["ids"], rows["metadatas"], rows["documents"]):
+            stored = (metadata or {}).get("graph_terms")
+            if isinstance(stored, str):
+                stored = json.loads(stored)
+            terms[row_id] = stored if stored is not None else get_compiled_skill_graph().match_terms(document or "")
+
+        return terms
+
+    # ---------------------------------------------------
+    # Multi-vector queries
+    # ---------------------------------------------------
+
+    def _aggregate(self, row_ids, metadatas, distances, top_k, aggregate):
+        """
+        Groups chunk hits by employee and ranks employees by their best
+        chunk ("max") or the sum of their CHUNK_TOP_K best chunks ("sum").
+        Returns [(emp_id, best distance), ...].
+        """
+
+        hits = {}
+        for row_id, metadata, distance in zip(row_ids, metadatas, distances):
+            # Rows stored before chunking have no emp_id key
+            emp_id = (metadata or {}).get("emp_id", row_id)
+            hits.setdefault(emp_id, []).append(distance)
+
+        def score(item):
+            # Normalized embeddings + Chroma's default L2 space: d = 2 - 2cos
+            similarities = sorted((1.0 - d / 2.0 for d in item[1]), reverse=True)
+            if aggregate == "sum":
+                return sum(similarities[:CHUNK_TOP_K])
+            return similarities[0]
+
+        ranked = sorted(hits.items(), key=score, reverse=True)[:top_k]
+
+        return [(emp_id, min(found)) for emp_id, found in ranked]
+
+    def _query_employees(self, query_embeddings, top_k, where=None, ids=None, aggregate=None):
+        """
+        ANN over chunk rows, aggregated to one hit per employee.
+        Returns a Chroma-shaped result holding the employees' full
+        documents and metadata.
+        """
+
+        aggregate = aggregate or CHUNK_AGGREGATE
+
+        if ids is not None:
+            # Chunk rows share their employee's emp_id, not its row id
+            clause = {"emp_id": {"$in": list(ids)}}
+            where = clause if where is None else {"$and": [where, clause]}
+
+        raw = self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=top_k * max(1, CHUNK_QUERY_FACTOR),
+            where=where,
+            include=["metadatas", "distances"]
         )
-    
+
+        ranked = [
+            self._aggregate(row_ids, metadatas, distances, top_k, aggregate)
+            for row_ids, metadatas, distances in zip(raw["ids"], raw["metadatas"], raw["distances"])
+        ]
+
+        wanted = list({emp_id for hits in ranked for emp_id, _ in hits})
+        primary = self.collection.get(ids=wanted, include=["documents", "metadatas"]) if wanted else {
+            "ids": [], "documents": [], "metadatas": []
+        }
+        rows = {
+            emp_id: (document, metadata)
+            for emp_id, document, metadata in zip(primary["ids"], primary["documents"], primary["metadatas"])
+        }
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for hits in ranked:
+            hits = [(emp_id, distance) for emp_id, distance in hits if emp_id in rows]
+            results["ids"].append([emp_id for emp_id, _ in hits])
+            results["documents"].append([rows[emp_id][0] for emp_id, _ in hits])
+            results["metadatas"].append([rows[emp_id][1] for emp_id, _ in hits])
+            results["distances"].append([distance for _, distance in hits])
+
+        return results
+
+    def encode_queries(self, query_texts: list, batch_size: int = ENCODE_BATCH_SIZE) -> list:
+        """
+        Query embeddings through the LRU cache; misses are encoded
+        in one batch and cached.
+        """
+
+        embeddings = [self.query_cache.get(text, self.model_name) for text in query_texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        current_span().add("cache_hits", len(query_texts) - len(missing))
+        current_span().add("cache_misses", len(missing))
+
+        if missing:
+            encoded = self.model.encode(
+                [query_texts[i] for i in missing],
+                batch_size=batch_size,
+                normalize_embeddings=True
+            ).tolist()
+            for i, embedding in zip(missing, encoded):
+                self.query_cache.put(query_texts[i], self.model_name, embedding)
+                embeddings[i] = embedding
+
+        return embeddings
+
+    @traced("store.query")
+    def query(self, query_text: str = None, top_k=5, where=None, ids=None, aggregate=None,
+              query_embedding=None):
+        """
+        Top employees for query_text; aggregate is "max" (best chunk)
+        or "sum" (sum of the best CHUNK_TOP_K chunks).
+        A precomputed (normalized) query_embedding skips encoding.
+        """
+
+        if query_embedding is None:
+            query_embedding = self.encode_queries([query_text])[0]
+
+        return self._query_employees([query_embedding], top_k, where=where, ids=ids, aggregate=aggregate)
+
+    def find_candidates(self, all_of=(), any_of=(), min_years=None) -> list:
+        """
+        Boolean skill lookup on the inverted index, e.g.
+        find_candidates(all_of=["Docker", "Jenkins"], min_years={"Docker": 3})
+        """
+        return self.skill_index.query(all_of=all_of, any_of=any_of, min_years=min_years)
+
+    @traced("store.query_many")
+    def query_many(self, query_texts: list = None, top_k=5, batch_size: int = ENCODE_BATCH_SIZE,
+                   aggregate=None, query_embeddings=None):
+        """
+        Multi-query version of query: one encode batch (cache misses
+        only), one collection.query.
+        Result lists are indexed by query position, same as Chroma.
+        """
+
+        if query_embeddings is None:
+            query_embeddings = self.encode_queries(query_texts, batch_size=batch_size)
+
+        return self._query_employees(query_embeddings, top_k, aggregate=aggregate)
 
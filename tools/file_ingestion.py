@@ -5,52 +5,169 @@ import pdfplumber
 import PyPDF2
 import os
 
-def read_txt(path):
+TEXT_BLOCK_CHARS = 64 * 1024
+TABLE_CHUNK_ROWS = int(os.getenv("TABLE_CHUNK_ROWS", "500"))
+MAX_DOCUMENT_BYTES = int(os.getenv("MAX_DOCUMENT_BYTES", str(1024 * 1024)))
+
+
+# -------------------------------------------------------
+# 1. STREAMING READERS (one chunk per block / row block / paragraph / slide / page)
+# -------------------------------------------------------
+
+def iter_txt(path):
     with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+        for block in iter(lambda: f.read(TEXT_BLOCK_CHARS), ""):
+            yield block
 
-def read_csv(path):
-    df = pd.read_csv(path)
-    return df.to_string()
+def iter_csv(path, rows=TABLE_CHUNK_ROWS):
+    with pd.read_csv(path, chunksize=rows) as reader:
+        for i, chunk in enumerate(reader):
+            yield ("\n" if i else "") + chunk.to_string(header=i == 0)
 
-def read_excel(path):
+def iter_excel(path, rows=TABLE_CHUNK_ROWS):
+    # No streaming reader that keeps the DataFrame.to_string layout;
+    # at least render it in row blocks
     df = pd.read_excel(path)
-    return df.to_string()
+    for start in range(0, len(df), rows):
+        yield ("\n" if start else "") + df.iloc[start:start + rows].to_string(header=start == 0)
 
-def read_docx(path):
+def iter_docx(path):
     doc = docx.Document(path)
-    return "\n".join([p.text for p in doc.paragraphs])
+    for i, p in enumerate(doc.paragraphs):
+        yield ("\n" if i else "") + p.text
 
-def read_pptx(path):
+def iter_pptx(path):
     prs = Presentation(path)
-    text = []
+    first = True
     for slide in prs.slides:
-        for shape in slide.shapes:
-            if hasattr(shape, "text"):
-                text.append(shape.text)
-    return "\n".join(text)
+        texts = [shape.text for shape in slide.shapes if hasattr(shape, "text")]
+        if not texts:
+            continue
+        yield ("" if first else "\n") + "\n".join(texts)
+        first = False
+
+def iter_pdf(path):
+    """
+    PyMuPDF first (much faster), pdfplumber as a fallback, for the
+    whole file if PyMuPDF cannot open it, per page if a page fails.
+    A page neither can extract is skipped instead of failing the file.
+    Pages are yielded one at a time and released after use.
+    """
+
+    try:
+        try:
+            import pymupdf
+        except ImportError:
+            import fitz as pymupdf  # PyMuPDF < 1.24
+        doc = pymupdf.open(path)
+    except Exception:
+        doc = None
+
+    if doc is not None:
+        with doc:
+            for number in range(len(doc)):
+                try:
+                    text = doc[number].get_text()
+                except Exception as e:
+                    print(f"PyMuPDF failed on {path} page {number + 1}, trying pdfplumber: {e}")
+                    text = _pdfplumber_page(path, number)
+                yield text
+        return
 
-def read_pdf(path):
-    text = ""
     with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
+        for number, page in enumerate(pdf.pages):
+            yield _extract_page(path, number, page)
+
+def _pdfplumber_page(path, number):
+    try:
+        with pdfplumber.open(path) as pdf:
+            return _extract_page(path, number, pdf.pages[number])
+    except Exception as e:
+        print(f"Skipping {path} page {number + 1}: {e}")
+        return ""
+
+def _extract_page(path, number, page):
+    try:
+        return page.extract_text() or ""
+    except Exception as e:
+        print(f"Skipping {path} page {number + 1}: {e}")
+        return ""
+    finally:
+        # pdfplumber caches parsed layout objects on each page
+        if hasattr(page, "close"):
+            page.close()
+        else:
+            page.flush_cache()
+
+
+READERS = {
+    ".txt": iter_txt,
+    ".csv": iter_csv,
+    ".xls": iter_excel,
+    ".xlsx": iter_excel,
+    ".docx": iter_docx,
+    ".pptx": iter_pptx,
+    ".pdf": iter_pdf,
+}
+
+
+def iter_text_chunks(path, max_bytes=MAX_DOCUMENT_BYTES):
+    """
+    Yields the document's text chunk by chunk.
+    Stops (and closes the underlying file) once max_bytes of UTF-8
+    text have been produced, printing a note if text was cut off;
+    max_bytes=None or 0 means no cap.
+    """
 
-def extract_text_from_file(path):
     ext = os.path.splitext(path)[1].lower()
 
-    if ext == ".txt":
-        return read_txt(path)
-    elif ext == ".csv":
-        return read_csv(path)
-    elif ext in [".xls", ".xlsx"]:
-        return read_excel(path)
-    elif ext == ".docx":
-        return read_docx(path)
-    elif ext == ".pptx":
-        return read_pptx(path)
-    elif ext == ".pdf":
-        return read_pdf(path)
-    else:
-        raise ValueError("Unsupported file format")
\ No newline at end of file
+    if ext not in READERS:
+        raise ValueError("Unsupported file format")
+
+    chunks = READERS[ext](path)
+    remaining = max_bytes or None
+
+    try:
+        for chunk in chunks:
+            if remaining is None:
+                yield chunk
+                continue
+
+            encoded = chunk.encode("utf-8")
+            if len(encoded) >= remaining:
+                # Exactly at the cap is only a truncation if more text follows
+                if len(encoded) > remaining or next(chunks, None):
+                    print(f"Truncated {path} at {max_bytes} bytes (MAX_DOCUMENT_BYTES)")
+                yield encoded[:remaining].decode("utf-8", errors="ignore")
+                return
+
+            remaining -= len(encoded)
+            yield chunk
+    finally:
+        chunks.close()
+
+
+# -------------------------------------------------------
+# 2. WHOLE-DOCUMENT READERS
+# -------------------------------------------------------
+
+def read_txt(path):
+    return "".join(iter_txt(path))
+
+def read_csv(path):
+    return "".join(iter_csv(path))
+
+def read_excel(path):
+    return "".join(iter_excel(path))
+
+def read_docx(path):
+    return "".join(iter_docx(path))
+
+def read_pptx(path):
+    return "".join(iter_pptx(path))
+
+def read_pdf(path):
+    return "".join(iter_pdf(path))
+
+def extract_text_from_file(path, max_bytes=MAX_DOCUMENT_BYTES):
+    return "".join(iter_text_chunks(path, max_bytes=max_bytes))
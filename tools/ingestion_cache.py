@@ -0,0 +1,144 @@
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+
+INGESTION_CACHE_DB = os.getenv("INGESTION_CACHE_DB", "data/ingestion_cache.sqlite")
+
+
+def file_content_hash(path: str) -> str:
+
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _dump_embedding(embedding) -> bytes:
+    # .npy bytes keep the (chunks, dim) shape
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(embedding, dtype=np.float32), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _load_embedding(blob: bytes):
+    try:
+        return np.load(io.BytesIO(blob), allow_pickle=False).tolist()
+    except ValueError:
+        return None  # raw single-vector blob from before chunking
+
+
+class IngestionCache:
+    """
+    Persistent per-file cache keyed on the file's content hash.
+
+    Stores:
+    - extracted text
+    - structured skills (valid for one MODEL_NAME + prompt version)
+    - chunk embeddings (valid for one embedding model + chunking setup)
+
+    Entries produced by a different LLM / prompt version are evicted
+    on open, and embeddings from a different embedding model are dropped.
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 prompt_version: str,
+                 embedding_model: str,
+                 db_path=INGESTION_CACHE_DB):
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.model_name = model_name
+        self.prompt_version = prompt_version
+        self.embedding_model = embedding_model
+        self.conn = sqlite3.connect(db_path)
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                content_hash TEXT PRIMARY KEY,
+                model_name TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                embedding_model TEXT,
+                text TEXT NOT NULL,
+                structured TEXT NOT NULL,
+                embedding BLOB,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._evict_stale()
+
+    def _evict_stale(self):
+
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM entries WHERE model_name != ? OR prompt_version != ?",
+                (self.model_name, self.prompt_version)
+            )
+            self.conn.execute(
+                "UPDATE entries SET embedding = NULL, embedding_model = NULL "
+                "WHERE embedding_model IS NOT NULL AND embedding_model != ?",
+                (self.embedding_model,)
+            )
+
+    def get(self, content_hash: str):
+        """
+        Returns {"text", "metadata", "embedding"} or None.
+        "embedding" is None when only text + skills are cached.
+        """
+
+        row = self.conn.execute(
+            "SELECT text, structured, embedding FROM entries WHERE content_hash = ?",
+            (content_hash,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        text, structured, embedding = row
+
+        return {
+            "text": text,
+            "metadata": json.loads(structured),
+            "embedding": _load_embedding(embedding) if embedding else None,
+        }
+
+    def put_many(self, records: list):
+        """
+        records: [{"content_hash", "text", "metadata", "embedding"?}, ...]
+        """
+
+        now = time.time()
+        rows = []
+
+        for record in records:
+            embedding = record.get("embedding")
+            rows.append((
+                record["content_hash"],
+                self.model_name,
+                self.prompt_version,
+                self.embedding_model if embedding is not None else None,
+                record["text"],
+                json.dumps(record["metadata"]),
+                _dump_embedding(embedding) if embedding is not None else None,
+                now,
+            ))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,369 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from tools.ingestion_cache import IngestionCache, INGESTION_CACHE_DB, file_content_hash
+from tools.parse_pool import (
+    ParsePool,
+    ParseQuarantine,
+    PARSE_QUARANTINE_FILE,
+    PARSE_TIMEOUT,
+)
+from tools.profiles import USE_COMPACT_PROFILES
+from agents.skill_extraction_agent import empty_skills, try_extract_structured_skills, PROMPT_VERSION
+from agents.llm_client import MODEL_NAME
+
+
+# Kept inside the store directory, so wiping the store also resets the checkpoint
+CHECKPOINT_FILE = "ingestion_checkpoint.jsonl"
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "64"))
+
+
+def list_files(path: str) -> list:
+    return [
+        os.path.join(path, name)
+        for name in sorted(os.listdir(path))
+        if os.path.isfile(os.path.join(path, name))
+    ]
+
+
+def emp_id_from_path(path: str) -> str:
+    """
+    cv_profiles_db/<name>_<emp_id>.<ext>  →  <emp_id>
+    """
+    return os.path.basename(path).split(".")[0].split("_")[-1]
+
+
+# -------------------------------------------------------
+# 1. CHECKPOINT (one JSON line per finished file)
+# -------------------------------------------------------
+
+class IngestionCheckpoint:
+    """
+    A file counts as done only for the content hash it was indexed
+    with, so a CV edited in place is ingested again on the next run.
+    """
+
+    def __init__(self, checkpoint_file: str):
+        self.checkpoint_file = checkpoint_file
+        self.done = {}
+
+        if os.path.exists(checkpoint_file):
+            with open(checkpoint_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    if entry.get("status") == "done":
+                        self.done[entry["path"]] = entry.get("content_hash")
+
+        directory = os.path.dirname(checkpoint_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._fh = open(checkpoint_file, "a", encoding="utf-8")
+
+    def is_done(self, path: str, content_hash: str) -> bool:
+        # Entries written before hashes were recorded never match
+        done = self.done.get(os.path.abspath(path))
+        return done is not None and done == content_hash
+
+    def mark(self, path: str, emp_id: str, status: str, error: str = "", content_hash: str = None):
+        path = os.path.abspath(path)
+        entry = {"path": path, "emp_id": emp_id, "status": status}
+        if content_hash:
+            entry["content_hash"] = content_hash
+        if error:
+            entry["error"] = error
+
+        self._fh.write(json.dumps(entry) + "\n")
+        self._fh.flush()
+
+        if status == "done":
+            self.done[path] = content_hash
+
+    def close(self):
+        self._fh.close()
+
+
+# -------------------------------------------------------
+# 2. PIPELINE
+# -------------------------------------------------------
+
+def _extract(profilepath: str, emp_text: str) -> dict:
+
+    metadata = try_extract_structured_skills(emp_text)
+
+    return {
+        "path": profilepath,
+        "emp_id": emp_id_from_path(profilepath),
+        "text": emp_text,
+        # Indexed with empty skills for now, but never cached or
+        # checkpointed as done, so the next run / sync extracts it again
+        "metadata": metadata if metadata is not None else empty_skills(),
+        "extraction_failed": metadata is None,
+    }
+
+
+class IngestionPipeline:
+    """
+    CV directory → parsed text → structured skills → vector store.
+
+    - Parsing runs in a supervised worker pool (CPU bound; per-file
+      timeout, memory cap, worker recycling — see tools.parse_pool)
+    - Files that fail to parse are quarantined and skipped until
+      their content changes
+    - LLM extraction runs in a bounded thread pool (I/O bound)
+    - Upserts are buffered and flushed in batches
+    - Every flushed file is checkpointed with its content hash, so a
+      crashed run resumes and a CV edited in place is picked up again
+    - Files whose content hash is in the ingestion cache skip parsing,
+      extraction and (when cached) embedding
+    - sync() only touches files whose content hash changed since the
+      last upsert, and deletes employees whose file is gone
+    """
+
+    def __init__(self,
+                 store,
+                 checkpoint_file=None,
+                 parse_workers=PARSE_WORKERS,
+                 extraction_workers=EXTRACTION_WORKERS,
+                 batch_size=UPSERT_BATCH_SIZE,
+                 cache_db=INGESTION_CACHE_DB,
+                 parse_timeout=PARSE_TIMEOUT,
+                 quarantine_file=PARSE_QUARANTINE_FILE):
+        self.store = store
+        self.checkpoint_file = checkpoint_file or os.getenv(
+            "INGESTION_CHECKPOINT", os.path.join(store.db_path, CHECKPOINT_FILE)
+        )
+        self.parse_workers = max(1, parse_workers)
+        self.extraction_workers = max(1, extraction_workers)
+        self.batch_size = max(1, batch_size)
+        self.cache_db = cache_db
+        self.parse_timeout = parse_timeout
+        self.quarantine_file = quarantine_file
+
+    def run(self, path: str) -> dict:
+        """
+        Full ingestion of a CV directory, resuming from the checkpoint.
+        """
+
+        checkpoint = IngestionCheckpoint(self.checkpoint_file)
+
+        try:
+            files = list_files(path)
+            hashes = {}
+            pending = []
+            for profilepath in files:
+                try:
+                    hashes[profilepath] = file_content_hash(profilepath)
+                except OSError:
+                    pending.append(profilepath)  # _ingest reports the failure
+                    continue
+                if not checkpoint.is_done(profilepath, hashes[profilepath]):
+                    pending.append(profilepath)
+
+            stats = self._ingest(pending, checkpoint=checkpoint, hashes=hashes)
+            stats["total"] = len(files)
+            stats["skipped"] = len(files) - len(pending)
+        finally:
+            checkpoint.close()
+
+        return stats
+
+    def sync(self, path: str) -> dict:
+        """
+        Incremental sync of a CV directory against the store:
+        - new or changed files (by content hash) are re-extracted and upserted
+        - unchanged files are not touched
+        - employees whose file disappeared are deleted
+        - stale or missing compact profiles are rebuilt, so queries
+          never have to (see TalentVectorStore.refresh_profiles)
+        """
+
+        starttime = time.time()
+        stored = self.store.content_hashes()
+
+        current = {}
+        hashes = {}
+        failed = []
+
+        for profilepath in list_files(path):
+            try:
+                hashes[profilepath] = file_content_hash(profilepath)
+            except OSError as e:
+                failed.append(profilepath)
+                print(f"Failed {profilepath}: {e}")
+                continue
+            emp_id = emp_id_from_path(profilepath)
+            if emp_id in current:
+                print(f"Duplicate employee id {emp_id}: {current[emp_id]} and {profilepath}")
+            current[emp_id] = profilepath
+
+        changed = [
+            profilepath for emp_id, profilepath in current.items()
+            if stored.get(emp_id) != hashes[profilepath]
+        ]
+        removed = [emp_id for emp_id in stored if emp_id not in current]
+
+        # Deleted files keep their (still valid) cache rows; only the index changes
+        if removed:
+            self.store.delete_employees(removed)
+
+        stats = self._ingest(changed, hashes=hashes)
+        profiles = self.store.refresh_profiles() if USE_COMPACT_PROFILES else 0
+
+        summary = {
+            "added": sum(1 for f in changed if emp_id_from_path(f) not in stored),
+            "updated": sum(1 for f in changed if emp_id_from_path(f) in stored),
+            "unchanged": len(current) - len(changed),
+            "deleted": len(removed),
+            "profiles_refreshed": profiles,
+            "failed": stats["failed"] + len(failed),
+            "quarantined": stats["quarantined"],
+            "cache_hits": stats["cache_hits"],
+            "seconds": round(time.time() - starttime, 2),
+        }
+        print("Sync summary:", summary)
+
+        return summary
+
+    def _ingest(self, pending: list, checkpoint=None, hashes=None) -> dict:
+
+        cache = None
+        if self.cache_db:
+            cache = IngestionCache(MODEL_NAME, PROMPT_VERSION, self.store.embedding_version, self.cache_db)
+
+        stats = {
+            "indexed": 0,
+            "failed": 0,
+            "cache_hits": 0,
+            "quarantined": 0,
+        }
+        quarantine = ParseQuarantine(self.quarantine_file) if self.quarantine_file else None
+        parse_pool = ParsePool(workers=self.parse_workers, timeout=self.parse_timeout)
+        hashes = dict(hashes or {})
+        batch = []
+        starttime = time.time()
+
+        def flush():
+            if not batch:
+                return
+            upsert_stats = self.store.add_employees(batch)
+            if cache is not None:
+                cache.put_many([r for r in batch if not r.get("cached") and not r.get("extraction_failed")])
+            if checkpoint is not None:
+                for record in batch:
+                    if record.get("extraction_failed"):
+                        checkpoint.mark(record["path"], record["emp_id"], "failed", "skill extraction failed")
+                    else:
+                        checkpoint.mark(record["path"], record["emp_id"], "done",
+                                        content_hash=record["content_hash"])
+            stats["indexed"] += len(batch)
+            print(
+                f"Indexed {stats['indexed']}/{len(pending)} new profiles "
+                f"({upsert_stats['docs_per_second']} docs/s embed+upsert)"
+            )
+            batch.clear()
+
+        def fail(profilepath, error):
+            stats["failed"] += 1
+            if checkpoint is not None:
+                checkpoint.mark(profilepath, emp_id_from_path(profilepath), "failed", str(error))
+            print(f"Failed {profilepath}: {error}")
+
+        def collect(futures):
+            for future in futures:
+                profilepath = extraction_futures_paths.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    fail(profilepath, e)
+                    continue
+                record["content_hash"] = hashes[profilepath]
+                add(record)
+
+        def add(record):
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                flush()
+
+        extraction_futures = set()
+        extraction_futures_paths = {}
+
+        try:
+            # Cache lookup first: unchanged files never reach the pools
+            to_parse = []
+            for profilepath in pending:
+                try:
+                    if profilepath not in hashes:
+                        hashes[profilepath] = file_content_hash(profilepath)
+                except OSError as e:
+                    fail(profilepath, e)
+                    continue
+
+                reason = quarantine.reason(profilepath, hashes[profilepath]) if quarantine is not None else None
+                if reason is not None:
+                    stats["quarantined"] += 1
+                    if checkpoint is not None:
+                        checkpoint.mark(profilepath, emp_id_from_path(profilepath), "failed", f"quarantined: {reason}")
+                    print(f"Quarantined {profilepath}: {reason}")
+                    continue
+
+                cached = cache.get(hashes[profilepath]) if cache is not None else None
+                if cached is None:
+                    to_parse.append(profilepath)
+                    continue
+
+                stats["cache_hits"] += 1
+                add({
+                    "path": profilepath,
+                    "emp_id": emp_id_from_path(profilepath),
+                    "content_hash": hashes[profilepath],
+                    "text": cached["text"],
+                    "metadata": cached["metadata"],
+                    "embedding": cached["embedding"],
+                    "cached": cached["embedding"] is not None,
+                })
+
+            with ThreadPoolExecutor(max_workers=self.extraction_workers) as llm_pool:
+
+                for profilepath, emp_text, error in parse_pool.map(to_parse):
+
+                    if error is not None:
+                        # Parser errors, or timeouts / crashes that repeated after
+                        # ParsePool's retries: skip the file until it changes
+                        if quarantine is not None:
+                            quarantine.add(profilepath, hashes[profilepath], str(error))
+                        fail(profilepath, error)
+                        continue
+
+                    # Keep the LLM backlog bounded so parsed text does not pile up
+                    while len(extraction_futures) >= self.extraction_workers * 2:
+                        done, extraction_futures = wait(
+                            extraction_futures, return_when=FIRST_COMPLETED
+                        )
+                        collect(done)
+
+                    future = llm_pool.submit(_extract, profilepath, emp_text)
+                    extraction_futures.add(future)
+                    extraction_futures_paths[future] = profilepath
+
+                done, _ = wait(extraction_futures)
+                collect(done)
+
+            flush()
+        finally:
+            if cache is not None:
+                cache.close()
+
+        elapsed = time.time() - starttime
+        stats.update({f"parse_{key}": value for key, value in parse_pool.stats.items()})
+        stats["seconds"] = round(elapsed, 2)
+        stats["files_per_second"] = round(stats["indexed"] / elapsed, 2) if elapsed > 0 else 0.0
+
+        return stats
@@ -0,0 +1,76 @@
+import json
+
+
+class JsonObjectScanner:
+    """
+    Incremental scanner for the first complete top-level JSON object
+    in a text stream (e.g. LLM tokens arriving one by one).
+
+    feed() returns the parsed dict as soon as its closing brace
+    arrives and it parses (and has every key in required_keys);
+    until then it returns None. Prose before the object, and objects
+    that turn out invalid, are skipped.
+    """
+
+    def __init__(self, required_keys=()):
+        self.required_keys = tuple(required_keys)
+        self.result = None
+        self._capture = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str):
+
+        if self.result is not None:
+            return self.result
+
+        for ch in chunk:
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._capture = [ch]
+                    self._depth = 1
+                continue
+
+            self._capture.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0 and self._accept("".join(self._capture)):
+                    return self.result
+
+        return None
+
+    def _accept(self, text: str) -> bool:
+
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            return False
+
+        if not isinstance(parsed, dict) or any(k not in parsed for k in self.required_keys):
+            return False
+
+        self.result = parsed
+        return True
+
+
+def extract_json_object(text: str, required_keys=()):
+    """
+    First valid JSON object in a complete text, or None.
+    """
+    return JsonObjectScanner(required_keys).feed(text or "")
@@ -0,0 +1,567 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+
+MMAP_QUANTIZATION = os.getenv("MMAP_QUANTIZATION", "int8")       # "none", "int8" or "binary"
+MMAP_RESCORE_FACTOR = int(os.getenv("MMAP_RESCORE_FACTOR", "8"))  # candidates re-scored per result
+# Sign bits lose more than int8, so binary scans re-score a deeper list
+MMAP_BINARY_RESCORE_FACTOR = int(os.getenv("MMAP_BINARY_RESCORE_FACTOR", "64"))
+MMAP_USE_HNSW = os.getenv("MMAP_USE_HNSW", "1") == "1"
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "128"))
+
+QUANTIZATIONS = ("none", "int8", "binary")
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+# -------------------------------------------------------
+# 1. QUANTIZATION
+# -------------------------------------------------------
+
+def quantize_int8(vectors: np.ndarray):
+    """
+    Symmetric per-vector int8: v ≈ q * scale, |q| <= 127.
+    """
+
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    # One sign bit per dimension
+    return np.packbits(vectors > 0, axis=1)
+
+
+def hamming(codes: np.ndarray, query_code: np.ndarray) -> np.ndarray:
+
+    diff = np.bitwise_xor(codes, query_code)
+
+    if hasattr(np, "bitwise_count") and diff.shape[1] % 8 == 0:
+        # NumPy >= 2: native popcount on 64-bit words
+        return np.bitwise_count(diff.view(np.uint64)).sum(axis=1, dtype=np.int32)
+
+    return _POPCOUNT[diff].sum(axis=1, dtype=np.int32)
+
+
+# -------------------------------------------------------
+# 2. METADATA FILTERS (the Chroma `where` subset the store uses)
+# -------------------------------------------------------
+
+def _ordered(compare):
+    # Like Chroma, a missing or differently typed value does not match
+    def test(a, b):
+        try:
+            return a is not None and compare(a, b)
+        except TypeError:
+            return False
+    return test
+
+
+_OPERATORS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": _ordered(lambda a, b: a > b),
+    "$gte": _ordered(lambda a, b: a >= b),
+    "$lt": _ordered(lambda a, b: a < b),
+    "$lte": _ordered(lambda a, b: a <= b),
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def compile_where(where: dict):
+    """
+    Chroma `where` dict → predicate over a metadata dict.
+    Supports equality, $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin, $and, $or.
+    """
+
+    if not where:
+        return lambda metadata: True
+
+    clauses = []
+
+    for key, condition in where.items():
+
+        if key in ("$and", "$or"):
+            parts = [compile_where(c) for c in condition]
+            combine = all if key == "$and" else any
+            clauses.append(lambda m, parts=parts, combine=combine: combine(p(m) for p in parts))
+            continue
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for op, value in condition.items():
+            if op not in _OPERATORS:
+                raise ValueError(f"Unsupported where operator: {op}")
+            if op in ("$in", "$nin"):
+                value = set(value)
+            test = _OPERATORS[op]
+            clauses.append(lambda m, key=key, test=test, value=value: test(m.get(key), value))
+
+    return lambda metadata: all(clause(metadata) for clause in clauses)
+
+
+# -------------------------------------------------------
+# 3. COLLECTION
+# -------------------------------------------------------
+
+class MmapCollection:
+    """
+    Drop-in for the subset of a Chroma collection TalentVectorStore
+    uses (upsert / get / query / delete / count).
+
+    Layout under `path`:
+    - vectors.f32   float32 rows, memory-mapped, one slot per row
+    - vectors.i8 + scales.f32   int8 codes      (quantization="int8")
+    - vectors.bits              packed sign bits (quantization="binary")
+    - rows.sqlite   id / document / metadata per slot
+    - hnsw.bin      optional hnswlib index over the float rows
+
+    Queries scan the quantized codes (or walk HNSW when hnswlib is
+    installed), then re-score the best n_results * MMAP_RESCORE_FACTOR
+    slots exactly on the float rows. Distances are squared L2 on
+    normalized vectors, the same as Chroma's default space.
+    """
+
+    def __init__(self, path: str,
+                 quantization: str = MMAP_QUANTIZATION,
+                 use_hnsw: bool = MMAP_USE_HNSW):
+
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"quantization must be one of {QUANTIZATIONS}")
+
+        os.makedirs(path, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.RLock()
+        self._meta_path = os.path.join(path, "meta.json")
+
+        meta = {}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+
+        # An existing store keeps the quantization it was built with
+        self.quantization = meta.get("quantization", quantization)
+        self.dim = meta.get("dim")
+        self.capacity = meta.get("capacity", 0)
+        # False from the first write after the last persist() until the next
+        self._hnsw_clean = meta.get("hnsw_clean", False)
+
+        self.conn = sqlite3.connect(os.path.join(path, "rows.sqlite"), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS rows (
+                slot INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                document TEXT,
+                metadata TEXT
+            )
+        """)
+
+        self.slot_of = {}
+        self.ids = {}
+        self.metadatas = {}
+        for slot, row_id, metadata in self.conn.execute("SELECT slot, id, metadata FROM rows"):
+            self.slot_of[row_id] = slot
+            self.ids[slot] = row_id
+            self.metadatas[slot] = json.loads(metadata) if metadata else None
+
+        self._next_slot = max(self.ids, default=-1) + 1
+        self._free = sorted(set(range(self._next_slot)) - set(self.ids), reverse=True)
+
+        self.live = np.zeros(self.capacity, dtype=bool)
+        if self.ids:
+            self.live[list(self.ids)] = True
+
+        self._open_arrays()
+
+        self.use_hnsw = use_hnsw
+        self._hnsw = None
+        self._hnsw_dirty = False
+        if use_hnsw:
+            self._load_hnsw()
+
+        # Saving HNSW per write would rewrite the whole graph every batch
+        atexit.register(self.persist)
+
+    # ---------------------------------------------------
+    # Files
+    # ---------------------------------------------------
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _array_specs(self):
+
+        if self.dim is None:
+            return {}
+
+        specs = {"vectors": ("vectors.f32", np.float32, (self.dim,))}
+        if self.quantization == "int8":
+            specs["codes"] = ("vectors.i8", np.int8, (self.dim,))
+            specs["scales"] = ("scales.f32", np.float32, ())
+        elif self.quantization == "binary":
+            specs["codes"] = ("vectors.bits", np.uint8, ((self.dim + 7) // 8,))
+
+        return specs
+
+    def _open_arrays(self):
+
+        self.vectors = self.codes = self.scales = None
+
+        for attr, (name, dtype, row_shape) in self._array_specs().items():
+            if self.capacity == 0:
+                setattr(self, attr, np.zeros((0,) + row_shape, dtype=dtype))
+                continue
+            setattr(self, attr, np.memmap(
+                self._file(name), dtype=dtype, mode="r+", shape=(self.capacity,) + row_shape
+            ))
+
+    def _grow(self, size: int):
+
+        if size <= self.capacity:
+            return
+
+        capacity = max(size, self.capacity * 2, 1024)
+
+        for attr, (name, dtype, row_shape) in self._array_specs().items():
+            array = getattr(self, attr)
+            if isinstance(array, np.memmap):
+                array.flush()
+            setattr(self, attr, None)
+            row_bytes = int(np.dtype(dtype).itemsize * np.prod(row_shape, dtype=np.int64))
+            # Extending the file keeps existing rows in place; no copy
+            with open(self._file(name), "ab") as f:
+                f.truncate(capacity * row_bytes)
+
+        self.live = np.concatenate([self.live, np.zeros(capacity - self.capacity, dtype=bool)])
+        self.capacity = capacity
+        self._open_arrays()
+        self._write_meta()
+
+        if self._hnsw is not None:
+            self._hnsw.resize_index(capacity)
+
+    def _write_meta(self):
+
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "quantization": self.quantization,
+                "hnsw_clean": self._hnsw_clean
+            }, f)
+        os.replace(tmp_path, self._meta_path)
+
+    # ---------------------------------------------------
+    # Optional HNSW index
+    # ---------------------------------------------------
+
+    def _load_hnsw(self):
+
+        try:
+            import hnswlib
+        except ImportError:
+            return  # brute-force scan over the quantized codes
+
+        self._hnswlib = hnswlib
+
+        if self.dim is None:
+            return
+
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index_path = self._file("hnsw.bin")
+        live = np.flatnonzero(self.live)
+
+        try:
+            if not self._hnsw_clean:
+                raise RuntimeError("stale index")
+            index.load_index(index_path, max_elements=max(self.capacity, 1))
+        except (RuntimeError, OSError):
+            # Missing or out of date (e.g. crash before persist()): rebuild
+            index = hnswlib.Index(space="ip", dim=self.dim)
+            index.init_index(max_elements=max(self.capacity, 1), M=HNSW_M,
+                             ef_construction=HNSW_EF_CONSTRUCTION)
+            if live.size:
+                index.add_items(np.asarray(self.vectors[live]), live)
+            self._mark_hnsw_dirty()
+
+        index.set_ef(HNSW_EF_SEARCH)
+        self._hnsw = index
+
+    def _mark_hnsw_dirty(self):
+
+        self._hnsw_dirty = True
+        if self._hnsw_clean:
+            # A crash before persist() then forces a rebuild on open
+            self._hnsw_clean = False
+            self._write_meta()
+
+    def persist(self):
+        """
+        Flushes the memory maps and saves the HNSW index if it changed.
+        """
+
+        with self._lock:
+            for attr in self._array_specs():
+                array = getattr(self, attr)
+                if isinstance(array, np.memmap):
+                    array.flush()
+            if self._hnsw is not None and self._hnsw_dirty:
+                self._hnsw.save_index(self._file("hnsw.bin"))
+                self._hnsw_dirty = False
+                self._hnsw_clean = True
+                self._write_meta()
+
+    def close(self):
+        self.persist()
+        atexit.unregister(self.persist)
+        self.conn.close()
+
+    # ---------------------------------------------------
+    # Writes
+    # ---------------------------------------------------
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [None] * len(ids)
+
+        with self._lock:
+
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._write_meta()
+                self._open_arrays()
+                if self.use_hnsw:
+                    self._load_hnsw()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} != collection dimension {self.dim}")
+
+            slots, reused = [], []
+            for row_id in ids:
+                slot = self.slot_of.get(row_id)
+                if slot is None and self._free:
+                    slot = self._free.pop()
+                    reused.append(slot)
+                elif slot is None:
+                    slot = self._next_slot
+                    self._next_slot = max(self._next_slot, slot + 1)
+                slots.append(slot)
+
+            self._grow(self._next_slot)
+
+            slots = np.asarray(slots, dtype=np.int64)
+            self.vectors[slots] = vectors
+            if self.quantization == "int8":
+                self.codes[slots], self.scales[slots] = quantize_int8(vectors)
+            elif self.quantization == "binary":
+                self.codes[slots] = quantize_binary(vectors)
+
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?)",
+                    [
+                        (int(slot), row_id, document, json.dumps(metadata) if metadata is not None else None)
+                        for slot, row_id, document, metadata in zip(slots, ids, documents, metadatas)
+                    ]
+                )
+
+            for slot, row_id, metadata in zip(slots.tolist(), ids, metadatas):
+                self.slot_of[row_id] = slot
+                self.ids[slot] = row_id
+                self.metadatas[slot] = metadata
+            self.live[slots] = True
+
+            if self._hnsw is not None:
+                # A reused slot keeps its deleted label in the graph: revive
+                # it, and add_items then updates the vector in place
+                for slot in reused:
+                    try:
+                        self._hnsw.unmark_deleted(slot)
+                    except RuntimeError:
+                        pass  # never indexed (index rebuilt since the delete)
+                self._hnsw.add_items(vectors, slots)
+                self._mark_hnsw_dirty()
+
+    add = upsert
+
+    def update(self, ids, metadatas):
+        """
+        Merges metadatas into existing rows, as Chroma's update does;
+        unknown ids are ignored.
+        """
+
+        with self._lock:
+            updates = []
+            for row_id, metadata in zip(ids, metadatas):
+                slot = self.slot_of.get(row_id)
+                if slot is None:
+                    continue
+                merged = {**(self.metadatas.get(slot) or {}), **metadata}
+                self.metadatas[slot] = merged
+                updates.append((json.dumps(merged), slot))
+
+            with self.conn:
+                self.conn.executemany("UPDATE rows SET metadata = ? WHERE slot = ?", updates)
+
+    def delete(self, ids=None, where=None):
+
+        with self._lock:
+
+            slots = self._select(ids, where)
+            if not slots:
+                return
+
+            with self.conn:
+                self.conn.executemany("DELETE FROM rows WHERE slot = ?", [(s,) for s in slots])
+
+            for slot in slots:
+                del self.slot_of[self.ids.pop(slot)]
+                self.metadatas.pop(slot, None)
+                if self._hnsw is not None:
+                    self._hnsw.mark_deleted(slot)
+
+            self.live[slots] = False
+            self._free = sorted(set(self._free) | set(slots), reverse=True)
+            if self._hnsw is not None:
+                self._mark_hnsw_dirty()
+
+    # ---------------------------------------------------
+    # Reads
+    # ---------------------------------------------------
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def get_max_batch_size(self) -> int:
+        return 1 << 62
+
+    def _select(self, ids=None, where=None) -> list:
+        """
+        Live slots matching ids and where, in slot order.
+        """
+
+        if ids is not None:
+            slots = sorted(self.slot_of[i] for i in ids if i in self.slot_of)
+        else:
+            slots = sorted(self.ids)
+
+        if where:
+            predicate = compile_where(where)
+            slots = [s for s in slots if predicate(self.metadatas.get(s) or {})]
+
+        return slots
+
+    def _documents(self, slots: list) -> list:
+
+        documents = {}
+        for start in range(0, len(slots), 900):
+            part = slots[start:start + 900]
+            rows = self.conn.execute(
+                f"SELECT slot, document FROM rows WHERE slot IN ({','.join('?' * len(part))})", part
+            )
+            documents.update(rows)
+
+        return [documents.get(s) for s in slots]
+
+    def _rows(self, slots: list, include) -> dict:
+
+        result = {"ids": [self.ids[s] for s in slots]}
+        if "documents" in include:
+            result["documents"] = self._documents(slots)
+        if "metadatas" in include:
+            result["metadatas"] = [self.metadatas.get(s) for s in slots]
+        if "embeddings" in include:
+            result["embeddings"] = np.asarray(self.vectors[slots]) if slots else np.zeros((0, self.dim or 0))
+
+        return result
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=("documents", "metadatas")):
+
+        with self._lock:
+            slots = self._select(ids, where)
+            start = offset or 0
+            slots = slots[start:start + limit] if limit is not None else slots[start:]
+            return self._rows(slots, include)
+
+    def _candidates(self, query: np.ndarray, allowed: np.ndarray, n: int) -> np.ndarray:
+        """
+        Approximate top-n slots among `allowed` (HNSW or quantized scan).
+        """
+
+        if allowed.size <= n:
+            return allowed
+
+        if self._hnsw is not None:
+            mask = np.zeros(self.capacity, dtype=bool)
+            mask[allowed] = True
+            self._hnsw.set_ef(max(HNSW_EF_SEARCH, n))
+            try:
+                labels, _ = self._hnsw.knn_query(query, k=n, filter=lambda label: mask[label])
+                return labels[0].astype(np.int64)
+            except RuntimeError:
+                pass  # selective filter: the graph search reached < n allowed labels, scan instead
+
+        # Every live row: scan the mapped prefix in place instead of gathering
+        rows = slice(0, self._next_slot) if allowed.size == self._next_slot else allowed
+
+        if self.quantization == "int8":
+            scores = (self.codes[rows] @ query) * self.scales[rows]
+        elif self.quantization == "binary":
+            scores = -hamming(self.codes[rows], quantize_binary(query[None, :])[0])
+        else:
+            scores = self.vectors[rows] @ query
+
+        top = np.argpartition(-scores, n - 1)[:n]
+        return allowed[top]
+
+    def query(self, query_embeddings, n_results=10, where=None,
+              include=("documents", "metadatas", "distances")):
+
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        results = {"ids": [], "distances": []}
+        for key in ("documents", "metadatas"):
+            if key in include:
+                results[key] = []
+
+        with self._lock:
+
+            if where:
+                allowed = np.asarray(self._select(where=where), dtype=np.int64)
+            else:
+                allowed = np.flatnonzero(self.live)
+
+            for query in queries:
+                if allowed.size == 0 or n_results <= 0:
+                    slots, distances = [], []
+                else:
+                    factor = MMAP_BINARY_RESCORE_FACTOR if self.quantization == "binary" else MMAP_RESCORE_FACTOR
+                    candidates = self._candidates(query, allowed, n_results * max(1, factor))
+                    # Exact re-score on the float rows
+                    similarities = self.vectors[candidates] @ query
+                    order = np.argsort(-similarities, kind="stable")[:n_results]
+                    slots = candidates[order].tolist()
+                    distances = (2.0 - 2.0 * similarities[order]).tolist()
+
+                rows = self._rows(slots, include)
+                results["ids"].append(rows["ids"])
+                results["distances"].append(distances)
+                for key in ("documents", "metadatas"):
+                    if key in include:
+                        results[key].append(rows[key])
+
+        return results
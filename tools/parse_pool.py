@@ -0,0 +1,336 @@
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, timeouts and recycling still apply
+    resource = None
+
+
+PARSE_TIMEOUT = float(os.getenv("PARSE_TIMEOUT", "60"))                    # seconds per file
+PARSE_MAX_RSS_MB = int(os.getenv("PARSE_MAX_RSS_MB", "1024"))              # recycle a worker above this
+PARSE_MEMORY_LIMIT_MB = int(os.getenv("PARSE_MEMORY_LIMIT_MB", "4096"))    # hard address-space cap, 0 = none
+PARSE_FILES_PER_WORKER = int(os.getenv("PARSE_FILES_PER_WORKER", "200"))   # recycle after N files, 0 = never
+PARSE_RETRIES = int(os.getenv("PARSE_RETRIES", "1"))                       # extra tries after a timeout / crash / MemoryError
+PARSE_QUARANTINE_FILE = os.getenv("PARSE_QUARANTINE_FILE", "data/parse_quarantine.jsonl")
+
+
+# -------------------------------------------------------
+# 1. QUARANTINE (files that failed to parse)
+# -------------------------------------------------------
+
+class ParseQuarantine:
+    """
+    JSON lines of {path, content_hash, reason}. A quarantined file is
+    skipped until its content changes (new hash) or the entry is
+    removed with release():
+
+        python -m tools.parse_pool --list
+        python -m tools.parse_pool --release cv_profiles_db/bad_17.pdf
+        python -m tools.parse_pool --release-all
+    """
+
+    def __init__(self, quarantine_file=PARSE_QUARANTINE_FILE):
+        self.quarantine_file = quarantine_file
+        self.entries = {}
+
+        if os.path.exists(quarantine_file):
+            with open(quarantine_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    if entry.get("released"):
+                        self.entries.pop(entry["path"], None)
+                    else:
+                        self.entries[entry["path"]] = entry
+
+        directory = os.path.dirname(quarantine_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def reason(self, path: str, content_hash: str):
+        """
+        Why the file is quarantined, or None when it is not (or has
+        changed since).
+        """
+
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None or entry.get("content_hash") != content_hash:
+            return None
+
+        return entry["reason"]
+
+    def add(self, path: str, content_hash: str, reason: str):
+        entry = {"path": os.path.abspath(path), "content_hash": content_hash, "reason": reason}
+        self.entries[entry["path"]] = entry
+        self._append(entry)
+
+    def release(self, path: str):
+        path = os.path.abspath(path)
+        if self.entries.pop(path, None) is not None:
+            self._append({"path": path, "released": True})
+
+    def _append(self, entry: dict):
+        with open(self.quarantine_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+# -------------------------------------------------------
+# 2. WORKER PROCESS
+# -------------------------------------------------------
+
+def _rss_mb() -> float:
+    # Peak RSS of this process; ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _worker(conn, parse_fn, memory_limit_mb):
+    """
+    Parses one path per message until it gets None. Replies
+    (ok, text or error message, peak RSS in MB).
+    """
+
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass  # above the inherited hard limit; run uncapped
+
+    if parse_fn is None:
+        from tools.file_ingestion import extract_text_from_file
+        parse_fn = extract_text_from_file
+
+    while True:
+        path = conn.recv()
+        if path is None:
+            break
+
+        try:
+            reply = (True, parse_fn(path))
+        except MemoryError:
+            reply = (False, MemoryError(f"over the {memory_limit_mb} MB parse memory limit"))
+        except Exception as e:
+            reply = (False, RuntimeError(f"{type(e).__name__}: {e}"))
+
+        conn.send(reply + (_rss_mb() if resource is not None else 0.0,))
+
+    conn.close()
+
+
+class _Worker:
+
+    def __init__(self, context, parse_fn, memory_limit_mb):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker, args=(child_conn, parse_fn, memory_limit_mb), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.files = 0
+
+    def stop(self, timeout: float = 1.0):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass  # already dead or killed
+        else:
+            self.process.join(timeout)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+# -------------------------------------------------------
+# 3. SUPERVISED POOL
+# -------------------------------------------------------
+
+class ParsePool:
+    """
+    Parses files in separate worker processes, each watched by a
+    supervisor thread:
+    - a file that runs past `timeout` seconds gets its worker killed
+    - workers run under an address-space cap (memory_limit_mb), so a
+      runaway parse fails with MemoryError instead of taking the host
+    - a worker is replaced after files_per_worker files, or once its
+      peak RSS passes max_rss_mb
+    - a worker that dies mid-file (segfault, OOM kill) fails only that file
+    - files that time out, crash a worker or hit the memory cap depend
+      on host load as much as on the file, so they are queued again
+      (up to `retries` times) before being reported as failed
+
+    map() yields (path, text, error) in completion order, like
+    executor.map with errors as values.
+    """
+
+    def __init__(self,
+                 workers=None,
+                 timeout=PARSE_TIMEOUT,
+                 max_rss_mb=PARSE_MAX_RSS_MB,
+                 memory_limit_mb=PARSE_MEMORY_LIMIT_MB,
+                 files_per_worker=PARSE_FILES_PER_WORKER,
+                 retries=PARSE_RETRIES,
+                 parse_fn=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.memory_limit_mb = memory_limit_mb
+        self.files_per_worker = files_per_worker
+        self.retries = max(0, retries)
+        self.parse_fn = parse_fn
+        self.stats = {"timeouts": 0, "crashes": 0, "recycled": 0, "retried": 0}
+        # Fresh interpreters: a forked child would inherit the parent's
+        # threads and its (model-sized) address space under the rlimit
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _parse(self, worker, path: str):
+        """
+        One file on one worker → (text, error, keep_worker).
+        """
+
+        started = time.time()
+
+        try:
+            worker.conn.send(path)
+            if not worker.conn.poll(self.timeout):
+                worker.kill()
+                self._count("timeouts")
+                return None, TimeoutError(f"parse timed out after {self.timeout:g}s"), False
+            ok, payload, rss_mb = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.kill()
+            self._count("crashes")
+            return None, ChildProcessError(
+                f"parse worker died (exit code {worker.process.exitcode}) "
+                f"after {time.time() - started:.1f}s"
+            ), False
+
+        worker.files += 1
+        keep = (not self.files_per_worker or worker.files < self.files_per_worker) \
+            and (not self.max_rss_mb or rss_mb <= self.max_rss_mb)
+        if not keep:
+            self._count("recycled")
+
+        return (payload, None, keep) if ok else (None, payload, keep)
+
+    def _supervise(self, tasks, results, stop):
+
+        worker = None
+
+        try:
+            while not stop.is_set():
+                try:
+                    path, attempt = tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+                if worker is None:
+                    worker = _Worker(self._context, self.parse_fn, self.memory_limit_mb)
+
+                text, error, keep = self._parse(worker, path)
+                if not keep or isinstance(error, MemoryError):
+                    worker.stop()
+                    worker = None
+
+                # Timeouts, dead workers and MemoryError: try again later
+                if error is not None and attempt < self.retries and self._transient(error):
+                    self._count("retried")
+                    tasks.put((path, attempt + 1))
+                    continue
+
+                # Bounded results queue: workers wait while the consumer is busy
+                while not stop.is_set():
+                    try:
+                        results.put((path, text, error), timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+        finally:
+            if worker is not None:
+                worker.stop()
+            results.put(None)
+
+    @staticmethod
+    def _transient(error) -> bool:
+        return isinstance(error, (TimeoutError, MemoryError, ChildProcessError))
+
+    def map(self, paths):
+
+        tasks = queue.Queue()
+        for path in paths:
+            tasks.put((path, 0))
+
+        workers = min(self.workers, tasks.qsize())
+        if not workers:
+            return
+
+        results = queue.Queue(maxsize=workers * 2)
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=self._supervise, args=(tasks, results, stop), daemon=True)
+            for _ in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            running = workers
+            while running:
+                item = results.get()
+                if item is None:
+                    running -= 1
+                    continue
+                yield item
+        finally:
+            stop.set()
+            # Unblock supervisors waiting on a full queue, then wait for them
+            while any(thread.is_alive() for thread in threads):
+                try:
+                    results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            for thread in threads:
+                thread.join()
+
+
+def main():
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or release quarantined CV files")
+    parser.add_argument("--file", default=PARSE_QUARANTINE_FILE, help="Quarantine file")
+    parser.add_argument("--list", action="store_true", help="Show quarantined files")
+    parser.add_argument("--release", nargs="+", default=[], metavar="PATH", help="Retry these files on the next run")
+    parser.add_argument("--release-all", action="store_true")
+    args = parser.parse_args()
+
+    quarantine = ParseQuarantine(args.file)
+
+    for path in list(quarantine.entries) if args.release_all else args.release:
+        quarantine.release(path)
+        print("Released", path)
+
+    if args.list or not (args.release or args.release_all):
+        for entry in quarantine.entries.values():
+            print(f"{entry['path']}\t{entry['reason']}")
+
+
+if __name__ == "__main__":
+    main()
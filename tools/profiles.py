@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import re
+
+from tools.skill_index import experience_map, TOTAL_YEARS
+
+
+# Bump when build_compact_profile changes so stored profiles are rebuilt
+PROFILE_VERSION = "v1"
+PROFILE_SUMMARY_WORDS = int(os.getenv("PROFILE_SUMMARY_WORDS", "60"))
+USE_COMPACT_PROFILES = os.getenv("USE_COMPACT_PROFILES", "1") == "1"
+
+_SUMMARY_HEADING_RE = re.compile(
+    r"^\s*(professional\s+summary|summary|profile|objective|about(\s+me)?)\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def profile_hash(text: str) -> str:
+    """
+    Ties a stored compact profile to the exact document (and builder
+    version) it was made from.
+    """
+
+    digest = hashlib.sha256()
+    digest.update(PROFILE_VERSION.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((text or "").encode("utf-8"))
+
+    return digest.hexdigest()[:16]
+
+
+def _skill_list(value) -> list:
+
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = [value]
+
+    if not isinstance(value, list):
+        return []
+
+    return [str(item.get("name", item)) if isinstance(item, dict) else str(item) for item in value if item]
+
+
+def _summary(text: str, max_words: int) -> str:
+    """
+    The CV's own summary section if it has one, else its opening lines.
+    """
+
+    match = _SUMMARY_HEADING_RE.search(text or "")
+    body = text[match.end():] if match else (text or "")
+    section = re.split(r"\n\s*\n", body.strip(), maxsplit=1)[0] if match else body
+
+    words = section.split()
+    summary = " ".join(words[:max_words])
+
+    return summary + (" ..." if len(words) > max_words else "")
+
+
+def build_compact_profile(text: str, metadata: dict, max_words: int = PROFILE_SUMMARY_WORDS) -> str:
+    """
+    Short scoring-prompt profile: structured skills, years of
+    experience and a ~max_words summary, instead of the full CV.
+    """
+
+    metadata = metadata or {}
+    lines = []
+
+    for label, key in (("Primary skills", "primary_skills"),
+                       ("Secondary skills", "secondary_skills"),
+                       ("Tools", "tools")):
+        skills = _skill_list(metadata.get(key))
+        if skills:
+            lines.append(f"{label}: {', '.join(skills)}")
+
+    years = experience_map(metadata)
+    if TOTAL_YEARS in years:
+        lines.append(f"Experience: {years.pop(TOTAL_YEARS):g} years total")
+    if years:
+        lines.append("Experience: " + ", ".join(f"{skill} {value:g}y" for skill, value in years.items()))
+
+    summary = _summary(text, max_words)
+    if summary:
+        lines.append(f"Summary: {summary}")
+
+    return "\n".join(lines)
+
+
+def scoring_profile(document: str, metadata: dict) -> str:
+    """
+    Text to send to the scoring LLM for one stored employee: the compact
+    profile stored at ingest while it still matches the document, a
+    freshly built one otherwise, or the raw document when compact
+    profiles are disabled.
+    """
+
+    if not USE_COMPACT_PROFILES:
+        return document
+
+    if profile_is_current(document, metadata):
+        return metadata["compact_profile"]
+
+    return build_compact_profile(document, metadata)
+
+
+def profile_is_current(document: str, metadata: dict) -> bool:
+    """
+    True when metadata holds a compact profile built from this document.
+    """
+
+    metadata = metadata or {}
+
+    return bool(metadata.get("compact_profile")) and metadata.get("profile_hash") == profile_hash(document)
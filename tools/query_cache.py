@@ -0,0 +1,90 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "512"))
+
+
+def normalize_query(text: str) -> str:
+    # Whitespace-only edits must not miss the cache
+    return " ".join((text or "").split())
+
+
+def query_key(text: str, model_name: str) -> str:
+
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_query(text).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU of query embeddings.
+
+    - Keyed by query_key(normalized text, embedding model)
+    - Holds at most max_entries float32 vectors; the least recently
+      used one is dropped first
+    - hits / misses counters for reporting
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_MAX_ENTRIES):
+
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str, model_name: str):
+
+        key = query_key(text, model_name)
+
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding.tolist()
+
+    def put(self, text: str, model_name: str, embedding):
+
+        if self.max_entries <= 0:
+            return
+
+        key = query_key(text, model_name)
+
+        with self._lock:
+            self._entries[key] = np.asarray(embedding, dtype=np.float32)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,37 @@
+import threading
+
+
+# -------------------------------------------------------
+# PROCESS-WIDE SINGLETONS
+# -------------------------------------------------------
+# The SentenceTransformer and the Chroma client are expensive to create,
+# so they are built on first use and shared by every orchestrator,
+# the ingestion pipeline and main.py. Nothing heavy happens at import.
+
+DEFAULT_DB_PATH = "data/chroma_store"
+
+_lock = threading.RLock()
+_embedders = {}
+_stores = {}
+
+
+def get_embedder(model_name: str):
+
+    if model_name not in _embedders:
+        with _lock:
+            if model_name not in _embedders:
+                from sentence_transformers import SentenceTransformer
+                _embedders[model_name] = SentenceTransformer(model_name)
+
+    return _embedders[model_name]
+
+
+def get_store(db_path: str = DEFAULT_DB_PATH):
+
+    if db_path not in _stores:
+        with _lock:
+            if db_path not in _stores:
+                from tools.embedding_store import TalentVectorStore
+                _stores[db_path] = TalentVectorStore(db_path=db_path)
+
+    return _stores[db_path]
@@ -0,0 +1,118 @@
+import os
+
+from tools.profiles import scoring_profile
+from tools.skills import normalize_skill, SKILL_FLAG_PREFIX
+from tools.tracing import current_span
+
+
+PREFILTER_TOP_K = int(os.getenv("PREFILTER_TOP_K", "25"))
+SHORTLIST_SIZE = int(os.getenv("SHORTLIST_SIZE", "5"))
+LEXICAL_WEIGHT = float(os.getenv("LEXICAL_WEIGHT", "0.3"))
+MAX_PREFILTER_IDS = int(os.getenv("MAX_PREFILTER_IDS", "5000"))
+
+
+# -------------------------------------------------------
+# 1. STAGE ONE: METADATA PRE-FILTER + ANN
+# -------------------------------------------------------
+
+def skill_where(skills: list):
+    """
+    Chroma `where` matching employees that have at least one of the skills.
+    """
+
+    clauses = [{SKILL_FLAG_PREFIX + normalize_skill(s): True} for s in skills if normalize_skill(s)]
+
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+
+    return {"$or": clauses}
+
+
+def result_rows(results, query_index=0) -> list:
+
+    ids = results["ids"][query_index]
+    documents = results["documents"][query_index]
+    metadatas = (results.get("metadatas") or [[None] * len(ids)] * (query_index + 1))[query_index]
+    distances = (results.get("distances") or [[None] * len(ids)] * (query_index + 1))[query_index]
+
+    return [
+        {"emp_id": emp_id, "document": doc, "metadata": meta or {}, "distance": dist}
+        for emp_id, doc, meta, dist in zip(ids, documents, metadatas, distances)
+    ]
+
+
+# -------------------------------------------------------
+# 2. STAGE TWO: LEXICAL + EMBEDDING RE-RANK
+# -------------------------------------------------------
+
+def rerank(rows: list, project_skills: list, shortlist=SHORTLIST_SIZE) -> list:
+    """
+    score = (1 - LEXICAL_WEIGHT) * embedding similarity
+            + LEXICAL_WEIGHT * share of project skills the employee has
+
+    Returns the best `shortlist` rows as [(emp_id, profile), ...], where
+    profile is the compact scoring profile (see tools.profiles).
+    """
+
+    skills = [normalize_skill(s) for s in project_skills if normalize_skill(s)]
+
+    def score(row):
+        # Normalized embeddings + Chroma's default L2 space: d = 2 - 2cos
+        similarity = 1.0 - row["distance"] / 2.0 if row["distance"] is not None else 0.0
+
+        if not skills:
+            return similarity
+
+        text = (row["document"] or "").lower()
+        matched = sum(
+            1 for s in skills
+            if row["metadata"].get(SKILL_FLAG_PREFIX + s) or s in text
+        )
+
+        return (1 - LEXICAL_WEIGHT) * similarity + LEXICAL_WEIGHT * matched / len(skills)
+
+    ranked = sorted(rows, key=score, reverse=True)[:shortlist]
+    profiles = [scoring_profile(row["document"] or "", row["metadata"]) for row in ranked]
+
+    # Prompt-size saving of the compact profiles, in ~4-char tokens
+    current_span().add("profile_tokens_raw", sum(len(row["document"] or "") for row in ranked) // 4)
+    current_span().add("profile_tokens_compact", sum(len(p) for p in profiles) // 4)
+
+    return [(row["emp_id"], profile) for row, profile in zip(ranked, profiles)]
+
+
+def two_stage_retrieve(store,
+                       project_text: str,
+                       project_skills: list,
+                       top_k=PREFILTER_TOP_K,
+                       shortlist=SHORTLIST_SIZE,
+                       expanded_skills: list = None) -> list:
+    """
+    1. ANN over employees sharing at least one project skill, or one of
+       expanded_skills (e.g. ontology neighbours), with a wider top_k.
+       The skill inverted index supplies the ids; the `where` flags are
+       the fallback for stores indexed before it existed
+    2. Top up with unfiltered ANN if the filter was too strict
+    3. Cheap re-rank down to a shortlist for LLM scoring
+    """
+
+    skills = list(expanded_skills or project_skills)
+    candidate_ids = store.find_candidates(any_of=skills) if skills else []
+    where = skill_where(skills)
+    rows = []
+
+    if 0 < len(candidate_ids) <= MAX_PREFILTER_IDS:
+        rows = result_rows(store.query(project_text, top_k=top_k, ids=candidate_ids))
+    elif where is not None:
+        rows = result_rows(store.query(project_text, top_k=top_k, where=where))
+
+    if len(rows) < shortlist:
+        seen = {row["emp_id"] for row in rows}
+        rows += [
+            row for row in result_rows(store.query(project_text, top_k=top_k))
+            if row["emp_id"] not in seen
+        ]
+
+    return rerank(rows, project_skills, shortlist=shortlist)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+SCORE_CACHE_DB = os.getenv("SCORE_CACHE_DB", "data/score_cache.sqlite")
+SCORE_CACHE_TTL = float(os.getenv("SCORE_CACHE_TTL", str(7 * 24 * 3600)))
+SCORE_CACHE_MAX_ENTRIES = int(os.getenv("SCORE_CACHE_MAX_ENTRIES", "100000"))
+
+
+def score_key(project_text: str, employee_text: str, model_name: str, prompt_version: str) -> str:
+
+    digest = hashlib.sha256()
+
+    for part in (model_name, prompt_version, project_text, employee_text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+class ScoreCache:
+    """
+    On-disk memo of score_match results.
+
+    - Keyed by score_key(project, profile, model, prompt version)
+    - Entries older than ttl seconds are treated as misses
+    - Least recently used entries are evicted above max_entries
+
+    Safe to share between the scoring worker threads.
+    """
+
+    def __init__(self,
+                 db_path=SCORE_CACHE_DB,
+                 ttl=SCORE_CACHE_TTL,
+                 max_entries=SCORE_CACHE_MAX_ENTRIES):
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS scores (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)"
+            )
+
+    def get(self, key: str):
+
+        now = time.time()
+
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT result, created_at FROM scores WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE scores SET last_used = ? WHERE key = ?", (now, key)
+                )
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, result: dict):
+
+        now = time.time()
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now)
+            )
+
+            self._puts += 1
+            # Pruning scans the table, so only do it every 100 writes
+            if self._puts % 100 == 0:
+                self._prune(now)
+
+    def _prune(self, now: float):
+
+        self.conn.execute("DELETE FROM scores WHERE created_at < ?", (now - self.ttl,))
+        self.conn.execute(
+            """
+            DELETE FROM scores WHERE key IN (
+                SELECT key FROM scores ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
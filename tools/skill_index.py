@@ -0,0 +1,350 @@
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from tools.skills import normalize_skill, skill_names
+
+
+TOTAL_YEARS = "*"   # experience_years given as one number instead of per skill
+
+# Bump when term normalization changes: logs with another version are rebuilt
+SKILL_INDEX_VERSION = 1
+# Rewrite the log once it holds more than this many ops per live employee
+SKILL_INDEX_COMPACT_FACTOR = 2
+SKILL_INDEX_COMPACT_MIN_OPS = 1000
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_years(value):
+    """
+    5 / 5.5 / "5" / "5+ years" → float, anything else → None
+    """
+
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _NUMBER_RE.search(value)
+        return float(match.group()) if match else None
+    return None
+
+
+def experience_map(metadata: dict) -> dict:
+    """
+    {normalized skill: years} from an extract_structured_skills result.
+    """
+
+    experience = (metadata or {}).get("experience_years")
+
+    if isinstance(experience, str):
+        try:
+            experience = json.loads(experience)
+        except ValueError:
+            pass
+
+    if isinstance(experience, dict):
+        years = {}
+        for name, value in experience.items():
+            parsed = parse_years(value)
+            if parsed is not None and normalize_skill(name):
+                years[normalize_skill(name)] = parsed
+        return years
+
+    parsed = parse_years(experience)
+    return {TOTAL_YEARS: parsed} if parsed is not None else {}
+
+
+def intersect_sorted(small: np.ndarray, large: np.ndarray) -> np.ndarray:
+    """
+    Intersection of two sorted unique arrays in O(|small| log |large|).
+    """
+
+    if small.size == 0 or large.size == 0:
+        return small[:0]
+
+    positions = np.minimum(np.searchsorted(large, small), large.size - 1)
+
+    return small[large[positions] == small]
+
+
+class SkillIndex:
+    """
+    Inverted index: normalized skill / tool → sorted int32 posting list
+    of internal doc ids, plus columnar float32 experience_years arrays
+    (one column per skill, NaN = unknown).
+
+    Persisted as an append-only JSON-lines log of add / remove ops,
+    replayed on open. The first line records SKILL_INDEX_VERSION; the
+    log is rewritten as a snapshot (compact()) once it holds more than
+    SKILL_INDEX_COMPACT_FACTOR ops per live employee.
+
+    query(all_of=["docker", "jenkins"], min_years={"docker": 3})
+    intersects posting lists smallest-first, then filters on the
+    experience columns — no LLM, no scan.
+    """
+
+    def __init__(self, path: str = None):
+
+        self.path = path
+        self._lock = threading.RLock()
+        self._reset()
+
+        self.version = SKILL_INDEX_VERSION
+        self._ops = 0                     # lines in the log
+        self._log = None
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path):
+                self.version = None       # logs from before versioning
+                self._replay(path)
+                self._log = open(path, "a", encoding="utf-8")
+                self._maybe_compact()
+            else:
+                self.compact()
+
+    def _reset(self):
+
+        self.emp_ids = []                 # doc id → emp_id
+        self.doc_index = {}               # emp_id → doc id
+        self.doc_terms = {}               # doc id → [terms]
+        self.doc_years = {}               # doc id → {term: years}
+
+        self._postings = {}               # term → sorted int32 array
+        self._pending_add = {}            # term → set(doc ids)
+        self._pending_remove = {}         # term → set(doc ids)
+        self._years = {}                  # term → float32 column
+        self._capacity = 0
+
+    # ---------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------
+
+    def _replay(self, path):
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                self._ops += 1
+                if op["op"] == "version":
+                    self.version = op["version"]
+                elif op["op"] == "add":
+                    self._add(op["emp_id"], op["terms"], op.get("years", {}))
+                elif op["op"] == "remove":
+                    self._remove(op["emp_id"])
+
+    def _write(self, ops: list):
+
+        if self._log is None or not ops:
+            return
+
+        self._log.write("".join(json.dumps(op) + "\n" for op in ops))
+        self._log.flush()
+        self._ops += len(ops)
+
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+
+        if self._ops > max(SKILL_INDEX_COMPACT_MIN_OPS, SKILL_INDEX_COMPACT_FACTOR * len(self)):
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrites the log as a snapshot: the version line plus one add
+        per live employee.
+        """
+
+        if not self.path:
+            return
+
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"op": "version", "version": SKILL_INDEX_VERSION}) + "\n")
+                for doc, terms in self.doc_terms.items():
+                    f.write(json.dumps({
+                        "op": "add",
+                        "emp_id": self.emp_ids[doc],
+                        "terms": terms,
+                        "years": self.doc_years.get(doc, {})
+                    }) + "\n")
+
+            if self._log is not None:
+                self._log.close()
+            os.replace(tmp_path, self.path)
+            self._log = open(self.path, "a", encoding="utf-8")
+            self.version = SKILL_INDEX_VERSION
+            self._ops = len(self.doc_terms) + 1
+
+    def rebuild(self, records):
+        """
+        Replaces the whole index with records ([(emp_id, metadata), ...])
+        and writes it out as a fresh snapshot.
+        """
+
+        with self._lock:
+            self._reset()
+            for emp_id, metadata in records:
+                self._add(emp_id, skill_names(metadata), experience_map(metadata))
+            self.compact()
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    # ---------------------------------------------------
+    # Updates
+    # ---------------------------------------------------
+
+    def _ensure_capacity(self, size: int):
+
+        if size <= self._capacity:
+            return
+
+        capacity = max(size, self._capacity * 2, 1024)
+        for term, column in self._years.items():
+            grown = np.full(capacity, np.nan, dtype=np.float32)
+            grown[:len(column)] = column
+            self._years[term] = grown
+        self._capacity = capacity
+
+    def _add(self, emp_id: str, terms: list, years: dict):
+
+        self._remove(emp_id)
+
+        doc = self.doc_index.get(emp_id)
+        if doc is None:
+            doc = len(self.emp_ids)
+            self.emp_ids.append(emp_id)
+            self.doc_index[emp_id] = doc
+
+        self._ensure_capacity(len(self.emp_ids))
+
+        self.doc_terms[doc] = list(terms)
+        self.doc_years[doc] = dict(years)
+
+        for term in terms:
+            self._pending_remove.get(term, set()).discard(doc)
+            self._pending_add.setdefault(term, set()).add(doc)
+
+        for term, value in years.items():
+            if term not in self._years:
+                self._years[term] = np.full(self._capacity, np.nan, dtype=np.float32)
+            self._years[term][doc] = value
+
+    def _remove(self, emp_id: str):
+
+        doc = self.doc_index.get(emp_id)
+        if doc is None or doc not in self.doc_terms:
+            return
+
+        for term in self.doc_terms.pop(doc):
+            self._pending_add.get(term, set()).discard(doc)
+            self._pending_remove.setdefault(term, set()).add(doc)
+
+        for term in self.doc_years.pop(doc, {}):
+            self._years[term][doc] = np.nan
+
+    def add_many(self, records: list):
+        """
+        records: [(emp_id, structured_skills_metadata), ...]
+        Re-adding an emp_id replaces its previous entry.
+        """
+
+        ops = []
+
+        with self._lock:
+            for emp_id, metadata in records:
+                terms = skill_names(metadata)
+                years = experience_map(metadata)
+                self._add(emp_id, terms, years)
+                ops.append({"op": "add", "emp_id": emp_id, "terms": terms, "years": years})
+
+            self._write(ops)
+
+    def remove_many(self, emp_ids: list):
+
+        with self._lock:
+            for emp_id in emp_ids:
+                self._remove(emp_id)
+            self._write([{"op": "remove", "emp_id": emp_id} for emp_id in emp_ids])
+
+    # ---------------------------------------------------
+    # Queries
+    # ---------------------------------------------------
+
+    def _posting(self, term: str) -> np.ndarray:
+
+        postings = self._postings.get(term, np.empty(0, dtype=np.int32))
+        added = self._pending_add.pop(term, None)
+        removed = self._pending_remove.pop(term, None)
+
+        if added:
+            postings = np.union1d(postings, np.fromiter(added, dtype=np.int32))
+        if removed:
+            postings = np.setdiff1d(postings, np.fromiter(removed, dtype=np.int32), assume_unique=True)
+
+        if added or removed:
+            self._postings[term] = postings.astype(np.int32)
+
+        return self._postings.get(term, postings)
+
+    def query(self, all_of=(), any_of=(), min_years: dict = None) -> list:
+        """
+        emp_ids that have every skill in all_of, at least one in any_of
+        (if given), and at least min_years[skill] years for each entry
+        ("*" = total years).
+        """
+
+        all_of = [normalize_skill(s) for s in all_of if normalize_skill(s)]
+        any_of = [normalize_skill(s) for s in any_of if normalize_skill(s)]
+        min_years = {
+            (k if k == TOTAL_YEARS else normalize_skill(k)): v
+            for k, v in (min_years or {}).items()
+        }
+
+        with self._lock:
+
+            docs = None
+
+            if all_of:
+                lists = sorted((self._posting(t) for t in all_of), key=len)
+                docs = lists[0]
+                for posting in lists[1:]:
+                    if docs.size == 0:
+                        break
+                    docs = intersect_sorted(docs, posting)
+
+            if any_of:
+                union = np.unique(np.concatenate(
+                    [self._posting(t) for t in any_of] + [np.empty(0, dtype=np.int32)]
+                ))
+                docs = union if docs is None else intersect_sorted(docs, union)
+
+            if docs is None:
+                docs = np.fromiter(self.doc_terms.keys(), dtype=np.int32)
+                docs.sort()
+
+            for term, years in min_years.items():
+                column = self._years.get(term)
+                if column is None:
+                    return []
+                # NaN (unknown) compares False, so it is filtered out
+                docs = docs[column[docs] >= years]
+
+            return [self.emp_ids[d] for d in docs.tolist()]
+
+    def __len__(self):
+        return len(self.doc_terms)
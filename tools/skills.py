@@ -0,0 +1,55 @@
+import json
+
+
+SKILL_FIELDS = ("primary_skills", "secondary_skills", "tools")
+SKILL_FLAG_PREFIX = "skill:"
+
+
+def normalize_skill(name) -> str:
+    """
+    "  Docker Compose " → "docker compose"
+    """
+    return " ".join(str(name).lower().split())
+
+
+def skill_names(metadata: dict) -> list:
+    """
+    Normalized, de-duplicated skill / tool names from an
+    extract_structured_skills result (raw or Chroma-cleaned).
+    """
+
+    names = []
+    seen = set()
+
+    def add(name):
+        name = normalize_skill(name)
+        if name and name not in seen:
+            seen.add(name)
+            names.append(name)
+
+    for field in SKILL_FIELDS:
+        values = (metadata or {}).get(field) or []
+        if isinstance(values, str):
+            values = [values]
+        for value in values:
+            add(value.get("name", "") if isinstance(value, dict) else value)
+
+    experience = (metadata or {}).get("experience_years")
+    if isinstance(experience, str):
+        try:
+            experience = json.loads(experience)
+        except ValueError:
+            experience = None
+    if isinstance(experience, dict):
+        for name in experience:
+            add(name)
+
+    return names
+
+
+def skill_flags(metadata: dict) -> dict:
+    """
+    One boolean metadata key per skill, so Chroma `where` clauses
+    can pre-filter on skills: {"skill:docker": True, ...}
+    """
+    return {SKILL_FLAG_PREFIX + name: True for name in skill_names(metadata)}
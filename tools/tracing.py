@@ -0,0 +1,403 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+TRACE_FILE = os.getenv("TRACE_FILE", "")                 # JSON lines, one finished trace per line
+TRACE_BUFFER = int(os.getenv("TRACE_BUFFER", "100"))     # finished traces kept in memory
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))       # 0 = no /metrics endpoint
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")    # "0.0.0.0" to expose it off-host
+
+# Numeric span attributes summed into Prometheus counters
+COUNTED_ATTRS = ("prompt_tokens", "completion_tokens", "cache_hits", "cache_misses",
+                 "profile_tokens_raw", "profile_tokens_compact", "stream_chunks")
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0)
+
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+# -------------------------------------------------------
+# 1. SPANS
+# -------------------------------------------------------
+
+class Span:
+    """
+    One timed operation. Attributes are free-form; the COUNTED_ATTRS
+    ones (token counts, cache hits / misses) also feed the metrics.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration", "attrs", "error")
+
+    def __init__(self, name: str, trace_id=None, parent_id=None, attrs=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16] if trace_id else None
+        self.parent_id = parent_id
+        self.start = time.perf_counter()
+        self.duration = None
+        self.attrs = attrs or {}
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key: str, value=1):
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "attrs": self.attrs,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, key, value=1):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def current_span():
+    """
+    The innermost open span of this thread / task (a no-op when none),
+    so callees can attach attributes without a handle being passed down.
+    """
+    return _current.get() or _NOOP
+
+
+# -------------------------------------------------------
+# 2. TRACER (metrics + trace assembly)
+# -------------------------------------------------------
+
+class _Stats:
+
+    __slots__ = ("count", "errors", "total", "max", "buckets", "counters")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.counters = dict.fromkeys(COUNTED_ATTRS, 0)
+
+
+class Tracer:
+    """
+    - Every finished span updates per-name metrics (count, errors,
+      latency histogram, token / cache counters)
+    - Spans opened inside trace(...) are also collected into that
+      trace; finished traces go to an in-memory ring buffer and,
+      when TRACE_FILE is set, are appended to it as JSON lines
+    """
+
+    def __init__(self, trace_file=TRACE_FILE, buffer_size=TRACE_BUFFER):
+        self.trace_file = trace_file
+        self.traces = deque(maxlen=buffer_size)
+        self._stats = {}
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def _finish(self, span: Span, root: bool):
+
+        with self._lock:
+            stats = self._stats.get(span.name)
+            if stats is None:
+                stats = self._stats[span.name] = _Stats()
+
+            stats.count += 1
+            stats.total += span.duration
+            stats.max = max(stats.max, span.duration)
+            if span.error:
+                stats.errors += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if span.duration <= bound:
+                    stats.buckets[i] += 1
+            for key in COUNTED_ATTRS:
+                value = span.attrs.get(key)
+                if isinstance(value, (int, float)):
+                    stats.counters[key] += value
+
+            if span.trace_id is None:
+                return
+
+            spans = self._open.get(span.trace_id)
+            if spans is None:
+                return  # finished after its trace was closed (abandoned thread)
+            spans.append(span.to_dict())
+
+            if not root:
+                return
+
+            trace = {
+                "trace_id": span.trace_id,
+                "name": span.name,
+                "started_at": time.time() - span.duration,
+                "duration_ms": round(span.duration * 1000, 3),
+                "spans": self._open.pop(span.trace_id),
+            }
+            self.traces.append(trace)
+
+        if self.trace_file:
+            directory = os.path.dirname(self.trace_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.trace_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace) + "\n")
+
+    # ---------------------------------------------------
+    # Exports
+    # ---------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """
+        {span name: {"count", "errors", "total_seconds", "max_seconds", ...counters}}
+        """
+
+        with self._lock:
+            return {
+                name: {
+                    "count": s.count,
+                    "errors": s.errors,
+                    "total_seconds": round(s.total, 6),
+                    "max_seconds": round(s.max, 6),
+                    **{k: v for k, v in s.counters.items() if v},
+                }
+                for name, s in self._stats.items()
+            }
+
+    def summary(self) -> str:
+        """
+        Human-readable table, slowest total first.
+        """
+
+        rows = sorted(self.snapshot().items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+        lines = [f"{'span':<32}{'count':>8}{'total s':>12}{'mean ms':>12}{'max ms':>12}"]
+        for name, s in rows:
+            mean_ms = s["total_seconds"] / s["count"] * 1000 if s["count"] else 0.0
+            lines.append(
+                f"{name:<32}{s['count']:>8}{s['total_seconds']:>12.3f}{mean_ms:>12.1f}{s['max_seconds'] * 1000:>12.1f}"
+            )
+
+        return "\n".join(lines)
+
+    def prometheus_text(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+
+        lines = [
+            "# HELP talent_span_seconds Duration of traced operations.",
+            "# TYPE talent_span_seconds histogram",
+        ]
+
+        with self._lock:
+            stats = list(self._stats.items())
+
+            for name, s in stats:
+                label = f'span="{name}"'
+                for bound, count in zip(LATENCY_BUCKETS, s.buckets):
+                    lines.append(f'talent_span_seconds_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'talent_span_seconds_bucket{{{label},le="+Inf"}} {s.count}')
+                lines.append(f"talent_span_seconds_sum{{{label}}} {s.total:.6f}")
+                lines.append(f"talent_span_seconds_count{{{label}}} {s.count}")
+
+            lines += ["# HELP talent_span_errors_total Traced operations that raised.",
+                      "# TYPE talent_span_errors_total counter"]
+            lines += [f'talent_span_errors_total{{span="{name}"}} {s.errors}' for name, s in stats]
+
+            for key in COUNTED_ATTRS:
+                lines += [f"# HELP talent_{key}_total Sum of the {key} span attribute.",
+                          f"# TYPE talent_{key}_total counter"]
+                lines += [
+                    f'talent_{key}_total{{span="{name}"}} {s.counters[key]}'
+                    for name, s in stats if s.counters[key]
+                ]
+
+        return "\n".join(lines) + "\n"
+
+    def recent_traces(self) -> list:
+        """
+        Copy of the buffered traces; workers append to the deque while
+        exports read it, so it is only iterated under the lock.
+        """
+
+        with self._lock:
+            return list(self.traces)
+
+    def export_json(self, path: str):
+        """
+        Writes the buffered traces plus the metric snapshot as one JSON file.
+        """
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"metrics": self.snapshot(), "traces": self.recent_traces()}, f, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.traces.clear()
+
+
+tracer = Tracer()
+
+
+# -------------------------------------------------------
+# 3. INSTRUMENTATION API
+# -------------------------------------------------------
+
+class span:
+    """
+    with span("store.query", top_k=5) as s:
+        ...
+        s.set(cache_hits=1)
+
+    Times the block and records it under `name`. Inside an open
+    trace the span is also attached to that trace.
+    """
+
+    __slots__ = ("_span", "_token", "_root", "_name", "_attrs")
+
+    def __init__(self, name: str, _root: bool = False, **attrs):
+        self._name = name
+        self._attrs = attrs
+        self._root = _root
+        self._span = None
+
+    def __enter__(self):
+
+        if not TRACING_ENABLED:
+            return _NOOP
+
+        parent = _current.get()
+        if self._root and parent is None:
+            trace_id = uuid.uuid4().hex
+            with tracer._lock:
+                tracer._open[trace_id] = []
+        else:
+            trace_id = parent.trace_id if parent is not None else None
+
+        self._span = Span(self._name, trace_id, parent.span_id if parent is not None else None, self._attrs)
+        self._token = _current.set(self._span)
+
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+
+        if self._span is None:
+            return False
+
+        self._span.duration = time.perf_counter() - self._span.start
+        if exc_type is not None:
+            self._span.error = f"{exc_type.__name__}: {exc}"
+
+        _current.reset(self._token)
+        tracer._finish(self._span, root=self._root and self._span.parent_id is None)
+
+        return False
+
+
+def trace(name: str, **attrs) -> span:
+    """
+    Like span, but starts a new trace when none is open
+    (e.g. around one run_agent call).
+    """
+    return span(name, _root=True, **attrs)
+
+
+def traced(name: str = None, root: bool = False):
+    """
+    Decorator form: @traced("node.retrieve")
+    """
+
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, _root=root):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def in_context(fn):
+    """
+    Binds fn to a copy of the caller's context, so spans opened in a
+    thread-pool worker nest under the span that submitted the task.
+    """
+
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+# -------------------------------------------------------
+# 4. /metrics ENDPOINT
+# -------------------------------------------------------
+
+_server = None
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST):
+    """
+    Serves /metrics (Prometheus text) and /traces (recent traces as
+    JSON) from a daemon thread, on localhost unless host says
+    otherwise. Idempotent.
+    """
+
+    global _server
+
+    if _server is not None or not port:
+        return _server
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith("/metrics"):
+                body, content_type = tracer.prometheus_text(), "text/plain; version=0.0.4"
+            elif self.path.startswith("/traces"):
+                body, content_type = json.dumps(tracer.recent_traces()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    _server = ThreadingHTTPServer((host, port), Handler)
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+
+    return _server